@@ -3,29 +3,8 @@ import { motion } from 'framer-motion';
 import { Calendar, Users, UserPlus } from 'lucide-react';
 import { useNavigate } from 'react-router-dom';
 
-const RecruitingClubs = () => {
+const RecruitingClubs = ({ recruitingClubs, isLoading }) => {
   const navigate = useNavigate();
-  const [recruitingClubs, setRecruitingClubs] = useState([]);
-  const [isLoading, setIsLoading] = useState(true);
-
-  useEffect(() => {
-    const fetchRecruitingClubs = async () => {
-      try {
-        const response = await fetch('http://localhost:5000/api/recruiting-clubs');
-        const data = await response.json();
-        
-        if (data.success) {
-          setRecruitingClubs(data.clubs);
-        }
-        setIsLoading(false);
-      } catch (error) {
-        console.error('Error fetching recruiting clubs:', error);
-        setIsLoading(false);
-      }
-    };
-
-    fetchRecruitingClubs();
-  }, []);
 
   if (isLoading) {
     return (
@@ -67,27 +46,10 @@ const RecruitingClubs = () => {
 };
 
 // Event Slider Component
-const EventSlider = () => {
+const EventSlider = ({ events }) => {
   const navigate = useNavigate();
-  const [events, setEvents] = useState([]);
   const [currentEventIndex, setCurrentEventIndex] = useState(0);
 
-  useEffect(() => {
-    const fetchEvents = async () => {
-      try {
-        const response = await fetch('http://localhost:5000/api/events');
-        const data = await response.json();
-        if (data.success) {
-          setEvents(data.events);
-        }
-      } catch (error) {
-        console.error('Error fetching events:', error);
-      }
-    };
-
-    fetchEvents();
-  }, []);
-
   useEffect(() => {
     const timer = events.length > 0 && setInterval(() => {
       setCurrentEventIndex((prevIndex) => 
@@ -139,25 +101,8 @@ const EventSlider = () => {
 };
 
 // Clubs Grid Component
-const ClubsGrid = () => {
+const ClubsGrid = ({ clubs }) => {
   const navigate = useNavigate();
-  const [clubs, setClubs] = useState([]);
-
-  useEffect(() => {
-    const fetchClubs = async () => {
-      try {
-        const response = await fetch('http://localhost:5000/api/clubs');
-        const data = await response.json();
-        if (data.success) {
-          setClubs(data.clubs);
-        }
-      } catch (error) {
-        console.error('Error fetching clubs:', error);
-      }
-    };
-
-    fetchClubs();
-  }, []);
 
   if (clubs.length === 0) return (
     <div className="text-center py-8 text-gray-500">
@@ -196,6 +141,28 @@ const ClubsGrid = () => {
 };
 
 const HomePage = () => {
+  const [home, setHome] = useState({ recruitingClubs: [], events: [], clubs: [] });
+  const [isLoading, setIsLoading] = useState(true);
+
+  // Everything the page shows comes from one request
+  useEffect(() => {
+    const fetchHome = async () => {
+      try {
+        const response = await fetch('http://localhost:5000/api/home');
+        const data = await response.json();
+        if (data.success) {
+          setHome(data);
+        }
+      } catch (error) {
+        console.error('Error fetching homepage data:', error);
+      } finally {
+        setIsLoading(false);
+      }
+    };
+
+    fetchHome();
+  }, []);
+
   return (
     <div className="min-h-screen bg-gray-50">
       {/* Header Section */}
@@ -213,9 +180,9 @@ const HomePage = () => {
 
       {/* Main Content */}
       <main>
-        <RecruitingClubs />
-        <EventSlider />
-        <ClubsGrid />
+        <RecruitingClubs recruitingClubs={home.recruitingClubs} isLoading={isLoading} />
+        <EventSlider events={home.events} />
+        <ClubsGrid clubs={home.clubs} />
       </main>
     </div>
   );
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import { Calendar, MapPin, Info, ArrowLeft } from 'lucide-react';
+import { Calendar, MapPin, Info, ArrowLeft, Search } from 'lucide-react';
 import { motion } from 'framer-motion';
 
 const AllEvents = () => {
@@ -8,16 +8,22 @@ const AllEvents = () => {
   const [events, setEvents] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [query, setQuery] = useState('');
 
   useEffect(() => {
     const fetchEvents = async () => {
       try {
         setIsLoading(true);
-        const response = await fetch('http://localhost:5000/api/events');
+        // Matching and ranking happen on the server, one page at a time
+        const url = query.trim()
+          ? `http://localhost:5000/api/search?type=event&limit=50&q=${encodeURIComponent(query)}`
+          : 'http://localhost:5000/api/events';
+        const response = await fetch(url);
         const data = await response.json();
+        const results = query.trim() ? data.results : data.events;
         
-        if (data.success && Array.isArray(data.events)) {
-          setEvents(data.events);
+        if (data.success && Array.isArray(results)) {
+          setEvents(results);
           setError(null);
         } else {
           setError('No events found or unexpected response format');
@@ -32,10 +38,11 @@ const AllEvents = () => {
       }
     };
 
-    fetchEvents();
-  }, []);
+    const timer = setTimeout(fetchEvents, query ? 250 : 0);
+    return () => clearTimeout(timer);
+  }, [query]);
 
-  if (isLoading) {
+  if (isLoading && events.length === 0 && !query) {
     return (
       <div className="flex justify-center items-center min-h-screen">
         <div className="animate-spin rounded-full h-32 w-32 border-t-2 border-blue-500"></div>
@@ -51,7 +58,7 @@ const AllEvents = () => {
     );
   }
 
-  if (events.length === 0) {
+  if (events.length === 0 && !query) {
     return (
       <div className="text-center py-8 text-gray-500">
         No events available
@@ -81,7 +88,21 @@ const AllEvents = () => {
           Back
         </button>
 
+      <div className="max-w-4xl mx-auto mt-4 mb-8 relative">
+        <Search className="absolute left-3 top-1/2 -translate-y-1/2 text-gray-400" size={20} />
+        <input
+          type="search"
+          value={query}
+          onChange={(e) => setQuery(e.target.value)}
+          placeholder="Search events, venues or clubs"
+          className="w-full pl-10 pr-4 py-3 rounded-lg border border-gray-300 focus:outline-none focus:ring-2 focus:ring-blue-500"
+        />
+      </div>
+
       <div className="max-w-4xl mx-auto space-y-8">
+        {query && events.length === 0 && (
+          <div className="text-center py-8 text-gray-500">No events match "{query}"</div>
+        )}
         {events.map((event) => (
           <motion.div
             key={event.event_id}
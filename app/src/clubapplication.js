@@ -13,13 +13,14 @@ const ClubApplication = () => {
   useEffect(() => {
     const fetchClubDetails = async () => {
       try {
-        // Fetch club details
-        const clubResponse = await fetch(`http://localhost:5000/api/club/${clubId}`);
-        const clubData = await clubResponse.json();
-
-        // Fetch recruitment form fields
-        const recruitmentResponse = await fetch(`http://localhost:5000/api/recruitment/details/${clubId}`);
-        const recruitmentData = await recruitmentResponse.json();
+        // Club details and recruitment form fields in one round trip
+        const response = await fetch('http://localhost:5000/api/batch', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ requests: [`/api/club/${clubId}`, `/api/recruitment/details/${clubId}`] })
+        });
+        const data = await response.json();
+        const [clubData, recruitmentData] = data.success ? data.responses.map(r => r.body) : [{}, {}];
 
         if (clubData.success && recruitmentData.success) {
           setClubDetails(clubData.club);
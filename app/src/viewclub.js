@@ -15,13 +15,14 @@ const ViewClub = () => {
   useEffect(() => {
     const fetchClubDetails = async () => {
       try {
-        // Fetch club details
-        const clubResponse = await fetch(`http://localhost:5000/api/club/${clubId}`);
-        const clubData = await clubResponse.json();
-
-        // Fetch club events
-        const eventsResponse = await fetch(`http://localhost:5000/api/events/${clubId}`);
-        const eventsData = await eventsResponse.json();
+        // Club details and its events in one round trip
+        const response = await fetch('http://localhost:5000/api/batch', {
+          method: 'POST',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ requests: [`/api/club/${clubId}`, `/api/events/${clubId}`] })
+        });
+        const data = await response.json();
+        const [clubData, eventsData] = data.success ? data.responses.map(r => r.body) : [{}, {}];
 
         if (clubData.success && eventsData.success) {
           setClubDetails(clubData.club);
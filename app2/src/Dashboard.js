@@ -12,6 +12,7 @@ const Dashboard = () => {
   const [newField, setNewField] = useState({ label: '', type: 'text', required: false });
   const [recruitmentExists, setRecruitmentExists] = useState(false);
   const [recruitmentResponses, setRecruitmentResponses] = useState([]);
+  const [recruitmentFormId, setRecruitmentFormId] = useState(null);
 
   useEffect(() => {
     const storedClubData = localStorage.getItem('clubData');
@@ -99,18 +100,28 @@ const Dashboard = () => {
       if (data.success) {
         setRecruitmentExists(true);
         setShowRegistrationModal(false);
+        // The new form numbers its responses from 1 again
+        setRecruitmentResponses([]);
+        setRecruitmentFormId(null);
       }
     } catch (error) {
       console.error('Failed to create recruitment form:', error);
     }
   };
 
-  const fetchRecruitmentResponses = async () => {
+  const fetchRecruitmentResponses = async (shown = recruitmentResponses, formId = recruitmentFormId) => {
     try {
-      const response = await fetch(`http://localhost:5000/api/recruitment/responses/${clubData.club_id}`);
+      // Only ask for responses newer than the ones already shown
+      const lastId = shown.reduce((max, response) => Math.max(max, response.id), 0);
+      const response = await fetch(`http://localhost:5000/api/recruitment/responses/${clubData.club_id}?since_id=${lastId}`);
       const data = await response.json();
       if (data.success) {
-        setRecruitmentResponses(data.responses);
+        if (formId !== null && data.formId !== formId) {
+          // The form was recreated elsewhere; its ids don't follow on from the shown rows
+          return fetchRecruitmentResponses([], data.formId);
+        }
+        setRecruitmentFormId(data.formId);
+        setRecruitmentResponses([...shown, ...data.responses]);
       }
     } catch (error) {
       console.error('Failed to fetch recruitment responses:', error);
@@ -216,7 +227,7 @@ const Dashboard = () => {
           {recruitmentExists && (
           <div className="flex space-x-4">
             <button
-              onClick={fetchRecruitmentResponses}
+              onClick={() => fetchRecruitmentResponses()}
               className="inline-flex items-center px-4 py-2 border border-transparent shadow-sm text-sm font-medium rounded-md text-white bg-blue-600 hover:bg-blue-700 focus:outline-none"
             >
               <List className="w-5 h-5 mr-2" />
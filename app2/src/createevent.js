@@ -10,8 +10,11 @@ const CreateEvent = () => {
   const [eventImage, setEventImage] = useState('');
   const [eventDate, setEventDate] = useState('');
   const [eventTime, setEventTime] = useState('');
+  const [eventEndTime, setEventEndTime] = useState('');
   const [eventVenue, setEventVenue] = useState('');
   const [eventDescription, setEventDescription] = useState('');
+  const [registrationLimit, setRegistrationLimit] = useState('');
+  const [enableWaitlist, setEnableWaitlist] = useState(false);
 
   const [eventFields, setEventFields] = useState([]);
   const [newField, setNewField] = useState({ label: '', type: 'text', required: false });
@@ -40,8 +43,11 @@ const CreateEvent = () => {
           eventImage,
           eventDate,
           eventTime,
+          eventEndTime: eventEndTime || undefined,
           eventVenue,
           eventDescription,
+          registrationLimit: registrationLimit ? Number(registrationLimit) : undefined,
+          enableWaitlist,
           eventFields
         })
       });
@@ -49,6 +55,11 @@ const CreateEvent = () => {
       const data = await response.json();
       if (data.success) {
         navigate('/dashboard');
+      } else if (data.conflicts) {
+        const clashes = data.conflicts
+          .map((c) => `${c.event_name} (${c.starts_at} - ${c.ends_at})`)
+          .join('\n');
+        alert(`${data.message}\n${clashes}`);
       } else {
         alert(data.message);
       }
@@ -93,6 +104,12 @@ const CreateEvent = () => {
             onChange={(e) => setEventTime(e.target.value)}
             className="w-full px-3 py-2 border rounded"
           />
+          <input
+            type="time"
+            value={eventEndTime}
+            onChange={(e) => setEventEndTime(e.target.value)}
+            className="w-full px-3 py-2 border rounded"
+          />
           <input
             type="text"
             placeholder="Event Venue"
@@ -107,6 +124,22 @@ const CreateEvent = () => {
             className="w-full px-3 py-2 border rounded col-span-full"
             rows="4"
           />
+          <input
+            type="number"
+            min="1"
+            placeholder="Registration Limit (default 100)"
+            value={registrationLimit}
+            onChange={(e) => setRegistrationLimit(e.target.value)}
+            className="w-full px-3 py-2 border rounded"
+          />
+          <label className="flex items-center space-x-2">
+            <input
+              type="checkbox"
+              checked={enableWaitlist}
+              onChange={(e) => setEnableWaitlist(e.target.checked)}
+            />
+            <span>Waitlist students once the limit is reached</span>
+          </label>
         </div>
 
         <div className="mt-6">
@@ -9,6 +9,7 @@ const ViewEvent = () => {
   const [event, setEvent] = useState(null);
   const [responses, setResponses] = useState([]);
   const [showResponses, setShowResponses] = useState(false);
+  const [counts, setCounts] = useState(null);
 
   useEffect(() => {
     const eventFromState = location.state?.event;
@@ -20,6 +21,21 @@ const ViewEvent = () => {
     }
   }, [event_id]);
 
+  // Once responses are shown, follow new registrations live
+  useEffect(() => {
+    if (!showResponses) return;
+    const lastId = responses.reduce((max, response) => Math.max(max, response.id), 0);
+    const source = new EventSource(`http://localhost:5000/api/events/application/live/${event_id}?after=${lastId}`);
+    source.addEventListener('registrations', (message) => {
+      const delta = JSON.parse(message.data);
+      setCounts(delta);
+      if (delta.submissions.length > 0) {
+        setResponses(current => [...current, ...delta.submissions]);
+      }
+    });
+    return () => source.close();
+  }, [showResponses, event_id]);
+
   const fetchEventDetails = async () => {
     try {
       const response = await fetch(`http://localhost:5000/api/events/details/${event_id}`);
@@ -163,6 +179,13 @@ const ViewEvent = () => {
           <div className="bg-white rounded-lg shadow mt-8">
             <div className="px-4 py-5 sm:px-6">
               <h3 className="text-lg font-medium leading-6 text-gray-900">Event Responses</h3>
+              {counts && (
+                <p className="mt-1 text-sm text-gray-500">
+                  {counts.registered} registered
+                  {counts.capacity !== null && `, ${counts.remaining} places left`}
+                  {counts.waitlisted > 0 && `, ${counts.waitlisted} waitlisted`}
+                </p>
+              )}
             </div>
             <div className="border-t border-gray-200">
               <table className="w-full divide-y divide-gray-200">
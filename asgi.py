@@ -0,0 +1,210 @@
+"""ASGI edition of the server.py API.
+
+    pip install uvicorn
+    uvicorn asgi:application --workers 4
+
+Every route keeps its URL and JSON contract because requests are still
+handled by the Flask app. The difference is where connections wait: the
+event loop reads request bodies and writes responses, so idle keep-alive
+connections and slow clients cost a coroutine rather than a thread. Only
+the Flask handler itself, the SQLite work, runs on a bounded thread pool
+of PESU_ASGI_THREADS threads.
+
+Identical GETs on the polling endpoints that arrive together share one
+trip to the database.
+"""
+import asyncio
+import contextvars
+import io
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from server import app, limit_waiting_requests, prepare_database, shutdown_worker, warm_worker
+
+ASGI_THREADS = int(os.environ.get('PESU_ASGI_THREADS', '32'))
+
+# Every executor thread may hold a pooled connection
+app.config['DB_POOL_SIZE'] = max(app.config['DB_POOL_SIZE'], ASGI_THREADS)
+# Live streams, long-polls and registration acks park an executor thread while they wait
+limit_waiting_requests(ASGI_THREADS)
+
+# Small JSON responses that many clients poll and that depend only on the URL
+COALESCED_PATHS = re.compile(
+    r'^/api/(events/application/\d+|recruitment/status/\d+|events/apply/status/[0-9a-f]+)$'
+)
+
+executor = ThreadPoolExecutor(max_workers=ASGI_THREADS, thread_name_prefix='asgi')
+_in_flight = {}
+
+def build_environ(scope, body):
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode().decode('latin-1'),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope['query_string'].decode('latin-1'),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    server = scope.get('server') or ('localhost', 80)
+    environ['SERVER_NAME'] = server[0]
+    environ['SERVER_PORT'] = str(server[1] or 80)
+    client = scope.get('client')
+    if client:
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = client[0], str(client[1])
+
+    for name, value in scope['headers']:
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = 'HTTP_' + name
+        environ[name] = f'{environ[name]},{value}' if name in environ else value
+    return environ
+
+class WSGICall:
+    """One request through the Flask app, every step run on the executor.
+
+    The steps share a copied context so Flask's context locals (pushed by
+    stream_with_context, for one) see the same state whichever executor
+    thread runs them.
+    """
+
+    def __init__(self, environ):
+        self.environ = environ
+        self.context = contextvars.copy_context()
+        self.status = None
+        self.headers = None
+        self._iterable = None
+        self._iterator = None
+
+    def _start_response(self, status, headers, exc_info=None):
+        self.status = int(status.split(' ', 1)[0])
+        self.headers = [(name.lower().encode('latin-1'), value.encode('latin-1'))
+                        for name, value in headers]
+
+    def _start(self):
+        self._iterable = app(self.environ, self._start_response)
+        self._iterator = iter(self._iterable)
+        return self._next()
+
+    def _next(self):
+        # Skip empty chunks; None marks the end of the body
+        for chunk in self._iterator:
+            if chunk:
+                return chunk
+        return None
+
+    def _close(self):
+        close = getattr(self._iterable, 'close', None)
+        if close is not None:
+            close()
+
+    async def run(self, func):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.context.run, func)
+
+    async def start(self):
+        return await self.run(self._start)
+
+    async def next(self):
+        return await self.run(self._next)
+
+    async def close(self):
+        await self.run(self._close)
+
+async def read_body(receive):
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+async def buffered_response(environ):
+    call = WSGICall(environ)
+    chunks = []
+    try:
+        chunk = await call.start()
+        while chunk is not None:
+            chunks.append(chunk)
+            chunk = await call.next()
+    finally:
+        await call.close()
+    return call.status, call.headers, b''.join(chunks)
+
+async def coalesced_response(scope, environ):
+    """Share one in-flight response among identical polling requests"""
+    key = (scope['path'], scope['query_string'], environ.get('HTTP_ORIGIN'))
+    future = _in_flight.get(key)
+    if future is None:
+        future = asyncio.ensure_future(buffered_response(environ))
+        _in_flight[key] = future
+        future.add_done_callback(lambda _: _in_flight.pop(key, None))
+    return await asyncio.shield(future)
+
+async def http(scope, receive, send):
+    body = await read_body(receive)
+    if body is None:
+        return
+    environ = build_environ(scope, body)
+
+    if scope['method'] == 'GET' and COALESCED_PATHS.match(scope['path']):
+        status, headers, content = await coalesced_response(scope, environ)
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': content})
+        return
+
+    call = WSGICall(environ)
+    try:
+        chunk = await call.start()
+        await send({'type': 'http.response.start', 'status': call.status, 'headers': call.headers})
+        if chunk is None:
+            await send({'type': 'http.response.body', 'body': b''})
+        # Streamed bodies (exports) are pulled one chunk at a time, so a slow
+        # reader holds a thread only while the next chunk is produced
+        while chunk is not None:
+            next_chunk = await call.next()
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': next_chunk is not None})
+            chunk = next_chunk
+    finally:
+        await call.close()
+
+async def lifespan(scope, receive, send):
+    loop = asyncio.get_running_loop()
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            try:
+                await loop.run_in_executor(executor, prepare_database)
+                await loop.run_in_executor(executor, warm_worker)
+            except Exception as e:
+                await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                return
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await loop.run_in_executor(executor, shutdown_worker)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+async def application(scope, receive, send):
+    if scope['type'] == 'http':
+        await http(scope, receive, send)
+    elif scope['type'] == 'lifespan':
+        await lifespan(scope, receive, send)
+    else:
+        raise NotImplementedError(f"Unsupported ASGI scope type: {scope['type']}")
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run('asgi:application', host=os.environ.get('PESU_HOST', '127.0.0.1'),
+                port=int(os.environ.get('PESU_PORT', '5000')),
+                workers=int(os.environ.get('PESU_WORKERS', '1')))
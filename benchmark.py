@@ -0,0 +1,412 @@
+"""Load-test the server.py API against a synthetic database.
+
+    python benchmark.py seed bench.db --clubs 50 --events 500 --applications 50000
+    python benchmark.py run --db bench.db --output results.json
+    python benchmark.py compare baseline.json results.json
+
+`run` seeds a throwaway database when --db is not given and drives the app
+both through Flask's test client and over real HTTP (pass --url to target a
+server that is already running on the seeded database). Every scenario
+reports p50/p95/p99 latency and throughput as JSON.
+"""
+import argparse
+import http.client
+import json
+import math
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+EVENT_FIELDS = [
+    {'label': 'Name', 'type': 'text', 'required': True},
+    {'label': 'SRN', 'type': 'text', 'required': True},
+    {'label': 'Email', 'type': 'email', 'required': True},
+    {'label': 'Semester', 'type': 'number', 'required': False},
+]
+
+VENUES = ['MRD Auditorium', 'Seminar Hall 1', 'Seminar Hall 2', 'Quadrangle', 'BE Block 4th Floor']
+
+def load_server(database):
+    """Import server.py bound to `database`; its config is read at import time"""
+    os.environ['PESU_DATABASE'] = database
+    import server
+    return server
+
+def applicant(rng, n):
+    srn = f'PES1UG{rng.randint(20, 25)}CS{n:05d}'
+    return {
+        'name': f'Student {n}',
+        'srn': srn,
+        'email': f'{srn.lower()}@pesu.pes.edu',
+        'semester': rng.randint(1, 8),
+    }
+
+def seed(server, database, clubs, events, applications, seed_value=0):
+    """Fill `database` with clubs, events and their registrations.
+
+    Half of the applications go to one flagship event so the download
+    scenario has a large export; the rest are spread across all events.
+    """
+    rng = random.Random(seed_value)
+    conn = sqlite3.connect(database)
+    conn.row_factory = sqlite3.Row
+    server.run_migrations(conn)
+    cursor = conn.cursor()
+
+    cursor.executemany('''
+        INSERT INTO clubs (club_name, club_email_id, password, club_description, club_logo_image)
+        VALUES (?, ?, ?, ?, ?)
+    ''', [(f'Club {i}', f'club{i}@pesu.pes.edu', 'password', f'Description of club {i}',
+           f'https://example.com/club{i}.png') for i in range(1, clubs + 1)])
+    cursor.execute('SELECT club_id FROM clubs ORDER BY club_id')
+    club_ids = [row[0] for row in cursor.fetchall()]
+
+    for club_id in club_ids[::2]:
+        server.create_form(cursor, 'recruitment', club_id, [{'label': 'Why Join', 'required': True}])
+        server.open_recruitment(cursor, club_id)
+
+    cursor.executemany('''
+        INSERT INTO events (club_id, event_name, event_description, event_date,
+                            event_image, event_time, event_venue)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', [(rng.choice(club_ids), f'Event {i}', f'Description of event {i}',
+           f'2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+           f'https://example.com/event{i}.png', f'{rng.randint(9, 18):02d}:00',
+           rng.choice(VENUES)) for i in range(1, events + 1)])
+    cursor.execute('SELECT event_id FROM events ORDER BY event_id')
+    event_ids = [row[0] for row in cursor.fetchall()]
+
+    counts = dict.fromkeys(event_ids, 0)
+    if event_ids:
+        counts[event_ids[0]] = applications // 2
+        for _ in range(applications - applications // 2):
+            counts[rng.choice(event_ids)] += 1
+
+    n = 0
+    for event_id in event_ids:
+        form_id = server.create_form(cursor, 'event', event_id, EVENT_FIELDS)
+        rows = []
+        for submission_id in range(1, counts[event_id] + 1):
+            n += 1
+            rows.append((form_id, submission_id, json.dumps(applicant(rng, n))))
+        cursor.executemany(
+            'INSERT INTO submissions (form_id, submission_id, data) VALUES (?, ?, ?)', rows
+        )
+        cursor.execute('''
+            UPDATE forms SET accepted_count = ?, last_submission_id = ? WHERE form_id = ?
+        ''', (len(rows), len(rows), form_id))
+
+    conn.commit()
+    conn.close()
+    return {'clubs': clubs, 'events': events, 'applications': applications, 'seed': seed_value}
+
+def flagship_event(database):
+    conn = sqlite3.connect(database)
+    try:
+        row = conn.execute('''
+            SELECT owner_id FROM forms WHERE kind = 'event'
+            ORDER BY accepted_count DESC, form_id LIMIT 1
+        ''').fetchone()
+    finally:
+        conn.close()
+    if not row:
+        raise SystemExit(f'{database} has no event forms; seed it first')
+    return row[0]
+
+class ClientDriver:
+    """In-process requests through Flask's test client, one client per thread"""
+
+    name = 'client'
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def request(self, method, path, body=None):
+        client = getattr(self._local, 'client', None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, json=body)
+        try:
+            return response.status_code, response.get_data()
+        finally:
+            response.close()
+
+    def close(self):
+        pass
+
+class HttpDriver:
+    """Keep-alive HTTP/1.1 connections, one per thread, to a live server.
+
+    Without a URL the app is served in-process by werkzeug's threaded server.
+    """
+
+    name = 'http'
+
+    def __init__(self, app=None, url=None):
+        self._server = None
+        if url is None:
+            from werkzeug.serving import WSGIRequestHandler, make_server
+
+            class QuietHandler(WSGIRequestHandler):
+                def log_request(self, *args, **kwargs):
+                    pass
+
+            self._server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=QuietHandler)
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            url = f'http://127.0.0.1:{self._server.server_port}'
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self._local = threading.local()
+
+    def _connection(self, fresh=False):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or fresh:
+            if conn is not None:
+                conn.close()
+            conn = self._local.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        return conn
+
+    def request(self, method, path, body=None):
+        headers = {}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        for attempt in range(2):
+            conn = self._connection(fresh=attempt > 0)
+            try:
+                conn.request(method, self.prefix + path, payload, headers)
+                response = conn.getresponse()
+                data = response.read()
+                if response.getheader('Connection', '').lower() == 'close':
+                    self._connection(fresh=True)
+                return response.status, data
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                if attempt:
+                    raise
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+
+def percentile(ordered, p):
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, max(math.ceil(p / 100 * len(ordered)) - 1, 0))]
+
+def run_load(driver, requests, concurrency, warmup=0):
+    """Issue `requests` (a list of (method, path, body)) over `concurrency` threads"""
+    for method, path, body in requests[:warmup]:
+        driver.request(method, path, body)
+    requests = requests[warmup:]
+
+    def timed(item):
+        method, path, body = item
+        started = time.perf_counter()
+        try:
+            status, data = driver.request(method, path, body)
+        except Exception as e:
+            return time.perf_counter() - started, type(e).__name__, 0
+        return time.perf_counter() - started, status, len(data)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        results = list(executor.map(timed, requests))
+    wall = time.perf_counter() - started
+
+    latencies = sorted(result[0] for result in results)
+    statuses = {}
+    for _, status, _ in results:
+        statuses[str(status)] = statuses.get(str(status), 0) + 1
+    return {
+        'requests': len(results),
+        'concurrency': concurrency,
+        'wall_seconds': round(wall, 4),
+        'throughput_rps': round(len(results) / wall, 2) if wall else None,
+        'bytes': sum(result[2] for result in results),
+        'status_codes': statuses,
+        'latency_ms': {
+            'p50': round(percentile(latencies, 50) * 1000, 3),
+            'p95': round(percentile(latencies, 95) * 1000, 3),
+            'p99': round(percentile(latencies, 99) * 1000, 3),
+            'mean': round(sum(latencies) / len(latencies) * 1000, 3),
+            'max': round(latencies[-1] * 1000, 3),
+        } if latencies else {},
+    }
+
+def homepage_scenario(driver, args, database):
+    paths = ['/api/recruiting-clubs', '/api/events', '/api/clubs']
+    requests = [('GET', paths[i % len(paths)], None) for i in range(args.requests)]
+    return run_load(driver, requests, args.concurrency, warmup=len(paths))
+
+def register_scenario(driver, args, database):
+    """A burst on a fresh event whose limit is three quarters of the burst, with a waitlist"""
+    conn = sqlite3.connect(database)
+    try:
+        club_id = conn.execute('SELECT MIN(club_id) FROM clubs').fetchone()[0]
+    finally:
+        conn.close()
+    status, data = driver.request('POST', '/api/events/create', {
+        'clubId': club_id, 'eventName': f'Burst {driver.name} {time.time_ns()}',
+        'eventDescription': 'Registration burst', 'eventDate': '2026-12-01',
+        'eventTime': '10:00', 'eventVenue': VENUES[0], 'eventFields': EVENT_FIELDS,
+        'registrationLimit': max(args.burst * 3 // 4, 1), 'enableWaitlist': True,
+        # Every run books the same slot
+        'onConflict': 'warn',
+    })
+    if status != 200:
+        raise RuntimeError(f'could not create the burst event (HTTP {status})')
+    event_id = json.loads(data)['eventId']
+
+    rng = random.Random(args.seed)
+    requests = [('POST', f'/api/events/apply/{event_id}', applicant(rng, n))
+                for n in range(args.burst)]
+    return run_load(driver, requests, args.concurrency)
+
+def download_scenario(driver, args, database):
+    path = f'/api/events/download_responses/{flagship_event(database)}'
+    requests = [('GET', path, None)] * args.downloads
+    return run_load(driver, requests, min(args.concurrency, args.downloads) or 1, warmup=1)
+
+SCENARIOS = {
+    'homepage': homepage_scenario,
+    'register': register_scenario,
+    'download': download_scenario,
+}
+
+def command_seed(args):
+    if os.path.exists(args.database):
+        raise SystemExit(f'{args.database} already exists')
+    server = load_server(args.database)
+    scale = seed(server, args.database, args.clubs, args.events, args.applications, args.seed)
+    print(json.dumps(scale))
+
+def command_run(args):
+    if args.url and not args.db:
+        raise SystemExit('--url needs --db, the database that server was started on')
+    database = args.db
+    scale = None
+    scratch = None
+    if database is None:
+        scratch = tempfile.TemporaryDirectory(prefix='pesu-bench-')
+        database = os.path.join(scratch.name, 'bench.db')
+    server = load_server(database)
+    if scratch is not None:
+        scale = seed(server, database, args.clubs, args.events, args.applications, args.seed)
+
+    transports = ['client', 'http'] if args.transport == 'both' else [args.transport]
+    if args.url:
+        transports = ['http']
+    results = {}
+    for transport in transports:
+        if transport == 'client':
+            driver = ClientDriver(server.app)
+        else:
+            driver = HttpDriver(server.app, args.url)
+        try:
+            for name in args.scenario or SCENARIOS:
+                key = f'{transport}.{name}'
+                print(f'running {key}', file=sys.stderr)
+                results[key] = SCENARIOS[name](driver, args, database)
+        finally:
+            driver.close()
+
+    report = {
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+        },
+        'scale': scale or {'database': database},
+        'settings': {
+            'requests': args.requests, 'burst': args.burst, 'downloads': args.downloads,
+            'concurrency': args.concurrency, 'url': args.url,
+        },
+        'scenarios': results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+    if scratch is not None:
+        server.get_pool().close_all()
+        scratch.cleanup()
+
+def command_compare(args):
+    """Print p95 and throughput changes; exit 1 if any p95 regressed past --threshold"""
+    with open(args.baseline) as f:
+        baseline = json.load(f)['scenarios']
+    with open(args.candidate) as f:
+        candidate = json.load(f)['scenarios']
+
+    regressed = False
+    print(f"{'scenario':<24}{'p95 ms':>22}{'change':>9}{'req/s':>22}{'change':>9}")
+    for key in sorted(set(baseline) & set(candidate)):
+        old, new = baseline[key], candidate[key]
+        old_p95, new_p95 = old['latency_ms']['p95'], new['latency_ms']['p95']
+        old_rps, new_rps = old['throughput_rps'], new['throughput_rps']
+        p95_change = (new_p95 - old_p95) / old_p95 if old_p95 else 0.0
+        rps_change = (new_rps - old_rps) / old_rps if old_rps else 0.0
+        flag = ''
+        if p95_change > args.threshold:
+            regressed = True
+            flag = '  REGRESSED'
+        print(f'{key:<24}{old_p95:>10.2f} -> {new_p95:<8.2f}{p95_change:>+9.1%}'
+              f'{old_rps:>10.1f} -> {new_rps:<8.1f}{rps_change:>+9.1%}{flag}')
+    sys.exit(1 if regressed else 0)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the PESU clubs and events API')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def add_scale(command):
+        command.add_argument('--clubs', type=int, default=50)
+        command.add_argument('--events', type=int, default=500)
+        command.add_argument('--applications', type=int, default=50000)
+        command.add_argument('--seed', type=int, default=0)
+
+    seed_command = commands.add_parser('seed', help='create a synthetic database')
+    seed_command.add_argument('database')
+    add_scale(seed_command)
+    seed_command.set_defaults(handler=command_seed)
+
+    run_command = commands.add_parser('run', help='run the load scenarios')
+    run_command.add_argument('--db', help='seeded database to use (default: a fresh temporary one)')
+    run_command.add_argument('--url', help='benchmark a running server instead of an in-process one')
+    run_command.add_argument('--transport', choices=['client', 'http', 'both'], default='both')
+    run_command.add_argument('--scenario', action='append', choices=list(SCENARIOS))
+    run_command.add_argument('--requests', type=int, default=600, help='homepage requests')
+    run_command.add_argument('--burst', type=int, default=2000, help='registrations per burst')
+    run_command.add_argument('--downloads', type=int, default=20, help='CSV downloads')
+    run_command.add_argument('--concurrency', type=int, default=16)
+    run_command.add_argument('--output', help='write the JSON report here instead of stdout')
+    add_scale(run_command)
+    run_command.set_defaults(handler=command_run)
+
+    compare_command = commands.add_parser('compare', help='diff two JSON reports')
+    compare_command.add_argument('baseline')
+    compare_command.add_argument('candidate')
+    compare_command.add_argument('--threshold', type=float, default=0.10,
+                                 help='p95 increase that counts as a regression (default 0.10)')
+    compare_command.set_defaults(handler=command_compare)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+if __name__ == '__main__':
+    main()
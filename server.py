@@ -1,890 +1,4580 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
-import sqlite3
-
-app = Flask(__name__)
-CORS(app)
-
-def get_db_connection():
-    conn = sqlite3.connect('dbms_project.db')
-    conn.row_factory = sqlite3.Row
-    return conn
-
-@app.route('/api/login', methods=['POST'])
-def login():
-    data = request.json
-    email = data.get('email')
-    password = data.get('password')
-    
-    if not email or not password:
-        return jsonify({'success': False, 'message': 'Email and password are required'}), 400
-    
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Query to check if email and password match
-        cursor.execute('''
-            SELECT club_id, club_name, club_email_id, club_description, club_logo_image 
-            FROM clubs 
-            WHERE club_email_id = ? AND password = ?
-        ''', (email, password))
-        
-        club = cursor.fetchone()
-        conn.close()
-        
-        if club:
-            return jsonify({
-                'success': True,
-                'message': 'Login successful',
-                'club': dict(club)
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Invalid email or password'
-            }), 401
-            
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': 'An error occurred during login'
-        }), 500
-
-@app.route('/api/club/<int:club_id>', methods=['GET'])
-def get_club_details(club_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT club_id, club_name, club_description, club_logo_image 
-            FROM clubs 
-            WHERE club_id = ?
-        ''', (club_id,))
-        
-        club = cursor.fetchone()
-        conn.close()
-        
-        if club:
-            return jsonify({
-                'success': True,
-                'club': dict(club)
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Club not found'
-            }), 404
-            
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': 'An error occurred while fetching club details'
-        }), 500
-
-@app.route('/api/events/<int:club_id>', methods=['GET'])
-def get_club_events(club_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if table exists first
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='events'")
-        if not cursor.fetchone():
-            return jsonify({
-                'success': False,
-                'message': 'Events table does not exist'
-            }), 500
-        
-        cursor.execute('''
-            SELECT 
-            e.event_id, 
-            e.event_name, 
-            e.event_image, 
-            e.event_date, 
-            e.event_time, 
-            e.event_venue, 
-            c.club_name 
-        FROM 
-            events e
-        JOIN 
-            clubs c 
-        ON 
-            e.club_id = c.club_id
-        WHERE 
-            e.club_id = ?;
-
-        ''', (club_id,))
-        
-        events = cursor.fetchall()
-        conn.close()
-        
-        # Convert events to list of dictionaries
-        column_names = ['event_id', 'event_name', 'event_image', 'event_date', 'event_time', 'event_venue']
-        events = [dict(zip(column_names, event)) for event in events]
-        
-        return jsonify({
-            'success': True,
-            'events': events
-        })
-            
-    except Exception as e:
-        print(f"Error fetching events: {str(e)}")  # Log the actual error
-        return jsonify({
-            'success': False,
-            'message': f'An error occurred: {str(e)}'
-        }), 500
-    
-@app.route('/api/recruitment/create', methods=['POST'])
-def create_recruitment_form():
-    data = request.json
-    club_id = data.get('clubId')
-    club_name = data.get('clubName')
-    fields = data.get('fields')
-
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Remove existing recruitment form if it exists
-        table_name = f"{club_name.lower().replace(' ', '_')}_recruitments"
-        cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-
-        # Create dynamic table based on fields
-        create_table_query = f"CREATE TABLE {table_name} (id INTEGER PRIMARY KEY AUTOINCREMENT"
-        for field in fields:
-            field_type = 'TEXT'
-            if field['type'] == 'number':
-                field_type = 'REAL'
-            elif field['type'] == 'email':
-                field_type = 'TEXT'
-            
-            create_table_query += f", {field['label'].lower().replace(' ', '_')} {field_type} {'NOT NULL' if field['required'] else ''}"
-        
-        create_table_query += ")"
-        
-        cursor.execute(create_table_query)
-        conn.commit()
-        conn.close()
-
-        return jsonify({'success': True, 'message': 'Recruitment form created successfully'})
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
-
-@app.route('/api/recruitment/status/<int:club_id>', methods=['GET'])
-def check_recruitment_status(club_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get club name for table name generation
-        cursor.execute('SELECT club_name FROM clubs WHERE club_id = ?', (club_id,))
-        club = cursor.fetchone()
-        
-        if not club:
-            return jsonify({'success': False, 'message': 'Club not found'}), 404
-
-        table_name = f"{club['club_name'].lower().replace(' ', '_')}_recruitments"
-
-        # Check if table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        exists = cursor.fetchone() is not None
-        
-        conn.close()
-        return jsonify({'success': True, 'exists': exists})
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
-
-@app.route('/api/recruitment/responses/<int:club_id>', methods=['GET'])
-def get_recruitment_responses(club_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get club name for table name generation
-        cursor.execute('SELECT club_name FROM clubs WHERE club_id = ?', (club_id,))
-        club = cursor.fetchone()
-        
-        if not club:
-            return jsonify({'success': False, 'message': 'Club not found'}), 404
-
-        table_name = f"{club['club_name'].lower().replace(' ', '_')}_recruitments"
-
-        # Dynamically fetch all rows from the applications table
-        cursor.execute(f"SELECT * FROM {table_name}")
-        responses = cursor.fetchall()
-        
-        # Convert responses to dictionary
-        if responses:
-            column_names = [description[0] for description in cursor.description]
-            responses = [dict(zip(column_names, response)) for response in responses]
-        
-        conn.close()
-        return jsonify({'success': True, 'responses': responses})
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
-
-@app.route('/api/events/create', methods=['POST'])
-def create_event():
-    data = request.json
-    club_id = data.get('clubId')
-    event_name = data.get('eventName')
-    event_image = data.get('eventImage')
-    event_date = data.get('eventDate')
-    event_time = data.get('eventTime')
-    event_venue = data.get('eventVenue')
-    event_description = data.get('eventDescription')
-    event_fields = data.get('eventFields', [])
-
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Insert event into events table
-        cursor.execute('''
-            INSERT INTO events (club_id, event_name, event_description, event_date, event_image, event_time, event_venue) 
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (club_id, event_name, event_description, event_date, event_image, event_time, event_venue))
-        event_id = cursor.lastrowid
-
-        # Create dynamic event application table
-        table_name = f"{event_name.lower().replace(' ', '_')}_applications"
-        cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-
-        # Create table for event applications
-        create_table_query = f"CREATE TABLE {table_name} (id INTEGER PRIMARY KEY AUTOINCREMENT"
-        for field in event_fields:
-            field_type = 'TEXT'
-            if field['type'] == 'number':
-                field_type = 'REAL'
-            elif field['type'] == 'email':
-                field_type = 'TEXT'
-            
-            create_table_query += f", {field['label'].lower().replace(' ', '_')} {field_type} {'NOT NULL' if field['required'] else ''}"
-        
-        create_table_query += ")"
-        
-        cursor.execute(create_table_query)
-        conn.commit()
-        conn.close()
-
-        return jsonify({
-            'success': True, 
-            'message': 'Event created successfully', 
-            'eventId': event_id
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
-
-@app.route('/api/events/application/<int:event_id>', methods=['GET'])
-def get_event_application_status(event_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get event name for table name generation
-        cursor.execute('SELECT event_name FROM events WHERE event_id = ?', (event_id,))
-        event = cursor.fetchone()
-        
-        if not event:
-            return jsonify({'success': False, 'message': 'Event not found'}), 404
-
-        table_name = f"{event['event_name'].lower().replace(' ', '_')}_applications"
-
-        # Check if table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        exists = cursor.fetchone() is not None
-        
-        conn.close()
-        return jsonify({'success': True, 'exists': exists})
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
-
-@app.route('/api/events/application/responses/<int:event_id>', methods=['GET'])
-def get_event_application_responses(event_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get event name for table name generation
-        cursor.execute('SELECT event_name FROM events WHERE event_id = ?', (event_id,))
-        event = cursor.fetchone()
-        
-        if not event:
-            return jsonify({'success': False, 'message': 'Event not found'}), 404
-
-        table_name = f"{event['event_name'].lower().replace(' ', '_')}_applications"
-
-        # Dynamically fetch all rows from the applications table
-        cursor.execute(f"SELECT * FROM {table_name}")
-        responses = cursor.fetchall()
-        
-        # Convert responses to dictionary
-        if responses:
-            column_names = [description[0] for description in cursor.description]
-            responses = [dict(zip(column_names, response)) for response in responses]
-        
-        conn.close()
-        return jsonify({'success': True, 'responses': responses})
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
-
-@app.route('/api/events/details/<int:event_id>', methods=['GET'])
-def get_event_details(event_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT event_id, event_name, event_description, event_image, event_date, event_time, event_venue 
-            FROM events 
-            WHERE event_id = ?
-        ''', (event_id,))
-        
-        event = cursor.fetchone()
-        conn.close()
-        
-        if event:
-            # Convert event to dictionary with column names
-            column_names = ['event_id', 'event_name', 'event_description', 'event_image', 'event_date', 'event_time', 'event_venue']
-            event_dict = dict(zip(column_names, event))
-            
-            return jsonify({
-                'success': True,
-                'event': event_dict
-            })
-        else:
-            return jsonify({
-                'success': False,
-                'message': 'Event not found'
-            }), 404
-            
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'An error occurred while fetching event details: {str(e)}'
-        }), 500
-    
-@app.route('/api/clubs', methods=['GET'])
-def get_all_clubs():
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Fetch all clubs
-        cursor.execute('''
-            SELECT club_id, club_name, club_description, club_logo_image 
-            FROM clubs 
-        ''')
-        
-        clubs = cursor.fetchall()
-        conn.close()
-        
-        # Convert clubs to list of dictionaries
-        column_names = ['club_id', 'club_name', 'club_description', 'club_logo_image']
-        clubs = [dict(zip(column_names, club)) for club in clubs]
-        
-        return jsonify({
-            'success': True,
-            'clubs': clubs
-        })
-            
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': 'An error occurred while fetching clubs'
-        }), 500
-
-@app.route('/api/events', methods=['GET'])
-def get_all_events():
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Check if table exists first
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='events'")
-        if not cursor.fetchone():
-            return jsonify({
-                'success': False,
-                'message': 'Events table does not exist'
-            }), 500
-        
-        # Fetch all events with club name
-        cursor.execute('''
-            SELECT 
-                events.event_id, 
-                events.event_name, 
-                events.event_image, 
-                events.event_date, 
-                events.event_time, 
-                events.event_venue,
-                clubs.club_name
-            FROM events 
-            JOIN clubs ON events.club_id = clubs.club_id
-        ''')
-        
-        events = cursor.fetchall()
-        conn.close()
-        
-        # Convert events to list of dictionaries
-        column_names = [
-            'event_id', 
-            'event_name', 
-            'event_image', 
-            'event_date', 
-            'event_time', 
-            'event_venue',
-            'club_name'
-        ]
-        events = [dict(zip(column_names, event)) for event in events]
-        
-        return jsonify({
-            'success': True,
-            'events': events
-        })
-            
-    except Exception as e:
-        print(f"Error fetching events: {str(e)}")  # Log the actual error
-        return jsonify({
-            'success': False,
-            'message': f'An error occurred: {str(e)}'
-        }), 500
-    
-def create_registration_trigger(cursor, event_name):
-    """Create or replace trigger for registration limit"""
-    table_name = f"{event_name.lower().replace(' ', '_')}_applications"
-    trigger_name = f"check_registration_limit_{table_name}"
-    
-    # Drop existing trigger if it exists
-    cursor.execute(f"""
-        DROP TRIGGER IF EXISTS {trigger_name};
-    """)
-    
-    # Create new trigger
-    cursor.execute(f"""
-        CREATE TRIGGER {trigger_name}
-        BEFORE INSERT ON {table_name}
-        BEGIN
-            SELECT
-                CASE
-                    WHEN (SELECT COUNT(*) FROM {table_name}) >= 3
-                    THEN RAISE(ABORT, 'Registration limit reached. Maximum 3 applications allowed.')
-                END;
-        END;
-    """)
-
-@app.route('/api/events/apply/<int:event_id>', methods=['POST'])
-def submit_event_application(event_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get event name for table name generation
-        cursor.execute('SELECT event_name FROM events WHERE event_id = ?', (event_id,))
-        event = cursor.fetchone()
-        
-        if not event:
-            return jsonify({'success': False, 'message': 'Event not found'}), 404
-
-        # Generate table name based on event name
-        table_name = f"{event['event_name'].lower().replace(' ', '_')}_applications"
-        
-        # Ensure trigger exists
-        create_registration_trigger(cursor, event['event_name'])
-        
-        # Get application data from request
-        data = request.json
-        
-        try:
-            # Dynamically build insert query
-            columns = list(data.keys())
-            placeholders = ','.join(['?' for _ in columns])
-            values = [data[col] for col in columns]
-            
-            query = f"INSERT INTO {table_name} ({','.join(columns)}) VALUES ({placeholders})"
-            
-            cursor.execute(query, values)
-            conn.commit()
-            
-            return jsonify({
-                'success': True,
-                'message': 'Application submitted successfully'
-            })
-            
-        except sqlite3.IntegrityError as e:
-            if 'Registration limit reached' in str(e):
-                return jsonify({
-                    'success': False,
-                    'message': 'Registration limit reached. Maximum 100 applications allowed.'
-                }), 400
-            raise e
-            
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
-    finally:
-        conn.close()
-
-# Update event details route to include application form fields
-@app.route('/api/events_student/details/<int:event_id>', methods=['GET'])
-def get_event_details_student(event_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Fetch event details
-        cursor.execute('''
-            SELECT event_id, event_name, event_description, event_image, 
-                   event_date, event_time, event_venue, club_id
-            FROM events 
-            WHERE event_id = ?
-        ''', (event_id,))
-        
-        event = cursor.fetchone()
-        
-        if not event:
-            return jsonify({
-                'success': False,
-                'message': 'Event not found'
-            }), 404
-        
-        # Generate table name for event applications
-        table_name = f"{event[1].lower().replace(' ', '_')}_applications"
-        print(table_name)
-        
-        # Check if applications table exists and get its columns
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = cursor.fetchall()
-        
-        # Convert columns to form fields
-        form_fields = []
-        for column in columns[1:]:  # Skip the first column (id)
-            field_name = column[1]
-            form_fields.append({
-                'label': ' '.join(word.capitalize() for word in field_name.split('_')),
-                'name': field_name,
-                'type': 'text'  # You might want to enhance this logic based on column type
-            })
-        
-        conn.close()
-        
-        # Convert event to dictionary with column names
-        column_names = ['event_id', 'event_name', 'event_description', 'event_image', 
-                        'event_date', 'event_time', 'event_venue', 'club_id']
-        event_dict = dict(zip(column_names, event))
-        print(form_fields)
-        
-        return jsonify({
-            'success': True,
-            'event': event_dict,
-            'applicationFields': form_fields
-        })
-            
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'An error occurred while fetching event details: {str(e)}'
-        }), 500
-
-@app.route('/api/recruiting-clubs', methods=['GET'])
-def get_recruiting_clubs():
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Find clubs with recruitment tables
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = cursor.fetchall()
-        
-        recruiting_clubs = []
-        for table in tables:
-            table_name = table[0]
-            if table_name.endswith('_recruitments'):
-                # Extract club name from table name
-                club_name = ' '.join(table_name.split('_')[:-1]).title()
-                
-                # Fetch club details
-                cursor.execute('''
-                    SELECT club_id, club_name, club_logo_image 
-                    FROM clubs 
-                    WHERE club_name = ?
-                ''', (club_name,))
-                
-                club = cursor.fetchone()
-                if club:
-                    recruiting_clubs.append(dict(zip(
-                        ['club_id', 'club_name', 'club_logo_image'], 
-                        club
-                    )))
-        
-        conn.close()
-        
-        return jsonify({
-            'success': True,
-            'clubs': recruiting_clubs
-        })
-            
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'An error occurred: {str(e)}'
-        }), 500
-
-@app.route('/api/recruitment/details/<int:club_id>', methods=['GET'])
-def get_recruitment_form_details(club_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get club name for table name generation
-        cursor.execute('SELECT club_name FROM clubs WHERE club_id = ?', (club_id,))
-        club = cursor.fetchone()
-        
-        if not club:
-            return jsonify({'success': False, 'message': 'Club not found'}), 404
-
-        table_name = f"{club['club_name'].lower().replace(' ', '_')}_recruitments"
-
-        # Check if table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table_name,))
-        exists = cursor.fetchone()
-        
-        if not exists:
-            return jsonify({'success': False, 'message': 'No recruitment form found'}), 404
-
-        # Get table columns
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = cursor.fetchall()
-        
-        # Convert columns to form fields
-        form_fields = []
-        for column in columns[1:]:  # Skip the first column (id)
-            field_name = column[1]
-            field_type = 'text'  # Default to text
-            if 'real' in column[2].lower():
-                field_type = 'number'
-            elif 'email' in field_name.lower():
-                field_type = 'email'
-            
-            form_fields.append({
-                'label': ' '.join(word.capitalize() for word in field_name.split('_')),
-                'name': field_name,
-                'type': field_type,
-                'required': 'notnull' in column[2].lower()
-            })
-        
-        conn.close()
-        
-        return jsonify({
-            'success': True,
-            'fields': form_fields
-        })
-            
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'message': f'An error occurred: {str(e)}'
-        }), 500
-
-@app.route('/api/recruitment/apply/<int:club_id>', methods=['POST'])
-def submit_recruitment_application(club_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get club name for table name generation
-        cursor.execute('SELECT club_name FROM clubs WHERE club_id = ?', (club_id,))
-        club = cursor.fetchone()
-        
-        if not club:
-            return jsonify({'success': False, 'message': 'Club not found'}), 404
-
-        # Generate table name based on club name
-        table_name = f"{club['club_name'].lower().replace(' ', '_')}_recruitments"
-
-        # Get application data from request
-        data = request.json
-        
-        # Dynamically build insert query
-        columns = list(data.keys())
-        placeholders = ','.join(['?' for _ in columns])
-        values = [data[col] for col in columns]
-        
-        query = f"INSERT INTO {table_name} ({','.join(columns)}) VALUES ({placeholders})"
-        
-        cursor.execute(query, values)
-        conn.commit()
-        conn.close()
-
-        return jsonify({
-            'success': True, 
-            'message': 'Application submitted successfully'
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
-    
-# Add these imports at the top of the file
-import csv
-import io
-from flask import send_file
-
-# Add these new routes to the existing Flask app
-
-@app.route('/api/events/close_registrations/<int:event_id>', methods=['POST'])
-def close_event_registrations(event_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get event name for table name generation
-        cursor.execute('SELECT event_name FROM events WHERE event_id = ?', (event_id,))
-        event = cursor.fetchone()
-        
-        if not event:
-            return jsonify({'success': False, 'message': 'Event not found'}), 404
-
-        # Generate table name based on event name
-        table_name = f"{event['event_name'].lower().replace(' ', '_')}_applications"
-
-        # Drop the applications table
-        cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-        conn.commit()
-        conn.close()
-
-        return jsonify({
-            'success': True, 
-            'message': 'Event registrations closed successfully'
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
-
-@app.route('/api/events/download_responses/<int:event_id>', methods=['GET'])
-def download_event_responses(event_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get event name for table name generation
-        cursor.execute('SELECT event_name FROM events WHERE event_id = ?', (event_id,))
-        event = cursor.fetchone()
-        
-        if not event:
-            return jsonify({'success': False, 'message': 'Event not found'}), 404
-
-        # Generate table name based on event name
-        table_name = f"{event['event_name'].lower().replace(' ', '_')}_applications"
-
-        # Fetch all rows from the applications table
-        cursor.execute(f"SELECT * FROM {table_name}")
-        responses = cursor.fetchall()
-        
-        # Get column names
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = cursor.fetchall()
-        column_names = [column[1] for column in columns]
-        conn.close()
-
-        # Create a CSV file in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write headers
-        writer.writerow(column_names)
-        
-        # Write data rows
-        for response in responses:
-            writer.writerow(response)
-        
-        # Create a file-like object from the CSV content
-        output.seek(0)
-        mem_file = io.BytesIO(output.getvalue().encode('utf-8'))
-        
-        return send_file(
-            mem_file, 
-            mimetype='text/csv', 
-            as_attachment=True, 
-            download_name=f"{event['event_name']}_responses.csv"
-        )
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
-
-@app.route('/api/recruitment/close/<int:club_id>', methods=['POST'])
-def close_club_recruitments(club_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get club name for table name generation
-        cursor.execute('SELECT club_name FROM clubs WHERE club_id = ?', (club_id,))
-        club = cursor.fetchone()
-        
-        if not club:
-            return jsonify({'success': False, 'message': 'Club not found'}), 404
-
-        # Generate table name based on club name
-        table_name = f"{club['club_name'].lower().replace(' ', '_')}_recruitments"
-
-        # Drop the recruitments table
-        cursor.execute(f"DROP TABLE IF EXISTS {table_name}")
-        conn.commit()
-        conn.close()
-
-        return jsonify({
-            'success': True, 
-            'message': 'Club recruitments closed successfully'
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
-
-@app.route('/api/recruitment/download_responses/<int:club_id>', methods=['GET'])
-def download_club_recruitment_responses(club_id):
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        # Get club name for table name generation
-        cursor.execute('SELECT club_name FROM clubs WHERE club_id = ?', (club_id,))
-        club = cursor.fetchone()
-        
-        if not club:
-            return jsonify({'success': False, 'message': 'Club not found'}), 404
-
-        # Generate table name based on club name
-        table_name = f"{club['club_name'].lower().replace(' ', '_')}_recruitments"
-
-        # Fetch all rows from the recruitments table
-        cursor.execute(f"SELECT * FROM {table_name}")
-        responses = cursor.fetchall()
-        
-        # Get column names
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = cursor.fetchall()
-        column_names = [column[1] for column in columns]
-        conn.close()
-
-        # Create a CSV file in memory
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write headers
-        writer.writerow(column_names)
-        
-        # Write data rows
-        for response in responses:
-            writer.writerow(response)
-        
-        # Create a file-like object from the CSV content
-        output.seek(0)
-        mem_file = io.BytesIO(output.getvalue().encode('utf-8'))
-        
-        return send_file(
-            mem_file, 
-            mimetype='text/csv', 
-            as_attachment=True, 
-            download_name=f"{club['club_name']}_recruitment_responses.csv"
-        )
-    except Exception as e:
-        return jsonify({'success': False, 'message': str(e)}), 500
-    
-if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+from flask import Flask, request, jsonify, g, make_response, send_file
+from flask.json.provider import DefaultJSONProvider
+from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+import atexit
+import base64
+import bisect
+import binascii
+import click
+import contextvars
+import cProfile
+import functools
+import hashlib
+import itertools
+import json
+import marshal
+import math
+import os
+import pstats
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from urllib.parse import unquote_to_bytes
+
+app = Flask(__name__)
+CORS(app)
+
+app.config.from_mapping(
+    DATABASE=os.environ.get('PESU_DATABASE', 'dbms_project.db'),
+    # Uploaded images, named by content hash
+    BLOB_DIR=os.environ.get('PESU_BLOB_DIR', 'blobs'),
+    # Responses of closed forms, one compressed SQLite file per term
+    ARCHIVE_DIR=os.environ.get('PESU_ARCHIVE_DIR', 'archive'),
+    ARCHIVE_ON_CLOSE=os.environ.get('PESU_ARCHIVE_ON_CLOSE', '1') == '1',
+    ARCHIVE_SEGMENT_ROWS=int(os.environ.get('PESU_ARCHIVE_SEGMENT_ROWS', '1000')),
+    MAX_IMAGE_BYTES=int(os.environ.get('PESU_MAX_IMAGE_BYTES', str(10 * 1024 * 1024))),
+    THUMBNAIL_WIDTH=int(os.environ.get('PESU_THUMBNAIL_WIDTH', '480')),
+    # Base of the image URLs stored in the catalog; defaults to the URL the request came in on
+    PUBLIC_URL=os.environ.get('PESU_PUBLIC_URL', '').rstrip('/'),
+    DB_POOL_SIZE=int(os.environ.get('PESU_DB_POOL_SIZE', '16')),
+    DB_POOL_TIMEOUT=float(os.environ.get('PESU_DB_POOL_TIMEOUT', '30')),
+    # How long a connection waits on another process's write lock before failing
+    DB_BUSY_TIMEOUT=float(os.environ.get('PESU_DB_BUSY_TIMEOUT', '5')),
+    DB_MIGRATION_TIMEOUT=float(os.environ.get('PESU_DB_MIGRATION_TIMEOUT', '300')),
+    CATALOG_CACHE_SIZE=int(os.environ.get('PESU_CATALOG_CACHE_SIZE', '1024')),
+    CATALOG_CACHE_TTL=float(os.environ.get('PESU_CATALOG_CACHE_TTL', '300')),
+    CATALOG_MAX_AGE=int(os.environ.get('PESU_CATALOG_MAX_AGE', '0')),
+    # Seconds between checks for catalog changes made by other worker processes
+    CACHE_SYNC_INTERVAL=float(os.environ.get('PESU_CACHE_SYNC_INTERVAL', '1')),
+    FORM_REGISTRY_SIZE=int(os.environ.get('PESU_FORM_REGISTRY_SIZE', '4096')),
+    MAX_PAGE_SIZE=int(os.environ.get('PESU_MAX_PAGE_SIZE', '200')),
+    SEARCH_PAGE_SIZE=int(os.environ.get('PESU_SEARCH_PAGE_SIZE', '20')),
+    MAX_IMPORT_ROWS=int(os.environ.get('PESU_MAX_IMPORT_ROWS', '10000')),
+    BATCH_MAX_REQUESTS=int(os.environ.get('PESU_BATCH_MAX_REQUESTS', '20')),
+    # Minutes an event occupies its venue when no end time is given
+    EVENT_DEFAULT_DURATION=int(os.environ.get('PESU_EVENT_DEFAULT_DURATION', '120')),
+    # What creating an event in an already-booked venue slot does: reject or warn
+    VENUE_CONFLICTS=os.environ.get('PESU_VENUE_CONFLICTS', 'reject'),
+    # Fields that identify a student, used as a form's uniqueness key unless it names its own
+    DEDUP_FIELDS=tuple(name.strip() for name in os.environ.get('PESU_DEDUP_FIELDS', 'srn,email').split(',') if name.strip()),
+    DEFAULT_REGISTRATION_LIMIT=int(os.environ.get('PESU_DEFAULT_REGISTRATION_LIMIT', '100')),
+    REGISTRATION_QUEUE_ENABLED=os.environ.get('PESU_REGISTRATION_QUEUE', '1') == '1',
+    REGISTRATION_QUEUE_SIZE=int(os.environ.get('PESU_REGISTRATION_QUEUE_SIZE', '10000')),
+    REGISTRATION_BATCH_SIZE=int(os.environ.get('PESU_REGISTRATION_BATCH_SIZE', '256')),
+    REGISTRATION_BATCH_DELAY=float(os.environ.get('PESU_REGISTRATION_BATCH_DELAY', '0.002')),
+    REGISTRATION_ACK_TIMEOUT=float(os.environ.get('PESU_REGISTRATION_ACK_TIMEOUT', '5')),
+    # Requests waiting for the writer at once; the rest answer 202 with their ticket straight away
+    REGISTRATION_MAX_WAITERS=int(os.environ.get('PESU_REGISTRATION_MAX_WAITERS', '32')),
+    # Seconds registration outcomes stay in registration_tickets
+    REGISTRATION_TICKET_TTL=float(os.environ.get('PESU_REGISTRATION_TICKET_TTL', str(7 * 24 * 3600))),
+    # Live registration streams
+    LIVE_POLL_INTERVAL=float(os.environ.get('PESU_LIVE_POLL_INTERVAL', '2')),
+    LIVE_KEEPALIVE=float(os.environ.get('PESU_LIVE_KEEPALIVE', '15')),
+    LIVE_STREAM_DURATION=float(os.environ.get('PESU_LIVE_STREAM_DURATION', '300')),
+    # Per process, like REGISTRATION_MAX_WAITERS; serve and asgi.py lower both
+    # to a quarter of their request threads
+    LIVE_MAX_STREAMS=int(os.environ.get('PESU_LIVE_MAX_STREAMS', '32')),
+    LIVE_MAX_WAIT=float(os.environ.get('PESU_LIVE_MAX_WAIT', '30')),
+    LIVE_BATCH_SIZE=int(os.environ.get('PESU_LIVE_BATCH_SIZE', '200')),
+    # ?__profile=1 (or an X-Profile header) returns a cProfile report instead of the response
+    PROFILING_ENABLED=os.environ.get('PESU_PROFILING') == '1',
+)
+
+# Applied once to every new connection, not on every checkout
+SQLITE_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('mmap_size', 256 * 1024 * 1024),
+    ('cache_size', -16000),  # negative means KiB, so ~16 MB of page cache
+    ('temp_store', 'MEMORY'),
+)
+
+class PoolTimeout(Exception):
+    pass
+
+class ConnectionPool:
+    """Bounded pool of tuned SQLite connections shared by the request threads.
+
+    A thread gets back the connection it released last whenever it is still
+    idle, so its page cache and prepared statement cache stay warm.
+    """
+
+    def __init__(self, database, max_size=16, timeout=30.0, busy_timeout=5.0, pragmas=SQLITE_PRAGMAS):
+        self.database = database
+        self.max_size = max_size
+        self.timeout = timeout
+        self.busy_timeout = busy_timeout
+        self.pragmas = pragmas
+        self._idle = []
+        self._size = 0
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+
+    def connect(self):
+        """A new tuned connection that is owned by the caller, not the pool"""
+        conn = sqlite3.connect(self.database, timeout=self.busy_timeout, check_same_thread=False,
+                               cached_statements=256, factory=InstrumentedConnection)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas:
+            conn.execute(f"PRAGMA {name} = {value}")
+        return conn
+
+    def _take_idle(self):
+        # Prefer the connection this thread used last
+        conn = getattr(self._local, 'conn', None)
+        for i in range(len(self._idle) - 1, -1, -1):
+            if self._idle[i] is conn:
+                return self._idle.pop(i)
+        return self._idle.pop()
+
+    def acquire(self):
+        with self._cond:
+            if not self._idle and self._size >= self.max_size:
+                self.waits += 1
+                started = time.perf_counter()
+                deadline = started + self.timeout
+                while not self._idle and self._size >= self.max_size:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        self.wait_seconds += time.perf_counter() - started
+                        raise PoolTimeout(f'No database connection available after {self.timeout}s')
+                    self._cond.wait(remaining)
+                self.wait_seconds += time.perf_counter() - started
+
+            if self._idle:
+                self.hits += 1
+                conn = self._take_idle()
+                self._local.conn = conn
+                return conn
+
+            self.misses += 1
+            self._size += 1
+
+        try:
+            conn = self.connect()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        self._local.conn = conn
+        return conn
+
+    def release(self, conn):
+        try:
+            # Never hand out a connection with a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            return
+        with self._cond:
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def close_all(self):
+        with self._cond:
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'waits': self.waits,
+                'wait_seconds': round(self.wait_seconds, 6),
+            }
+
+_pool_lock = threading.Lock()
+
+def create_pool():
+    return ConnectionPool(
+        app.config['DATABASE'],
+        max_size=app.config['DB_POOL_SIZE'],
+        timeout=app.config['DB_POOL_TIMEOUT'],
+        busy_timeout=app.config['DB_BUSY_TIMEOUT'],
+    )
+
+def migration_connection():
+    conn = create_pool().connect()
+    # Long enough to wait out another process's migration
+    conn.execute(f"PRAGMA busy_timeout = {int(app.config['DB_MIGRATION_TIMEOUT'] * 1000)}")
+    return conn
+
+def prepare_database():
+    """Create or upgrade the schema on a throwaway connection.
+
+    `serve` runs this once in the parent process, so workers start with
+    the schema in place and hold no connection inherited across fork().
+    """
+    conn = migration_connection()
+    try:
+        for version, name in run_migrations(conn):
+            app.logger.info('Applied migration %d: %s', version, name)
+    finally:
+        conn.close()
+    app.extensions['db_schema_ready'] = True
+
+def get_pool():
+    pool = app.extensions.get('db_pool')
+    if pool is None:
+        with _pool_lock:
+            pool = app.extensions.get('db_pool')
+            if pool is None:
+                if not app.extensions.get('db_schema_ready'):
+                    prepare_database()
+                pool = create_pool()
+                app.extensions['db_pool'] = pool
+    return pool
+
+
+
+def get_db_connection():
+    # One pooled connection per app context, given back in release_db_connection
+    if 'db' not in g:
+        g.db = get_pool().acquire()
+    return g.db
+
+@app.teardown_appcontext
+def release_db_connection(exception):
+    conn = g.pop('db', None)
+    if conn is not None:
+        get_pool().release(conn)
+
+@app.route('/api/stats/pool', methods=['GET'])
+def get_pool_stats():
+    return jsonify({'success': True, 'pool': get_pool().stats()})
+
+# Instrumentation: per-route request timing, SQL statement counts and
+# durations, rows fetched and JSON serialization time, exported on /metrics.
+# Work done outside a request (the registration writer, CLI commands) is
+# not attributed to any route.
+class RequestStats:
+    __slots__ = ('started', 'status', 'sql_statements', 'sql_seconds', 'rows_fetched', 'json_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.status = None
+        self.sql_statements = 0
+        self.sql_seconds = 0.0
+        self.rows_fetched = 0
+        self.json_seconds = 0.0
+
+_request_stats = contextvars.ContextVar('request_stats', default=None)
+
+class InstrumentedCursor(sqlite3.Cursor):
+    def execute(self, sql, parameters=()):
+        stats = _request_stats.get()
+        if stats is None:
+            return super().execute(sql, parameters)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            stats.sql_statements += 1
+            stats.sql_seconds += time.perf_counter() - started
+
+    def executemany(self, sql, seq_of_parameters):
+        stats = _request_stats.get()
+        if stats is None:
+            return super().executemany(sql, seq_of_parameters)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            stats.sql_statements += 1
+            stats.sql_seconds += time.perf_counter() - started
+
+    # SQLite steps through results lazily, so fetching is timed as SQL too
+    def _timed_fetch(self, fetch, *args):
+        stats = _request_stats.get()
+        if stats is None:
+            return fetch(*args)
+        started = time.perf_counter()
+        rows = fetch(*args)
+        stats.sql_seconds += time.perf_counter() - started
+        return rows
+
+    def fetchone(self):
+        row = self._timed_fetch(super().fetchone)
+        if row is not None:
+            stats = _request_stats.get()
+            if stats is not None:
+                stats.rows_fetched += 1
+        return row
+
+    def fetchmany(self, size=None):
+        rows = self._timed_fetch(super().fetchmany, self.arraysize if size is None else size)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.rows_fetched += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed_fetch(super().fetchall)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.rows_fetched += len(rows)
+        return rows
+
+    def __next__(self):
+        row = self._timed_fetch(super().__next__)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.rows_fetched += 1
+        return row
+
+class InstrumentedConnection(sqlite3.Connection):
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+class TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        stats = _request_stats.get()
+        if stats is None:
+            return super().dumps(obj, **kwargs)
+        started = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            stats.json_seconds += time.perf_counter() - started
+
+app.json = TimedJSONProvider(app)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class RouteMetrics:
+    """Per-route counters and a latency histogram, rendered in Prometheus text format"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._routes = {}
+        self._statuses = {}
+        self._lock = threading.Lock()
+
+    def observe(self, route, method, status, seconds, stats):
+        key = (route, method)
+        with self._lock:
+            entry = self._routes.get(key)
+            if entry is None:
+                entry = self._routes[key] = {
+                    'buckets': [0] * len(self.buckets), 'count': 0, 'seconds': 0.0,
+                    'sql_statements': 0, 'sql_seconds': 0.0, 'rows_fetched': 0, 'json_seconds': 0.0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    entry['buckets'][i] += 1
+                    break
+            entry['count'] += 1
+            entry['seconds'] += seconds
+            entry['sql_statements'] += stats.sql_statements
+            entry['sql_seconds'] += stats.sql_seconds
+            entry['rows_fetched'] += stats.rows_fetched
+            entry['json_seconds'] += stats.json_seconds
+            status_key = (route, method, str(status))
+            self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def render(self):
+        with self._lock:
+            routes = {key: dict(entry, buckets=list(entry['buckets'])) for key, entry in self._routes.items()}
+            statuses = dict(self._statuses)
+
+        lines = [
+            '# HELP pesu_http_requests_total Requests handled, by route, method and status.',
+            '# TYPE pesu_http_requests_total counter',
+        ]
+        for (route, method, status), count in sorted(statuses.items()):
+            lines.append(f'pesu_http_requests_total{prometheus_labels(route=route, method=method, status=status)} {count}')
+
+        lines += [
+            '# HELP pesu_http_request_duration_seconds Wall time from routing to the last byte of the response.',
+            '# TYPE pesu_http_request_duration_seconds histogram',
+        ]
+        for (route, method), entry in sorted(routes.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry['buckets']):
+                cumulative += count
+                lines.append(f'pesu_http_request_duration_seconds_bucket'
+                             f'{prometheus_labels(route=route, method=method, le=repr(bound))} {cumulative}')
+            lines.append(f'pesu_http_request_duration_seconds_bucket'
+                         f'{prometheus_labels(route=route, method=method, le="+Inf")} {entry["count"]}')
+            labels = prometheus_labels(route=route, method=method)
+            lines.append(f'pesu_http_request_duration_seconds_sum{labels} {entry["seconds"]:.6f}')
+            lines.append(f'pesu_http_request_duration_seconds_count{labels} {entry["count"]}')
+
+        for name, key, kind, help_text in (
+            ('pesu_sql_statements_total', 'sql_statements', 'counter', 'SQL statements executed.'),
+            ('pesu_sql_seconds_total', 'sql_seconds', 'counter', 'Time spent executing SQL and fetching rows.'),
+            ('pesu_sql_rows_fetched_total', 'rows_fetched', 'counter', 'Rows fetched from SQLite.'),
+            ('pesu_json_serialization_seconds_total', 'json_seconds', 'counter', 'Time spent serializing JSON.'),
+        ):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+            for (route, method), entry in sorted(routes.items()):
+                value = entry[key]
+                value = f'{value:.6f}' if isinstance(value, float) else value
+                lines.append(f'{name}{prometheus_labels(route=route, method=method)} {value}')
+        return lines
+
+def prometheus_labels(**labels):
+    pairs = []
+    for name, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+route_metrics = RouteMetrics()
+
+def profile_mode():
+    """'text' or 'pstats' when this request asked to be profiled and profiling is enabled"""
+    if not app.config['PROFILING_ENABLED']:
+        return None
+    mode = request.args.get('__profile') or request.headers.get('X-Profile')
+    if not mode or mode == '0':
+        return None
+    return 'pstats' if mode == 'pstats' else 'text'
+
+@app.before_request
+def start_request_instrumentation():
+    g.request_stats = RequestStats()
+    _request_stats.set(g.request_stats)
+    mode = profile_mode()
+    if mode:
+        g.profile_mode = mode
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def finish_request_instrumentation(response):
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        response = profile_response(profiler, g.profile_mode, response)
+
+    stats = g.pop('request_stats', None)
+    if stats is not None:
+        # Streamed bodies are still being generated at this point, so the
+        # request is recorded once the server has sent the last chunk
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        response.call_on_close(functools.partial(
+            record_request_metrics, stats, route, request.method, response.status_code
+        ))
+    return response
+
+def record_request_metrics(stats, route, method, status):
+    _request_stats.set(None)
+    route_metrics.observe(route, method, status, time.perf_counter() - stats.started, stats)
+
+def profile_response(profiler, mode, response):
+    # Drain streamed bodies so the profile covers the whole response
+    response.get_data()
+    profiler.disable()
+    profiled_status = response.status_code
+    if mode == 'pstats':
+        # Loadable with `python -m pstats`, snakeviz, flameprof or gprof2dot
+        profiler.create_stats()
+        response = make_response(marshal.dumps(profiler.stats))
+        response.mimetype = 'application/octet-stream'
+        endpoint = (request.endpoint or 'request').replace('.', '_')
+        response.headers['Content-Disposition'] = f'attachment; filename="{endpoint}.prof"'
+    else:
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(60)
+        response = make_response(output.getvalue())
+        response.mimetype = 'text/plain'
+    response.headers['X-Profiled-Status'] = str(profiled_status)
+    return response
+
+def gauge_lines(name, help_text, values, kind='gauge'):
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    for labels, value in values:
+        lines.append(f'{name}{prometheus_labels(**labels) if labels else ""} {value}')
+    return lines
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    lines = route_metrics.render()
+
+    pool = get_pool().stats()
+    lines += gauge_lines('pesu_db_pool_connections', 'Pooled SQLite connections by state.', [
+        ({'state': 'idle'}, pool['idle']), ({'state': 'in_use'}, pool['in_use']),
+    ])
+    lines += gauge_lines('pesu_db_pool_waits_total', 'Acquires that had to wait for a connection.',
+                         [({}, pool['waits'])], 'counter')
+    lines += gauge_lines('pesu_db_pool_wait_seconds_total', 'Time spent waiting for a connection.',
+                         [({}, pool['wait_seconds'])], 'counter')
+
+    caches = [('catalog', catalog_cache.stats()), ('forms', form_registry.stats())]
+    lines += gauge_lines('pesu_cache_hits_total', 'Cache lookups served from memory.',
+                         [({'cache': name}, stats['hits']) for name, stats in caches], 'counter')
+    lines += gauge_lines('pesu_cache_misses_total', 'Cache lookups that went to the database.',
+                         [({'cache': name}, stats['misses']) for name, stats in caches], 'counter')
+    lines += gauge_lines('pesu_cache_entries', 'Entries currently cached.',
+                         [({'cache': name}, stats['entries']) for name, stats in caches])
+
+    # Only report the registration queue once something has started it
+    registration_queue = app.extensions.get('registration_queue')
+    if registration_queue is not None:
+        queue_stats = registration_queue.stats()
+        lines += gauge_lines('pesu_registration_queue_depth', 'Registrations waiting for the writer.',
+                             [({}, queue_stats['queued'])])
+        lines += gauge_lines('pesu_registration_batches_total', 'Batches committed by the writer.',
+                             [({}, queue_stats['batches'])], 'counter')
+        lines += gauge_lines('pesu_registrations_total', 'Registrations committed by the writer.',
+                             [({}, queue_stats['registrations'])], 'counter')
+
+    response = make_response('\n'.join(lines) + '\n')
+    response.headers['Content-Type'] = 'text/plain; version=0.0.4; charset=utf-8'
+    return response
+
+# Catalog: clubs and their events. Databases from before the migration
+# runner already have these tables, hence IF NOT EXISTS.
+CATALOG_SQL = '''
+    CREATE TABLE IF NOT EXISTS clubs (
+        club_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        club_name TEXT NOT NULL,
+        club_email_id TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        club_description TEXT,
+        club_logo_image TEXT
+    );
+
+    CREATE TABLE IF NOT EXISTS events (
+        event_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        club_id INTEGER NOT NULL,
+        event_name TEXT NOT NULL,
+        event_description TEXT,
+        event_date TEXT NOT NULL,
+        event_image TEXT,
+        event_time TEXT NOT NULL,
+        event_venue TEXT NOT NULL
+    );
+
+    -- Indexes behind the catalog filters and the club/event joins
+    CREATE INDEX IF NOT EXISTS idx_events_club_id ON events (club_id);
+    CREATE INDEX IF NOT EXISTS idx_events_event_date ON events (event_date);
+    CREATE INDEX IF NOT EXISTS idx_clubs_club_name ON clubs (club_name);
+'''
+
+# Applications store: every event registration form and club recruitment
+# form is one row in `forms`, and every response is one row in `submissions`
+# partitioned by form_id. The WITHOUT ROWID primary key clusters a form's
+# responses together, so it doubles as the covering index for all reads.
+SCHEMA_SQL = '''
+    CREATE TABLE IF NOT EXISTS forms (
+        form_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        kind TEXT NOT NULL CHECK (kind IN ('event', 'recruitment')),
+        owner_id INTEGER NOT NULL,
+        fields TEXT NOT NULL,
+        is_open INTEGER NOT NULL DEFAULT 1,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        closed_at TEXT,
+        capacity INTEGER,
+        accepted_count INTEGER NOT NULL DEFAULT 0,
+        waitlist_enabled INTEGER NOT NULL DEFAULT 0,
+        waitlisted_count INTEGER NOT NULL DEFAULT 0
+    );
+
+    CREATE INDEX IF NOT EXISTS idx_forms_owner ON forms (kind, owner_id, form_id);
+
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_forms_open_owner
+        ON forms (kind, owner_id) WHERE is_open = 1;
+
+    CREATE TABLE IF NOT EXISTS submissions (
+        form_id INTEGER NOT NULL,
+        submission_id INTEGER NOT NULL,
+        data TEXT NOT NULL,
+        submitted_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        status TEXT NOT NULL DEFAULT 'accepted',
+        PRIMARY KEY (form_id, submission_id)
+    ) WITHOUT ROWID;
+
+    -- Final outcome of every registration that went through the ingestion queue
+    CREATE TABLE IF NOT EXISTS registration_tickets (
+        ticket_id TEXT PRIMARY KEY,
+        form_id INTEGER NOT NULL,
+        submission_id INTEGER,
+        status TEXT NOT NULL,
+        message TEXT,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    );
+
+    -- Images in the blob store, keyed by the SHA-256 of their content
+    CREATE TABLE IF NOT EXISTS blobs (
+        digest TEXT PRIMARY KEY,
+        content_type TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    ) WITHOUT ROWID;
+
+    -- Change counters behind the ETag headers of catalog reads
+    CREATE TABLE IF NOT EXISTS resource_versions (
+        resource TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+
+    INSERT OR IGNORE INTO resource_versions (resource, version, updated_at)
+    VALUES ('clubs', 1, CURRENT_TIMESTAMP),
+           ('events', 1, CURRENT_TIMESTAMP),
+           ('forms', 1, CURRENT_TIMESTAMP);
+'''
+
+# Table -> columns whose updates change what catalog reads return (None means
+# any column). The registration counters on forms are left out so a new
+# registration doesn't invalidate every client's cached form.
+VERSIONED_TABLES = {
+    # Recruitment state has its own cache tag and a time-based window, so
+    # opening or closing recruitment doesn't invalidate every club ETag
+    'clubs': ('club_name', 'club_email_id', 'club_description', 'club_logo_image', 'club_logo_thumb'),
+    'events': None,
+    'forms': ('fields', 'is_open', 'capacity', 'waitlist_enabled', 'unique_field', 'archive_term'),
+}
+
+def version_triggers_sql():
+    statements = []
+    for table, columns in VERSIONED_TABLES.items():
+        for action in ('INSERT', 'UPDATE', 'DELETE'):
+            event = action
+            if action == 'UPDATE' and columns:
+                event = 'UPDATE OF ' + ', '.join(columns)
+            # Dropped first, so a later migration can recreate them when the column lists change
+            statements.append(f'''
+                DROP TRIGGER IF EXISTS bump_{table}_version_on_{action.lower()};
+                CREATE TRIGGER bump_{table}_version_on_{action.lower()}
+                AFTER {event} ON {table}
+                BEGIN
+                    UPDATE resource_versions
+                    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+                    WHERE resource = '{table}';
+                END;
+            ''')
+    return ''.join(statements)
+
+# Columns added after a table first shipped: (table, column, definition, backfill)
+ADDED_COLUMNS = (
+    ('forms', 'capacity', 'INTEGER',
+     "UPDATE forms SET capacity = :default_registration_limit WHERE kind = 'event'"),
+    ('forms', 'accepted_count', 'INTEGER NOT NULL DEFAULT 0',
+     'UPDATE forms SET accepted_count = '
+     '(SELECT COUNT(*) FROM submissions s WHERE s.form_id = forms.form_id)'),
+    ('forms', 'waitlist_enabled', 'INTEGER NOT NULL DEFAULT 0', None),
+    ('forms', 'waitlisted_count', 'INTEGER NOT NULL DEFAULT 0', None),
+    ('submissions', 'status', "TEXT NOT NULL DEFAULT 'accepted'", None),
+    ('clubs', 'is_recruiting', 'INTEGER NOT NULL DEFAULT 0',
+     "UPDATE clubs SET is_recruiting = EXISTS (SELECT 1 FROM forms f WHERE f.kind = 'recruitment' "
+     "AND f.owner_id = clubs.club_id AND f.is_open = 1)"),
+    ('clubs', 'recruitment_open_at', 'TEXT',
+     "UPDATE clubs SET recruitment_open_at = (SELECT created_at FROM forms f WHERE f.kind = 'recruitment' "
+     "AND f.owner_id = clubs.club_id ORDER BY f.form_id DESC LIMIT 1)"),
+    ('events', 'event_thumb', 'TEXT', None),
+    ('clubs', 'club_logo_thumb', 'TEXT', None),
+    ('clubs', 'recruitment_close_at', 'TEXT',
+     "UPDATE clubs SET recruitment_close_at = (SELECT closed_at FROM forms f WHERE f.kind = 'recruitment' "
+     "AND f.owner_id = clubs.club_id ORDER BY f.form_id DESC LIMIT 1)"),
+    # Existing submissions get their keys from `compact-submissions`
+    ('forms', 'unique_field', 'TEXT', None),
+    ('submissions', 'dedup_key', 'TEXT', None),
+    ('events', 'starts_at', 'TEXT',
+     "UPDATE events SET starts_at = strftime('%Y-%m-%d %H:%M', event_date || ' ' || event_time)"),
+    ('events', 'ends_at', 'TEXT',
+     "UPDATE events SET ends_at = strftime('%Y-%m-%d %H:%M', starts_at, "
+     "'+' || :default_event_duration || ' minutes')"),
+    ('forms', 'archive_term', 'TEXT', None),
+    ('forms', 'archived_at', 'TEXT', None),
+    ('forms', 'rollup_fields', "TEXT NOT NULL DEFAULT '[]'",
+     "UPDATE forms SET rollup_fields = (SELECT json_group_array(json_extract(value, '$.name')) "
+     "FROM json_each(forms.fields) WHERE json_extract(value, '$.type') != 'email' "
+     "AND json_extract(value, '$.name') IS NOT forms.unique_field)"),
+)
+
+# Indexes over columns in ADDED_COLUMNS, created once those columns exist
+ADDED_INDEXES_SQL = '''
+    CREATE INDEX IF NOT EXISTS idx_clubs_recruiting
+    ON clubs (club_id, recruitment_open_at, recruitment_close_at) WHERE is_recruiting = 1;
+
+    -- One response per student on forms with a uniqueness key
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_submissions_dedup
+    ON submissions (form_id, dedup_key) WHERE dedup_key IS NOT NULL;
+'''
+
+# Full-text indexes for /api/search, one row per event or club keyed by its
+# id. Triggers keep them in step with every write to events and clubs.
+SEARCH_SQL = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS event_search USING fts5(
+        event_name, event_description, event_venue, club_name, club_description,
+        prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    );
+
+    CREATE VIRTUAL TABLE IF NOT EXISTS club_search USING fts5(
+        club_name, club_description,
+        prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+    );
+
+    DROP TRIGGER IF EXISTS index_event_on_insert;
+    CREATE TRIGGER index_event_on_insert AFTER INSERT ON events
+    BEGIN
+        INSERT INTO event_search (rowid, event_name, event_description, event_venue, club_name, club_description)
+        SELECT new.event_id, new.event_name, new.event_description, new.event_venue, club_name, club_description
+        FROM (SELECT NULL) LEFT JOIN clubs ON clubs.club_id = new.club_id;
+    END;
+
+    DROP TRIGGER IF EXISTS index_event_on_update;
+    CREATE TRIGGER index_event_on_update
+    AFTER UPDATE OF event_name, event_description, event_venue, club_id ON events
+    BEGIN
+        DELETE FROM event_search WHERE rowid = old.event_id;
+        INSERT INTO event_search (rowid, event_name, event_description, event_venue, club_name, club_description)
+        SELECT new.event_id, new.event_name, new.event_description, new.event_venue, club_name, club_description
+        FROM (SELECT NULL) LEFT JOIN clubs ON clubs.club_id = new.club_id;
+    END;
+
+    DROP TRIGGER IF EXISTS index_event_on_delete;
+    CREATE TRIGGER index_event_on_delete AFTER DELETE ON events
+    BEGIN
+        DELETE FROM event_search WHERE rowid = old.event_id;
+    END;
+
+    DROP TRIGGER IF EXISTS index_club_on_insert;
+    CREATE TRIGGER index_club_on_insert AFTER INSERT ON clubs
+    BEGIN
+        INSERT INTO club_search (rowid, club_name, club_description)
+        VALUES (new.club_id, new.club_name, new.club_description);
+    END;
+
+    DROP TRIGGER IF EXISTS index_club_on_update;
+    CREATE TRIGGER index_club_on_update AFTER UPDATE OF club_name, club_description ON clubs
+    BEGIN
+        DELETE FROM club_search WHERE rowid = old.club_id;
+        INSERT INTO club_search (rowid, club_name, club_description)
+        VALUES (new.club_id, new.club_name, new.club_description);
+        UPDATE event_search SET club_name = new.club_name, club_description = new.club_description
+        WHERE rowid IN (SELECT event_id FROM events WHERE club_id = new.club_id);
+    END;
+
+    DROP TRIGGER IF EXISTS index_club_on_delete;
+    CREATE TRIGGER index_club_on_delete AFTER DELETE ON clubs
+    BEGIN
+        DELETE FROM club_search WHERE rowid = old.club_id;
+    END;
+'''
+
+def rebuild_search_index(conn):
+    run_sql(conn, '''
+        DELETE FROM event_search;
+        INSERT INTO event_search (rowid, event_name, event_description, event_venue, club_name, club_description)
+        SELECT events.event_id, events.event_name, events.event_description, events.event_venue,
+               clubs.club_name, clubs.club_description
+        FROM events LEFT JOIN clubs ON clubs.club_id = events.club_id;
+        DELETE FROM club_search;
+        INSERT INTO club_search (rowid, club_name, club_description)
+        SELECT club_id, club_name, club_description FROM clubs;
+    ''')
+
+# Registration analytics: counts per form by submission day, status and the
+# value of each rolled-up field, kept current by triggers on submissions so
+# every write path (queue, bulk import, compaction) maintains them. Email
+# fields and the form's uniqueness field are left out: one group per
+# student would make the rollup as large as the table.
+ANALYTICS_SQL = '''
+    CREATE TABLE IF NOT EXISTS submission_rollups (
+        form_id INTEGER NOT NULL,
+        dimension TEXT NOT NULL,
+        value TEXT NOT NULL,
+        count INTEGER NOT NULL,
+        PRIMARY KEY (form_id, dimension, value)
+    ) WITHOUT ROWID;
+'''
+
+def rollup_groups_sql(row):
+    """SELECT of the (form_id, dimension, value) groups a submissions `row`
+    (new or old) counts towards, for use inside a trigger"""
+    return f'''
+        SELECT {row}.form_id, 'day', substr({row}.submitted_at, 1, 10)
+        UNION ALL SELECT {row}.form_id, 'status', {row}.status
+        UNION ALL
+        SELECT {row}.form_id, 'field:' || rollup.value,
+               COALESCE(CAST(json_extract({row}.data, '$."' || rollup.value || '"') AS TEXT), '')
+        FROM forms, json_each(forms.rollup_fields) AS rollup
+        WHERE forms.form_id = {row}.form_id
+    '''
+
+def rollup_triggers_sql():
+    increment = f'''
+        INSERT INTO submission_rollups (form_id, dimension, value, count)
+        SELECT *, 1 FROM ({rollup_groups_sql('new')}) WHERE true
+        ON CONFLICT (form_id, dimension, value) DO UPDATE SET count = count + 1;
+    '''
+    decrement = f'''
+        UPDATE submission_rollups SET count = count - 1
+        WHERE (form_id, dimension, value) IN ({rollup_groups_sql('old')});
+    '''
+    return f'''
+        DROP TRIGGER IF EXISTS rollup_submission_on_insert;
+        CREATE TRIGGER rollup_submission_on_insert AFTER INSERT ON submissions
+        BEGIN {increment} END;
+
+        DROP TRIGGER IF EXISTS rollup_submission_on_update;
+        CREATE TRIGGER rollup_submission_on_update AFTER UPDATE OF status, data ON submissions
+        BEGIN {decrement} {increment} END;
+
+        -- Archiving a form moves its responses out but keeps its counts
+        DROP TRIGGER IF EXISTS rollup_submission_on_delete;
+        CREATE TRIGGER rollup_submission_on_delete AFTER DELETE ON submissions
+        WHEN NOT EXISTS (SELECT 1 FROM forms WHERE form_id = old.form_id AND archive_term IS NOT NULL)
+        BEGIN {decrement} END;
+    '''
+
+def rebuild_rollups(conn):
+    """Recount every rollup from the submissions table; archived forms keep theirs"""
+    run_sql(conn, '''
+        DELETE FROM submission_rollups
+        WHERE form_id NOT IN (SELECT form_id FROM forms WHERE archive_term IS NOT NULL);
+        INSERT INTO submission_rollups (form_id, dimension, value, count)
+        SELECT form_id, 'day', substr(submitted_at, 1, 10), COUNT(*) FROM submissions GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT form_id, 'status', status, COUNT(*) FROM submissions GROUP BY 1, 2, 3
+        UNION ALL
+        SELECT submissions.form_id, 'field:' || rollup.value,
+               COALESCE(CAST(json_extract(submissions.data, '$."' || rollup.value || '"') AS TEXT), ''),
+               COUNT(*)
+        FROM submissions JOIN forms ON forms.form_id = submissions.form_id,
+             json_each(forms.rollup_fields) AS rollup
+        GROUP BY 1, 2, 3;
+    ''')
+
+def add_missing_columns(conn):
+    existing = {}
+    for table, column, definition, backfill in ADDED_COLUMNS:
+        if table not in existing:
+            existing[table] = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in existing[table]:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            if backfill:
+                conn.execute(backfill, {
+                    'default_registration_limit': app.config['DEFAULT_REGISTRATION_LIMIT'],
+                    'default_event_duration': app.config['EVENT_DEFAULT_DURATION'],
+                })
+
+def run_sql(conn, script):
+    """Run a multi-statement script inside the caller's transaction.
+
+    executescript() would commit first, so statements are split with
+    sqlite3.complete_statement() and run one by one instead.
+    """
+    statement = ''
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            conn.execute(statement)
+            statement = ''
+    if statement.strip():
+        raise ValueError(f'Incomplete SQL statement: {statement.strip()[:80]}')
+
+def create_search_index(conn):
+    run_sql(conn, SEARCH_SQL)
+    rebuild_search_index(conn)
+
+def create_rollups(conn):
+    run_sql(conn, ANALYTICS_SQL)
+    run_sql(conn, rollup_triggers_sql())
+    rebuild_rollups(conn)
+
+# Forms that predate ROLLUP_FIELD_TYPES counted free-text fields too, which
+# made about one rollup group per response
+ROLLUP_NUMBER_FIELDS_SQL = '''
+    UPDATE forms SET rollup_fields = (
+        SELECT json_group_array(json_extract(value, '$.name')) FROM json_each(forms.fields)
+        WHERE json_extract(value, '$.type') = 'number' AND json_extract(value, '$.name') IS NOT forms.unique_field
+    );
+
+    DELETE FROM submission_rollups
+    WHERE dimension LIKE 'field:%' AND substr(dimension, 7) NOT IN (
+        SELECT rollup.value FROM forms, json_each(forms.rollup_fields) AS rollup
+        WHERE forms.form_id = submission_rollups.form_id
+    );
+'''
+
+# Highest submission_id a form has handed out, kept even after compaction
+# or archiving removes that response
+SUBMISSION_ID_COUNTER_SQL = '''
+    ALTER TABLE forms ADD COLUMN last_submission_id INTEGER NOT NULL DEFAULT 0;
+
+    UPDATE forms SET last_submission_id = COALESCE(
+        (SELECT MAX(submission_id) FROM submissions WHERE submissions.form_id = forms.form_id), 0
+    );
+'''
+
+# Schema migrations, applied in order by run_migrations() and recorded in
+# schema_version. Append new steps and never change one that has shipped:
+# a step is SQL or a function of the connection, and runs inside the
+# runner's transaction, so it must not commit. Databases set up before
+# the runner existed replay every step, which is why these first ones
+# are idempotent.
+MIGRATIONS = (
+    (1, 'catalog tables and indexes', CATALOG_SQL),
+    (2, 'applications store', SCHEMA_SQL),
+    (3, 'added columns', add_missing_columns),
+    (4, 'indexes on added columns', ADDED_INDEXES_SQL),
+    (5, 'catalog version triggers', version_triggers_sql()),
+    (6, 'search index', create_search_index),
+    (7, 'registration analytics', create_rollups),
+    (8, 'registration ticket expiry index',
+     'CREATE INDEX IF NOT EXISTS idx_registration_tickets_created ON registration_tickets (created_at);'),
+    (9, 'roll up number fields only', ROLLUP_NUMBER_FIELDS_SQL),
+    (10, 'submission id counter', SUBMISSION_ID_COUNTER_SQL),
+)
+
+SCHEMA_VERSION_SQL = '''
+    CREATE TABLE IF NOT EXISTS schema_version (
+        version INTEGER PRIMARY KEY,
+        name TEXT NOT NULL,
+        applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+def applied_migrations(conn):
+    conn.execute(SCHEMA_VERSION_SQL)
+    return {row[0] for row in conn.execute('SELECT version FROM schema_version')}
+
+def run_migrations(conn):
+    """Apply the pending MIGRATIONS and return their (version, name) pairs.
+
+    All of them run in one write transaction, so a failed step leaves the
+    schema as it was. When several processes start at once, one of them
+    migrates while the others wait on the lock and then find nothing to do.
+    """
+    if all(version in applied_migrations(conn) for version, _, _ in MIGRATIONS):
+        return []
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        applied = applied_migrations(conn)
+        pending = [(version, name, step) for version, name, step in MIGRATIONS if version not in applied]
+        for version, name, step in pending:
+            if isinstance(step, str):
+                run_sql(conn, step)
+            else:
+                step(conn)
+            conn.execute('INSERT INTO schema_version (version, name) VALUES (?, ?)', (version, name))
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return [(version, name) for version, name, _ in pending]
+
+def field_name(label):
+    return label.lower().replace(' ', '_')
+
+def resolve_unique_field(definitions, requested=None):
+    """Name of the field that identifies a respondent, or None; raises ValueError
+
+    `requested` is a field label or name, '' for no key, or None to pick
+    the first of DEDUP_FIELDS the form has.
+    """
+    names = [field['name'] for field in definitions]
+    if requested is None:
+        return next((name for name in app.config['DEDUP_FIELDS'] if name in names), None)
+    if requested == '':
+        return None
+    if field_name(requested) not in names:
+        raise ValueError(f'Unknown unique field: {requested}')
+    return field_name(requested)
+
+# Field types whose values repeat across respondents, so counting by them
+# gives few groups. Free text rolls up only when a form asks for it.
+ROLLUP_FIELD_TYPES = ('number',)
+
+def resolve_rollup_fields(definitions, unique_field, requested=None):
+    """Names of the fields analytics count responses by; raises ValueError
+
+    `requested` is a list of field labels or names, or None for the form's
+    ROLLUP_FIELD_TYPES fields other than its uniqueness field.
+    """
+    if requested is None:
+        return [field['name'] for field in definitions
+                if field['type'] in ROLLUP_FIELD_TYPES and field['name'] != unique_field]
+    if not isinstance(requested, list) or not all(isinstance(name, str) for name in requested):
+        raise ValueError('rollupFields must be a list of field names')
+    names = [field['name'] for field in definitions]
+    for name in requested:
+        if field_name(name) not in names:
+            raise ValueError(f'Unknown rollup field: {name}')
+    return list(dict.fromkeys(field_name(name) for name in requested))
+
+def create_form(cursor, kind, owner_id, fields, capacity=None, waitlist=False, unique_field=None,
+                rollup_fields=None):
+    """Open a new form for an event or club, closing any form it replaces.
+
+    `capacity` caps accepted submissions (None for no limit); once it is
+    reached further submissions are waitlisted if `waitlist` is set and
+    rejected otherwise. `unique_field` is passed to resolve_unique_field
+    and `rollup_fields` to resolve_rollup_fields.
+    """
+    definitions = [{
+        'label': field['label'],
+        'name': field_name(field['label']),
+        'type': field.get('type', 'text'),
+        'required': bool(field.get('required')),
+    } for field in fields]
+    unique_field = resolve_unique_field(definitions, unique_field)
+    rollup_fields = resolve_rollup_fields(definitions, unique_field, rollup_fields)
+
+    cursor.execute('''
+        UPDATE forms SET is_open = 0, closed_at = CURRENT_TIMESTAMP
+        WHERE kind = ? AND owner_id = ? AND is_open = 1
+    ''', (kind, owner_id))
+
+    cursor.execute('''
+        INSERT INTO forms (kind, owner_id, fields, capacity, waitlist_enabled, unique_field, rollup_fields)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (kind, owner_id, json.dumps(definitions), capacity, int(bool(waitlist)), unique_field,
+          json.dumps(rollup_fields)))
+    return cursor.lastrowid
+
+FORM_SCHEMA_COLUMNS = 'form_id, fields, is_open, capacity, waitlist_enabled, unique_field, archive_term'
+
+def form_schema(form):
+    return FormSchema(
+        form['form_id'], json.loads(form['fields']), is_open=bool(form['is_open']),
+        capacity=form['capacity'], waitlist=bool(form['waitlist_enabled']),
+        unique_field=form['unique_field'], archive_term=form['archive_term'],
+    )
+
+def load_form_schema(cursor, kind, owner_id, open_only=True):
+    query = f'SELECT {FORM_SCHEMA_COLUMNS} FROM forms WHERE kind = ? AND owner_id = ?'
+    if open_only:
+        query += ' AND is_open = 1'
+    cursor.execute(query + ' ORDER BY form_id DESC LIMIT 1', (kind, owner_id))
+    form = cursor.fetchone()
+    return form_schema(form) if form else None
+
+def get_form(cursor, kind, owner_id, open_only=True):
+    """Compiled schema of the latest form for an event or club, or None"""
+    return form_registry.get_or_load(
+        (kind, owner_id, open_only), (form_tag(kind, owner_id),),
+        lambda: load_form_schema(cursor, kind, owner_id, open_only)
+    )
+
+def form_tag(kind, owner_id):
+    return f'form:{kind}:{owner_id}'
+
+def close_form(cursor, kind, owner_id):
+    cursor.execute('''
+        UPDATE forms SET is_open = 0, closed_at = CURRENT_TIMESTAMP
+        WHERE kind = ? AND owner_id = ? AND is_open = 1
+    ''', (kind, owner_id))
+    return cursor.rowcount > 0
+
+class SubmissionError(Exception):
+    pass
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+def parse_text(value):
+    return value if isinstance(value, str) else str(value)
+
+def parse_number(value):
+    if isinstance(value, bool):
+        raise ValueError
+    if not isinstance(value, (int, float)):
+        text = str(value).strip()
+        try:
+            value = int(text)
+        except ValueError:
+            value = float(text)
+    if not math.isfinite(value):
+        raise ValueError
+    return value
+
+def parse_email(value):
+    value = parse_text(value).strip()
+    if not EMAIL_PATTERN.match(value):
+        raise ValueError
+    return value
+
+FIELD_PARSERS = {
+    'text': (parse_text, '{label} must be text'),
+    'number': (parse_number, '{label} must be a number'),
+    'email': (parse_email, '{label} must be a valid email address'),
+}
+
+class FormSchema:
+    """A form's field definitions compiled once for rendering and validation"""
+
+    def __init__(self, form_id, fields, is_open=True, capacity=None, waitlist=False, unique_field=None,
+                 archive_term=None):
+        self.form_id = form_id
+        self.fields = fields
+        self.is_open = is_open
+        self.capacity = capacity
+        self.waitlist = waitlist
+        self.unique_field = unique_field
+        # Set once the responses have moved to the archive
+        self.archive_term = archive_term
+        self.names = [field['name'] for field in fields]
+        self.columns = ['id'] + self.names + (['status'] if waitlist else [])
+        self.field_list = [{
+            'label': field['label'],
+            'name': field['name'],
+            'type': field['type'],
+            'required': field['required'],
+        } for field in fields]
+        self._validators = [
+            (field['name'], field['label'], field['required'],
+             *FIELD_PARSERS.get(field['type'], FIELD_PARSERS['text']))
+            for field in fields
+        ]
+        self._known = frozenset(self.names)
+
+    def validate(self, data):
+        """Submitted values in field order, parsed by type; raises SubmissionError"""
+        if not isinstance(data, dict):
+            raise SubmissionError('Expected a JSON object')
+        for key in data:
+            if key not in self._known:
+                raise SubmissionError(f"Unknown field: {key}")
+
+        values = {}
+        for name, label, required, parse, message in self._validators:
+            value = data.get(name)
+            if value is None or value == '':
+                if required:
+                    raise SubmissionError(f"{label} is required")
+                values[name] = None
+                continue
+            try:
+                values[name] = parse(value)
+            except (TypeError, ValueError):
+                raise SubmissionError(message.format(label=label))
+        return values
+
+    def dedup_key(self, values):
+        """The validated response's uniqueness key, or None"""
+        return dedup_key(values.get(self.unique_field)) if self.unique_field else None
+
+def dedup_key(value):
+    # SRNs and emails are compared case- and whitespace-insensitively
+    return None if value is None else str(value).strip().casefold()
+
+def is_duplicate(cursor, form_id, key):
+    """Whether a response with this uniqueness key exists; one probe of idx_submissions_dedup"""
+    if key is None:
+        return False
+    cursor.execute('SELECT 1 FROM submissions WHERE form_id = ? AND dedup_key = ?', (form_id, key))
+    return cursor.fetchone() is not None
+
+def reserve_place(cursor, form_id):
+    """Claim a place on a form, returning 'accepted', 'waitlisted' or None when full.
+
+    The conditional UPDATE checks and bumps the form's counter in one
+    statement, so it is O(1) and, run in the same transaction as the
+    insert, can't overshoot the capacity under concurrent submissions.
+    """
+    cursor.execute('''
+        UPDATE forms SET accepted_count = accepted_count + 1
+        WHERE form_id = ? AND (capacity IS NULL OR accepted_count < capacity)
+    ''', (form_id,))
+    if cursor.rowcount:
+        return 'accepted'
+
+    cursor.execute('''
+        UPDATE forms SET waitlisted_count = waitlisted_count + 1
+        WHERE form_id = ? AND waitlist_enabled = 1
+    ''', (form_id,))
+    if cursor.rowcount:
+        return 'waitlisted'
+    return None
+
+def get_capacity(cursor, form_id):
+    cursor.execute('''
+        SELECT capacity, accepted_count, waitlisted_count, waitlist_enabled
+        FROM forms WHERE form_id = ?
+    ''', (form_id,))
+    form = cursor.fetchone()
+    return {
+        'capacity': form['capacity'],
+        'registered': form['accepted_count'],
+        'remaining': None if form['capacity'] is None else max(form['capacity'] - form['accepted_count'], 0),
+        'waitlisted': form['waitlisted_count'],
+        'waitlist': bool(form['waitlist_enabled']),
+    }
+
+def insert_submission(cursor, form_id, values, status='accepted', key=None):
+    """Insert a response and return its submission_id; call inside a write transaction
+
+    Ids come from the form's last_submission_id counter rather than MAX()+1,
+    so an id freed by compaction is never handed out again and since_id
+    clients can't miss or repeat a response.
+    """
+    cursor.execute('''
+        UPDATE forms SET last_submission_id = last_submission_id + 1 WHERE form_id = ?
+        RETURNING last_submission_id
+    ''', (form_id,))
+    submission_id = cursor.fetchone()[0]
+    cursor.execute('''
+        INSERT INTO submissions (form_id, submission_id, data, status, dedup_key)
+        VALUES (?, ?, ?, ?, ?)
+    ''', (form_id, submission_id, json.dumps(values), status, key))
+    return submission_id
+
+def submission_tuple(form, row):
+    """A submissions row as a tuple in form.columns order"""
+    values = json.loads(row['data'])
+    response = (row['submission_id'],) + tuple(values.get(name) for name in form.names)
+    if form.waitlist:
+        response += (row['status'],)
+    return response
+
+def iter_submission_batches(cursor, form, batch_size=500):
+    """Yield lists of (column, ...) tuples for a form's responses in submission order"""
+    if form.archive_term:
+        for rows in get_response_archive().iter_batches(form.archive_term, form.form_id):
+            yield [submission_tuple(form, row) for row in rows]
+        return
+    cursor.execute('''
+        SELECT submission_id, data, status FROM submissions
+        WHERE form_id = ? ORDER BY submission_id
+    ''', (form.form_id,))
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        yield [submission_tuple(form, row) for row in rows]
+
+def fetch_submissions_after(cursor, form, after, limit):
+    """Up to `limit` responses with submission_id > `after`, a range scan of the primary key"""
+    if form.archive_term:
+        rows = get_response_archive().iter_rows(form.archive_term, form.form_id, after)
+        return [submission_tuple(form, row) for row in itertools.islice(rows, limit)]
+    cursor.execute('''
+        SELECT submission_id, data, status FROM submissions
+        WHERE form_id = ? AND submission_id > ? ORDER BY submission_id LIMIT ?
+    ''', (form.form_id, after, limit))
+    return [submission_tuple(form, row) for row in cursor.fetchall()]
+
+def iter_submissions(cursor, form):
+    for batch in iter_submission_batches(cursor, form):
+        yield from batch
+
+def encode_sort_cursor(value, submission_id):
+    return base64.urlsafe_b64encode(json.dumps([value, submission_id]).encode()).decode().rstrip('=')
+
+def decode_sort_cursor(token):
+    try:
+        value, submission_id = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except (binascii.Error, TypeError, UnicodeDecodeError, ValueError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(submission_id, int):
+        raise ValueError('Invalid cursor')
+    return value, submission_id
+
+def parse_response_query(form):
+    """Options for a responses query from the request args, raising ValueError
+
+    ?since_id=<id> returns only responses submitted after that id, ?sort=<field>
+    (&order=desc) sorts on a form field, ?q=<text> (&field=<name>) searches
+    and ?limit=<n>&after=<next_cursor> pages through the result.
+    """
+    sort = request.args.get('sort', 'id')
+    if sort not in form.columns:
+        raise ValueError(f'Unknown field: {sort}')
+    order = request.args.get('order', 'asc')
+    if order not in ('asc', 'desc'):
+        raise ValueError('order must be asc or desc')
+    field = request.args.get('field')
+    if field is not None and field not in form.columns[1:]:
+        raise ValueError(f'Unknown field: {field}')
+
+    since_id = int(request.args.get('since_id', 0))
+    limit = parse_limit_arg()
+    after = request.args.get('after')
+    if after is not None:
+        after = (None, int(after)) if sort == 'id' else decode_sort_cursor(after)
+    return {
+        'since_id': since_id, 'sort': sort, 'descending': order == 'desc',
+        'search': request.args.get('q') or None, 'field': field, 'after': after, 'limit': limit,
+    }
+
+def submission_value_sql(name, params):
+    """SQL for one response value, adding the JSON path to the named `params`"""
+    if name == 'status':
+        return 'status'
+    key = f'path{len(params)}'
+    params[key] = '$."' + name + '"'
+    return f'json_extract(data, :{key})'
+
+def query_submissions(cursor, form, since_id=0, sort='id', descending=False, search=None,
+                      field=None, after=None, limit=None):
+    """One page of a form's responses; returns (responses, next_cursor)
+
+    Filtering, sorting and the LIMIT all happen in SQLite, so a dashboard
+    polling for new rows or paging through a large event only ever
+    materialises the rows it will show.
+    """
+    clauses = ['form_id = :form_id', 'submission_id > :since_id']
+    params = {'form_id': form.form_id, 'since_id': since_id}
+    if search:
+        params['search'] = '%' + re.sub(r'([\\%_])', r'\\\1', search) + '%'
+        clauses.append('(' + ' OR '.join(
+            f"CAST({submission_value_sql(name, params)} AS TEXT) LIKE :search ESCAPE '\\'"
+            for name in ([field] if field else form.names)
+        ) + ')')
+
+    # Keyset pagination on (sort value, submission_id); NULLs sort as ''
+    sort_sql = 'submission_id'
+    if sort != 'id':
+        sort_sql = f"COALESCE({submission_value_sql(sort, params)}, '')"
+    direction, comparison = ('DESC', '<') if descending else ('ASC', '>')
+    if after is not None:
+        params['after_value'], params['after_id'] = after
+        if sort == 'id':
+            clauses.append(f'submission_id {comparison} :after_id')
+        else:
+            clauses.append(f'({sort_sql}, submission_id) {comparison} (:after_value, :after_id)')
+    order_sql = f'submission_id {direction}'
+    if sort != 'id':
+        order_sql = f'{sort_sql} {direction}, ' + order_sql
+
+    query = f'''
+        SELECT submission_id, data, status, {sort_sql} AS sort_value FROM submissions
+        WHERE {' AND '.join(clauses)} ORDER BY {order_sql}
+    '''
+    if limit is not None:
+        query += ' LIMIT :limit'
+        params['limit'] = limit
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if limit is not None and len(rows) == limit:
+        last = rows[-1]
+        next_cursor = last['submission_id'] if sort == 'id' else encode_sort_cursor(last['sort_value'], last['submission_id'])
+    return [dict(zip(form.columns, submission_tuple(form, row))) for row in rows], next_cursor
+
+def query_archived_submissions(form, since_id=0, sort='id', descending=False, search=None,
+                               field=None, after=None, limit=None):
+    """query_submissions for an archived form, which is only read in id order"""
+    after_id = None if after is None else after[1]
+    if descending:
+        rows = reversed(list(get_response_archive().iter_rows(form.archive_term, form.form_id, since_id)))
+        if after_id is not None:
+            rows = (row for row in rows if row['submission_id'] < after_id)
+    else:
+        start = since_id if after_id is None else max(since_id, after_id)
+        rows = get_response_archive().iter_rows(form.archive_term, form.form_id, start)
+    responses = [dict(zip(form.columns, submission_tuple(form, row))) for row in itertools.islice(rows, limit)]
+    next_cursor = None
+    if limit is not None and len(responses) == limit:
+        next_cursor = responses[-1]['id']
+    return responses, next_cursor
+
+def submissions_response(cursor, form):
+    try:
+        options = parse_response_query(form)
+        if form.archive_term and (options['search'] or options['sort'] != 'id'):
+            raise ValueError('archived responses can only be listed by id; download them to search or sort')
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid query: {str(e)}'}), 400
+
+    if form.archive_term:
+        responses, next_cursor = query_archived_submissions(form, **options)
+    else:
+        responses, next_cursor = query_submissions(cursor, form, **options)
+    # The client's new high-water mark for ?since_id=
+    last_id = max((response['id'] for response in responses), default=options['since_id'])
+    response = {'success': True, 'formId': form.form_id, 'responses': responses, 'lastId': last_id}
+    if options['limit'] is not None:
+        response['next_cursor'] = next_cursor
+    return jsonify(response)
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+def utc_timestamp(value=None):
+    """Format a datetime (now if None) the way SQLite's CURRENT_TIMESTAMP does"""
+    if value is None:
+        value = datetime.now(timezone.utc)
+    elif value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime(TIMESTAMP_FORMAT)
+
+def parse_timestamp(value):
+    """ISO 8601 string to a UTC timestamp; naive times are taken as UTC"""
+    if value in (None, ''):
+        return None
+    return utc_timestamp(datetime.fromisoformat(value))
+
+def open_recruitment(cursor, club_id, open_at=None, close_at=None):
+    """Mark a club as recruiting from `open_at` (default now) until `close_at`, if given"""
+    cursor.execute('''
+        UPDATE clubs
+        SET is_recruiting = 1, recruitment_open_at = ?, recruitment_close_at = ?
+        WHERE club_id = ?
+    ''', (open_at or utc_timestamp(), close_at, club_id))
+
+def close_recruitment(cursor, club_id):
+    cursor.execute('''
+        UPDATE clubs SET is_recruiting = 0, recruitment_close_at = ?
+        WHERE club_id = ? AND is_recruiting = 1
+    ''', (utc_timestamp(), club_id))
+
+def recruitment_window_open(club, now=None):
+    now = now or utc_timestamp()
+    return bool(club['is_recruiting']) and (club['recruitment_open_at'] or '') <= now and (
+        club['recruitment_close_at'] is None or club['recruitment_close_at'] > now
+    )
+
+def migrate_legacy_tables(conn):
+    """Import per-event `<name>_applications` and per-club `<name>_recruitments`
+    tables into forms/submissions, then drop them along with their triggers"""
+    cursor = conn.cursor()
+    cursor.execute('''
+        SELECT name FROM sqlite_master
+        WHERE type = 'table' AND (name LIKE '%\\_applications' ESCAPE '\\'
+                                  OR name LIKE '%\\_recruitments' ESCAPE '\\')
+        ORDER BY name
+    ''')
+    tables = [row['name'] for row in cursor.fetchall()]
+
+    report = []
+    for table_name in tables:
+        if table_name.endswith('_applications'):
+            kind = 'event'
+            prefix = table_name[:-len('_applications')]
+            # Same-named events shared one table, so it belongs to the newest one
+            cursor.execute('''
+                SELECT event_id FROM events
+                WHERE lower(replace(event_name, ' ', '_')) = ?
+                ORDER BY event_id DESC LIMIT 1
+            ''', (prefix,))
+        else:
+            kind = 'recruitment'
+            prefix = table_name[:-len('_recruitments')]
+            cursor.execute('''
+                SELECT club_id FROM clubs
+                WHERE lower(replace(club_name, ' ', '_')) = ?
+                ORDER BY club_id DESC LIMIT 1
+            ''', (prefix,))
+        owner = cursor.fetchone()
+        if not owner:
+            report.append({'table': table_name, 'status': 'skipped', 'reason': 'no matching owner'})
+            continue
+
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        fields = []
+        columns = []
+        for column in cursor.fetchall():
+            if column['name'] == 'id':
+                continue
+            field_type = 'text'
+            if 'real' in column['type'].lower():
+                field_type = 'number'
+            elif 'email' in column['name'].lower():
+                field_type = 'email'
+            fields.append({
+                'label': ' '.join(word.capitalize() for word in column['name'].split('_')),
+                'type': field_type,
+                'required': bool(column['notnull']),
+            })
+            columns.append(column['name'])
+
+        capacity = app.config['DEFAULT_REGISTRATION_LIMIT'] if kind == 'event' else None
+        form_id = create_form(cursor, kind, owner[0], fields, capacity=capacity)
+        if kind == 'recruitment':
+            open_recruitment(cursor, owner[0])
+        names = [field_name(field['label']) for field in fields]
+        cursor.execute(f"SELECT * FROM {table_name} ORDER BY id")
+        rows = [
+            (form_id, row['id'], json.dumps({
+                name: row[column] for name, column in zip(names, columns)
+            }))
+            for row in cursor.fetchall()
+        ]
+        cursor.executemany(
+            'INSERT INTO submissions (form_id, submission_id, data) VALUES (?, ?, ?)', rows
+        )
+        cursor.execute('''
+            UPDATE forms SET accepted_count = ?, last_submission_id = COALESCE(?, 0) WHERE form_id = ?
+        ''', (len(rows), max((row[1] for row in rows), default=None), form_id))
+
+        cursor.execute(f"DROP TRIGGER IF EXISTS check_registration_limit_{table_name}")
+        cursor.execute(f"DROP TABLE {table_name}")
+        report.append({'table': table_name, 'status': 'imported', 'form_id': form_id, 'rows': len(rows)})
+
+    conn.commit()
+    return report
+
+@app.cli.command('migrate')
+@click.option('--status', is_flag=True, help='only list the migrations and whether each is applied')
+def migrate_command(status):
+    """Create or upgrade the database schema (the server also does this at startup)."""
+    conn = migration_connection()
+    try:
+        if status:
+            applied = applied_migrations(conn)
+            for version, name, _ in MIGRATIONS:
+                print(f"version={version} status={'applied' if version in applied else 'pending'} name={name!r}")
+            return
+        for version, name in run_migrations(conn):
+            print(f'version={version} status=applied name={name!r}')
+    finally:
+        conn.close()
+
+@app.cli.command('migrate-legacy')
+def migrate_legacy_command():
+    """Import legacy per-event/per-club application tables."""
+    conn = get_db_connection()
+    report = migrate_legacy_tables(conn)
+    # Legacy tables never enforced one application per student
+    imported = tuple(entry['form_id'] for entry in report if 'form_id' in entry)
+    if imported:
+        report += compact_submissions(conn, imported)
+    for entry in report:
+        print(' '.join(f"{key}={value}" for key, value in entry.items()))
+
+STATUS_RANK = {'accepted': 0, 'waitlisted': 1}
+
+def merge_duplicate(cursor, form_id, key, first, later):
+    """Fold `later` into `first`, the earlier response: its blanks are filled
+    from the later one and it keeps the better of the two statuses"""
+    values = json.loads(later['data'])
+    values.update({name: value for name, value in json.loads(first['data']).items() if value is not None})
+    status = min(first['status'], later['status'], key=lambda status: STATUS_RANK.get(status, 2))
+    cursor.execute('DELETE FROM submissions WHERE form_id = ? AND submission_id = ?',
+                   (form_id, later['submission_id']))
+    cursor.execute('''
+        UPDATE submissions SET data = ?, status = ?, dedup_key = ?
+        WHERE form_id = ? AND submission_id = ?
+    ''', (json.dumps(values), status, key, form_id, first['submission_id']))
+
+def compact_submissions(conn, form_ids=(), batch_size=500):
+    """Give existing responses their uniqueness keys, merging duplicates.
+
+    Responses saved before their form had a uniqueness key (legacy
+    imports, older forms) have no dedup_key. They are keyed in batches of
+    `batch_size`, each its own short write transaction so registrations
+    keep flowing, and every duplicate is merged into the earliest response.
+    The form's counters are recounted at the end.
+    """
+    cursor = conn.cursor()
+    query = 'SELECT form_id, unique_field FROM forms WHERE unique_field IS NOT NULL AND archive_term IS NULL'
+    if form_ids:
+        query += f" AND form_id IN ({', '.join('?' * len(form_ids))})"
+    cursor.execute(query + ' ORDER BY form_id', form_ids)
+
+    report = []
+    for form in cursor.fetchall():
+        form_id, unique_field = form['form_id'], form['unique_field']
+        keyed = merged = 0
+        while True:
+            cursor.execute('BEGIN IMMEDIATE')
+            # Responses without a value for the key are left unkeyed
+            cursor.execute('''
+                SELECT submission_id, data, status FROM submissions
+                WHERE form_id = ? AND dedup_key IS NULL AND json_extract(data, ?) IS NOT NULL
+                ORDER BY submission_id LIMIT ?
+            ''', (form_id, '$."' + unique_field + '"', batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            for row in rows:
+                key = dedup_key(json.loads(row['data'])[unique_field])
+                cursor.execute('''
+                    SELECT submission_id, data, status FROM submissions WHERE form_id = ? AND dedup_key = ?
+                ''', (form_id, key))
+                existing = cursor.fetchone()
+                if existing is None:
+                    cursor.execute('''
+                        UPDATE submissions SET dedup_key = ? WHERE form_id = ? AND submission_id = ?
+                    ''', (key, form_id, row['submission_id']))
+                    keyed += 1
+                else:
+                    first, later = sorted((existing, row), key=lambda response: response['submission_id'])
+                    merge_duplicate(cursor, form_id, key, first, later)
+                    merged += 1
+            conn.commit()
+
+        cursor.execute('''
+            UPDATE forms SET
+                accepted_count = (SELECT COUNT(*) FROM submissions WHERE form_id = ? AND status = 'accepted'),
+                waitlisted_count = (SELECT COUNT(*) FROM submissions WHERE form_id = ? AND status = 'waitlisted')
+            WHERE form_id = ?
+        ''', (form_id, form_id, form_id))
+        conn.commit()
+        if keyed or merged:
+            report.append({'form_id': form_id, 'field': unique_field, 'keyed': keyed, 'merged': merged})
+    return report
+
+def set_unique_field(conn, name, form_ids=()):
+    """Make field `name` the uniqueness key of the forms that have it and no key yet"""
+    query = '''
+        UPDATE forms SET unique_field = :name
+        WHERE unique_field IS NULL
+          AND EXISTS (SELECT 1 FROM json_each(forms.fields) WHERE json_extract(value, '$.name') = :name)
+    '''
+    params = {'name': name}
+    if form_ids:
+        query += f" AND form_id IN ({', '.join(f':form{i}' for i in range(len(form_ids)))})"
+        params.update((f'form{i}', form_id) for i, form_id in enumerate(form_ids))
+    updated = conn.execute(query, params).rowcount
+    conn.commit()
+    return updated
+
+@app.cli.command('compact-submissions')
+@click.option('--form', 'form_ids', type=int, multiple=True, help='only these form ids (repeatable)')
+@click.option('--field', default=None, help='make this field the uniqueness key of forms that have none')
+def compact_submissions_command(form_ids, field):
+    """Key existing responses by their form's uniqueness field and merge duplicates.
+
+    Safe to run while the server is up, e.g. from cron.
+    """
+    conn = get_db_connection()
+    if field:
+        print(f'forms={set_unique_field(conn, field_name(field), form_ids)} unique_field={field_name(field)}')
+    for entry in compact_submissions(conn, form_ids):
+        print(' '.join(f"{key}={value}" for key, value in entry.items()))
+
+# Image blob store: uploaded images (including data: URIs pasted into the
+# event form) are written once under BLOB_DIR, named by their SHA-256, and
+# the catalog keeps only their URLs. Large images also get a downscaled
+# copy that the list endpoints return instead.
+IMAGE_TYPES = {
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/gif': 'gif',
+    'image/webp': 'webp',
+    'image/svg+xml': 'svg',
+}
+BLOB_TYPES = {extension: content_type for content_type, extension in IMAGE_TYPES.items()}
+
+class ImageError(ValueError):
+    pass
+
+class BlobStore:
+    """Immutable files under `root`, stored as <root>/<digest[:2]>/<digest>"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, data):
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial file
+            temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        return digest
+
+def get_blob_store():
+    store = app.extensions.get('blob_store')
+    if store is None:
+        store = app.extensions['blob_store'] = BlobStore(app.config['BLOB_DIR'])
+    return store
+
+def decode_data_uri(value):
+    """(content_type, bytes) from a data: URI, raising ImageError"""
+    header, _, payload = value[len('data:'):].partition(',')
+    content_type, *params = header.split(';')
+    content_type = content_type.strip().lower()
+    if content_type not in IMAGE_TYPES:
+        raise ImageError(f'Unsupported image type: {content_type or "unknown"}')
+    try:
+        if 'base64' in params:
+            data = base64.b64decode(payload, validate=True)
+        else:
+            data = unquote_to_bytes(payload)
+    except binascii.Error:
+        raise ImageError('Image data is not valid base64')
+    return content_type, data
+
+def make_thumbnail(data, content_type):
+    """A downscaled copy of a raster image wider than THUMBNAIL_WIDTH, or None.
+
+    Needs Pillow; without it list responses fall back to the full image.
+    """
+    if content_type not in ('image/png', 'image/jpeg', 'image/webp'):
+        return None
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    width = app.config['THUMBNAIL_WIDTH']
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.width <= width:
+                return None
+            image.thumbnail((width, width * image.height // image.width or 1))
+            output = io.BytesIO()
+            image_format = {'image/png': 'PNG', 'image/jpeg': 'JPEG', 'image/webp': 'WEBP'}[content_type]
+            image.save(output, format=image_format, optimize=True)
+    except (OSError, ValueError):
+        return None
+    return output.getvalue()
+
+def blob_url(data, content_type, base_url):
+    return f'{base_url}/api/blobs/{hashlib.sha256(data).hexdigest()}.{IMAGE_TYPES[content_type]}'
+
+def store_blobs(cursor, blobs):
+    """Write (data, content_type) pairs to the blob store and record them"""
+    for data, content_type in blobs:
+        digest = get_blob_store().put(data)
+        cursor.execute(
+            'INSERT OR IGNORE INTO blobs (digest, content_type, size) VALUES (?, ?, ?)',
+            (digest, content_type, len(data))
+        )
+
+def stage_image(data, content_type, base_url):
+    """Check an image and make its thumbnail without storing anything.
+
+    Returns (url, thumbnail_url or None, blobs): the URLs the image will
+    be served from once `blobs` has been passed to store_blobs().
+    """
+    if content_type not in IMAGE_TYPES:
+        raise ImageError(f'Unsupported image type: {content_type}')
+    if len(data) > app.config['MAX_IMAGE_BYTES']:
+        raise ImageError(f"Images can be at most {app.config['MAX_IMAGE_BYTES'] // (1024 * 1024)} MB")
+    blobs = [(data, content_type)]
+    thumbnail = make_thumbnail(data, content_type)
+    if thumbnail:
+        blobs.append((thumbnail, content_type))
+    thumbnail_url = blob_url(thumbnail, content_type, base_url) if thumbnail else None
+    return blob_url(data, content_type, base_url), thumbnail_url, blobs
+
+def stage_inline_image(value, base_url):
+    """stage_image() for an inline data: URI; plain URLs are kept as they are, with nothing to store"""
+    if not value or not value.startswith('data:'):
+        return value, None, []
+    content_type, data = decode_data_uri(value)
+    return stage_image(data, content_type, base_url)
+
+def store_image(cursor, data, content_type, base_url):
+    """Store an image and its thumbnail; returns (url, thumbnail_url or None)"""
+    url, thumbnail_url, blobs = stage_image(data, content_type, base_url)
+    store_blobs(cursor, blobs)
+    return url, thumbnail_url
+
+def ingest_image(cursor, value, base_url):
+    """Move an inline data: URI into the blob store; plain URLs are kept as they are"""
+    url, thumbnail_url, blobs = stage_inline_image(value, base_url)
+    store_blobs(cursor, blobs)
+    return url, thumbnail_url
+
+def blob_base_url():
+    return app.config['PUBLIC_URL'] or request.host_url.rstrip('/')
+
+@app.route('/api/blobs', methods=['POST'])
+def upload_blob():
+    """Upload an image as a multipart `file` or as the raw request body"""
+    upload = request.files.get('file')
+    if upload is not None:
+        content_type = (upload.mimetype or '').lower()
+        data = upload.read(app.config['MAX_IMAGE_BYTES'] + 1)
+    else:
+        content_type = (request.mimetype or '').lower()
+        data = request.get_data()
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        url, thumbnail_url = store_image(cursor, data, content_type, blob_base_url())
+        conn.commit()
+        return jsonify({'success': True, 'url': url, 'thumbnailUrl': thumbnail_url or url})
+    except ImageError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/blobs/<digest>.<extension>', methods=['GET'])
+def get_blob(digest, extension):
+    content_type = BLOB_TYPES.get(extension)
+    path = get_blob_store().path(digest)
+    if content_type is None or not re.fullmatch(r'[0-9a-f]{64}', digest) or not os.path.exists(path):
+        return jsonify({'success': False, 'message': 'Image not found'}), 404
+
+    # The name is the content hash, so the file can be cached forever;
+    # send_file answers Range and If-None-Match requests itself
+    response = send_file(path, mimetype=content_type, conditional=True, etag=digest,
+                         max_age=31536000, last_modified=None)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    if content_type == 'image/svg+xml':
+        # SVGs can carry scripts; never let one run on the API's origin
+        response.headers['Content-Security-Policy'] = "default-src 'none'; style-src 'unsafe-inline'; sandbox"
+    return response
+
+def offload_inline_images(conn, base_url):
+    """Move data: URIs already stored in events and clubs into the blob store"""
+    cursor = conn.cursor()
+    moved = {'events': 0, 'clubs': 0}
+    for table, key, column, thumbnail_column in (
+        ('events', 'event_id', 'event_image', 'event_thumb'),
+        ('clubs', 'club_id', 'club_logo_image', 'club_logo_thumb'),
+    ):
+        cursor.execute(f"SELECT {key}, {column} FROM {table} WHERE {column} LIKE 'data:%'")
+        for row in cursor.fetchall():
+            try:
+                url, thumbnail_url = ingest_image(cursor, row[column], base_url)
+            except ImageError as e:
+                app.logger.warning('Skipping %s %s: %s', table, row[key], e)
+                continue
+            cursor.execute(
+                f'UPDATE {table} SET {column} = ?, {thumbnail_column} = ? WHERE {key} = ?',
+                (url, thumbnail_url, row[key])
+            )
+            moved[table] += 1
+        conn.commit()
+    return moved
+
+@app.cli.command('offload-images')
+@click.option('--base-url', default=None, help='public URL of the API (default: PESU_PUBLIC_URL or http://localhost:5000)')
+def offload_images_command(base_url):
+    """Move inline data: URI images into the blob store."""
+    base_url = (base_url or app.config['PUBLIC_URL'] or 'http://localhost:5000').rstrip('/')
+    moved = offload_inline_images(get_db_connection(), base_url)
+    catalog_cache.invalidate_all()
+    print(' '.join(f"{table}={count}" for table, count in moved.items()))
+
+@app.cli.command('rebuild-analytics')
+def rebuild_analytics_command():
+    """Recount the registration analytics rollups from all responses."""
+    conn = get_db_connection()
+    rebuild_rollups(conn)
+    conn.commit()
+
+@app.cli.command('rebuild-search-index')
+def rebuild_search_index_command():
+    """Refill the full-text search indexes from events and clubs."""
+    conn = get_db_connection()
+    rebuild_search_index(conn)
+    conn.commit()
+
+class CatalogCache:
+    """Read-through LRU cache for catalog payloads (clubs, events, forms).
+
+    Each entry is stamped with the versions of the tags it was loaded under.
+    invalidate() bumps a tag's version, so every entry built from the old
+    data is treated as a miss from then on and falls out of the LRU.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _stamp(self, tags):
+        return (self._generation,) + tuple(self._versions.get(tag, 0) for tag in tags)
+
+    def get_or_load(self, key, tags, loader):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, stamp, value = entry
+                if expires_at > time.monotonic() and stamp == self._stamp(tags):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            # Stamp before loading so a write that lands mid-load marks this entry stale
+            stamp = self._stamp(tags)
+
+        value = loader()
+
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, stamp, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, *tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+            self.invalidations += len(tags)
+
+    def invalidate_all(self):
+        """Invalidate every entry, including any still being loaded"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+catalog_cache = CatalogCache(
+    max_entries=app.config['CATALOG_CACHE_SIZE'],
+    ttl=app.config['CATALOG_CACHE_TTL'],
+)
+
+# Compiled FormSchema objects keyed by (kind, owner_id, open_only), tagged
+# form:<kind>:<owner_id> and invalidated whenever a form is opened or closed
+form_registry = CatalogCache(
+    max_entries=app.config['FORM_REGISTRY_SIZE'],
+    ttl=app.config['CATALOG_CACHE_TTL'],
+)
+
+_cache_sync_lock = threading.Lock()
+_cache_sync = {'checked_at': 0.0, 'versions': None}
+
+def read_resource_versions(cursor):
+    cursor.execute('SELECT resource, version FROM resource_versions')
+    return {row['resource']: row['version'] for row in cursor.fetchall()}
+
+def sync_resource_versions(versions):
+    """Drop cached catalog data if `versions` is ahead of what this process has seen.
+
+    Writes made here are recorded by commit_catalog_write, which
+    invalidates their tags precisely, so only other processes' writes
+    flush everything.
+    """
+    with _cache_sync_lock:
+        synced = _cache_sync['versions']
+        if synced is not None and any(version > synced.get(resource, 0) for resource, version in versions.items()):
+            catalog_cache.invalidate_all()
+            form_registry.invalidate_all()
+        merged = dict(synced or {})
+        for resource, version in versions.items():
+            merged[resource] = max(version, merged.get(resource, version))
+        _cache_sync['versions'] = merged
+
+@app.before_request
+def sync_caches():
+    """Drop cached catalog data once another process has changed the tables behind it.
+
+    Invalidation is in-process, so with several workers each one compares
+    the resource_versions counters (bumped by triggers on every catalog
+    write) at most once per CACHE_SYNC_INTERVAL and starts over on a change.
+    """
+    interval = app.config['CACHE_SYNC_INTERVAL']
+    if interval <= 0 or time.monotonic() - _cache_sync['checked_at'] < interval:
+        return
+    _cache_sync['checked_at'] = time.monotonic()
+    sync_resource_versions(read_resource_versions(get_db_connection().cursor()))
+
+def begin_catalog_write(conn):
+    """BEGIN IMMEDIATE for a write to clubs, events or forms; returns the
+    resource versions it starts from (None if a transaction is already open)"""
+    if conn.in_transaction:
+        return None
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    return read_resource_versions(cursor)
+
+def commit_catalog_write(conn, before, tags=(), form_tags=()):
+    """Commit a write begun with begin_catalog_write and invalidate the
+    cache tags it touched; returns the resource versions it committed.
+
+    The versions it bumped count as seen, so the next sync doesn't flush
+    every cache for them, unless another process wrote in between.
+    """
+    after = read_resource_versions(conn.cursor())
+    conn.commit()
+    form_registry.invalidate(*form_tags)
+    catalog_cache.invalidate(*tags)
+    with _cache_sync_lock:
+        if before is not None and _cache_sync['versions'] == before:
+            _cache_sync['versions'] = after
+    return after
+
+@app.route('/api/stats/cache', methods=['GET'])
+def get_cache_stats():
+    return jsonify({
+        'success': True,
+        'cache': catalog_cache.stats(),
+        'forms': form_registry.stats(),
+    })
+
+@app.route('/api/login', methods=['POST'])
+def login():
+    data = request.json
+    email = data.get('email')
+    password = data.get('password')
+    
+    if not email or not password:
+        return jsonify({'success': False, 'message': 'Email and password are required'}), 400
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Query to check if email and password match
+        cursor.execute('''
+            SELECT club_id, club_name, club_email_id, club_description, club_logo_image 
+            FROM clubs 
+            WHERE club_email_id = ? AND password = ?
+        ''', (email, password))
+        
+        club = cursor.fetchone()
+        
+        if club:
+            return jsonify({
+                'success': True,
+                'message': 'Login successful',
+                'club': dict(club)
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'message': 'Invalid email or password'
+            }), 401
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'An error occurred during login'
+        }), 500
+
+# Bump when the JSON shape of a versioned route changes, so clients holding
+# an old ETag can't get a 304 for a representation they've never seen
+CATALOG_FORMAT_VERSION = 1
+
+def resource_etag(versions, resources):
+    """ETag for `resources` at `versions`"""
+    return f"v{CATALOG_FORMAT_VERSION}-" + '-'.join(str(versions.get(resource, 0)) for resource in resources)
+
+def versioned(*resources):
+    """Tag a GET route's response with the change counters of the tables it
+    reads, and answer a matching If-None-Match with 304 before the view runs.
+
+    There is no Last-Modified: updated_at only has one-second resolution, so
+    If-Modified-Since would answer 304 across two writes in the same second.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            versions = read_resource_versions(get_db_connection().cursor())
+            # The body comes from this process's caches, which must not be older than the ETag
+            if app.config['CACHE_SYNC_INTERVAL'] > 0:
+                sync_resource_versions(versions)
+            etag = resource_etag(versions, resources)
+            not_modified = bool(request.if_none_match) and request.if_none_match.contains_weak(etag)
+
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            response.cache_control.public = True
+            if app.config['CATALOG_MAX_AGE'] > 0:
+                response.cache_control.max_age = app.config['CATALOG_MAX_AGE']
+            else:
+                response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
+
+def load_club_details(club_id):
+    cursor = get_db_connection().cursor()
+    cursor.execute('''
+        SELECT club_id, club_name, club_description, club_logo_image 
+        FROM clubs 
+        WHERE club_id = ?
+    ''', (club_id,))
+    club = cursor.fetchone()
+    return dict(club) if club else None
+
+@app.route('/api/club/<int:club_id>', methods=['GET'])
+@versioned('clubs')
+def get_club_details(club_id):
+    try:
+        club = catalog_cache.get_or_load(
+            ('club', club_id), ('clubs', f'club:{club_id}'),
+            lambda: load_club_details(club_id)
+        )
+        
+        if club:
+            return jsonify({
+                'success': True,
+                'club': club
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'message': 'Club not found'
+            }), 404
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'An error occurred while fetching club details'
+        }), 500
+
+def load_club_events(club_id):
+    cursor = get_db_connection().cursor()
+    cursor.execute('''
+        SELECT 
+        e.event_id, 
+        e.event_name, 
+        COALESCE(e.event_thumb, e.event_image), 
+        e.event_date, 
+        e.event_time, 
+        e.event_venue, 
+        c.club_name 
+    FROM 
+        events e
+    JOIN 
+        clubs c 
+    ON 
+        e.club_id = c.club_id
+    WHERE 
+        e.club_id = ?;
+
+    ''', (club_id,))
+    
+    # Convert events to list of dictionaries
+    column_names = ['event_id', 'event_name', 'event_image', 'event_date', 'event_time', 'event_venue']
+    return [dict(zip(column_names, event)) for event in cursor.fetchall()]
+
+@app.route('/api/events/<int:club_id>', methods=['GET'])
+@versioned('events', 'clubs')
+def get_club_events(club_id):
+    try:
+        events = catalog_cache.get_or_load(
+            ('club_events', club_id), ('clubs', f'club_events:{club_id}'),
+            lambda: load_club_events(club_id)
+        )
+        
+        return jsonify({
+            'success': True,
+            'events': events
+        })
+            
+    except Exception as e:
+        app.logger.exception('Error fetching events')
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred: {str(e)}'
+        }), 500
+    
+@app.route('/api/recruitment/create', methods=['POST'])
+def create_recruitment_form():
+    data = request.json
+    club_id = data.get('clubId')
+    fields = data.get('fields')
+
+    try:
+        open_at = parse_timestamp(data.get('opensAt'))
+        close_at = parse_timestamp(data.get('closesAt'))
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'opensAt and closesAt must be ISO 8601 timestamps'}), 400
+    if close_at and close_at <= (open_at or utc_timestamp()):
+        return jsonify({'success': False, 'message': 'closesAt must be after opensAt'}), 400
+
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT club_id FROM clubs WHERE club_id = ?', (club_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Club not found'}), 404
+
+        # Replaces the club's current recruitment form, if there is one
+        before = begin_catalog_write(conn)
+        try:
+            create_form(cursor, 'recruitment', club_id, fields, unique_field=data.get('uniqueField'),
+                        rollup_fields=data.get('rollupFields'))
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        open_recruitment(cursor, club_id, open_at, close_at)
+        commit_catalog_write(conn, before, ('recruiting_clubs',), (form_tag('recruitment', club_id),))
+
+        return jsonify({'success': True, 'message': 'Recruitment form created successfully'})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/recruitment/status/<int:club_id>', methods=['GET'])
+def check_recruitment_status(club_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT is_recruiting, recruitment_open_at, recruitment_close_at
+            FROM clubs WHERE club_id = ?
+        ''', (club_id,))
+        club = cursor.fetchone()
+        if not club:
+            return jsonify({'success': False, 'message': 'Club not found'}), 404
+
+        exists = get_form(cursor, 'recruitment', club_id) is not None
+        
+        return jsonify({
+            'success': True,
+            'exists': exists,
+            'recruiting': exists and recruitment_window_open(club),
+            'opensAt': club['recruitment_open_at'],
+            'closesAt': club['recruitment_close_at'],
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/recruitment/responses/<int:club_id>', methods=['GET'])
+def get_recruitment_responses(club_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT club_id FROM clubs WHERE club_id = ?', (club_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Club not found'}), 404
+
+        # Closed forms keep their responses, so fall back to the latest one
+        form = get_form(cursor, 'recruitment', club_id, open_only=False)
+        if not form:
+            return jsonify({'success': False, 'message': 'No recruitment form found'}), 404
+
+        return submissions_response(cursor, form)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+# Venue bookings: each event occupies [starts_at, ends_at) at its venue.
+# Times are local 'YYYY-MM-DD HH:MM' strings, so they compare in order.
+EVENT_TIME_FORMAT = '%Y-%m-%d %H:%M'
+
+def venue_key(venue):
+    return ' '.join((venue or '').split()).casefold()
+
+def event_interval(event_date, event_time, end_time=None, duration=None):
+    """(starts_at, ends_at) for an event; raises ValueError
+
+    The end is `end_time` (HH:MM) on the same day, or `duration` minutes
+    (EVENT_DEFAULT_DURATION if neither is given) after the start.
+    """
+    start = datetime.strptime(f'{event_date} {event_time}', EVENT_TIME_FORMAT)
+    if end_time:
+        end = datetime.strptime(f'{event_date} {end_time}', EVENT_TIME_FORMAT)
+    else:
+        end = start + timedelta(minutes=int(duration or app.config['EVENT_DEFAULT_DURATION']))
+    if end <= start:
+        raise ValueError('An event must end after it starts')
+    return start.strftime(EVENT_TIME_FORMAT), end.strftime(EVENT_TIME_FORMAT)
+
+class IntervalNode:
+    """Centered interval tree node: the intervals containing `center`, sorted
+    by start and (as (end, interval) pairs) by end, plus subtrees for those
+    entirely before and after"""
+    __slots__ = ('center', 'by_start', 'by_end', 'left', 'right')
+
+    def __init__(self, intervals):
+        # The median start lies inside its own interval, so every node keeps at least one
+        starts = sorted(start for start, _, _ in intervals)
+        self.center = starts[len(starts) // 2]
+        here = [interval for interval in intervals if interval[0] <= self.center < interval[1]]
+        self.by_start = sorted(here)
+        self.by_end = sorted((interval[1], interval) for interval in here)
+        before = [interval for interval in intervals if interval[1] <= self.center]
+        after = [interval for interval in intervals if interval[0] > self.center]
+        self.left = IntervalNode(before) if before else None
+        self.right = IntervalNode(after) if after else None
+
+    def insert(self, interval):
+        """Add one interval in place; returns the depth of the node that holds it"""
+        node, depth = self, 1
+        while True:
+            if interval[1] <= node.center:
+                side = 'left'
+            elif interval[0] > node.center:
+                side = 'right'
+            else:
+                bisect.insort(node.by_start, interval)
+                bisect.insort(node.by_end, (interval[1], interval))
+                return depth
+            child = getattr(node, side)
+            depth += 1
+            if child is None:
+                setattr(node, side, IntervalNode([interval]))
+                return depth
+            node = child
+
+    def overlapping(self, start, end, found):
+        """Append every interval overlapping [start, end) to `found`: O(log n + k)"""
+        node = self
+        while node is not None:
+            if end <= node.center:
+                # Everything here reaches past the center, so only the start matters
+                for interval in node.by_start:
+                    if interval[0] >= end:
+                        break
+                    found.append(interval)
+                node = node.left
+            elif start >= node.center:
+                for interval_end, interval in reversed(node.by_end):
+                    if interval_end <= start:
+                        break
+                    found.append(interval)
+                node = node.right
+            else:
+                found.extend(node.by_start)
+                if node.left is not None:
+                    node.left.overlapping(start, end, found)
+                node = node.right
+        return found
+
+class VenueIndex:
+    """In-memory interval trees of event bookings, one per venue.
+
+    The trees mirror the events table as of `version`, the events counter
+    in resource_versions. New events are inserted into their venue's tree
+    in place; any other change to events (an edit or removal, by this or
+    another process) shows up as a newer version and the bookings reload.
+    Trees are built lazily, on the first lookup at a venue after a reload
+    or after inserts have left the tree too deep.
+    """
+
+    def __init__(self):
+        self.version = None
+        self._bookings = {}
+        self._trees = {}
+        self._lock = threading.Lock()
+
+    def refresh(self, cursor):
+        cursor.execute("SELECT version FROM resource_versions WHERE resource = 'events'")
+        version = cursor.fetchone()['version']
+        with self._lock:
+            if version == self.version:
+                return
+        cursor.execute('SELECT event_id, event_venue, starts_at, ends_at FROM events WHERE starts_at IS NOT NULL')
+        bookings = {}
+        for row in cursor.fetchall():
+            bookings.setdefault(venue_key(row['event_venue']), []).append(
+                (row['starts_at'], row['ends_at'], row['event_id'])
+            )
+        with self._lock:
+            self._bookings = bookings
+            self._trees = {}
+            self.version = version
+
+    def add(self, venue, starts_at, ends_at, event_id, version):
+        """Record an event committed at events `version`"""
+        venue = venue_key(venue)
+        with self._lock:
+            intervals = self._bookings.setdefault(venue, [])
+            intervals.append((starts_at, ends_at, event_id))
+            tree = self._trees.get(venue)
+            # A median-built tree is about log2(n) deep; much deeper and the next lookup rebuilds it
+            if tree is not None and tree.insert(intervals[-1]) > 2 * math.log2(len(intervals)) + 2:
+                del self._trees[venue]
+            # Only skip the reload if nothing else changed events in between
+            if self.version is not None and version == self.version + 1:
+                self.version = version
+
+    def overlapping(self, venue, starts_at, ends_at):
+        """(starts_at, ends_at, event_id) of the bookings at `venue` overlapping the slot, by start"""
+        venue = venue_key(venue)
+        with self._lock:
+            tree = self._trees.get(venue)
+            if tree is None:
+                if not self._bookings.get(venue):
+                    return []
+                tree = self._trees[venue] = IntervalNode(self._bookings[venue])
+            # Inserts change the tree in place, so it is only walked under the lock
+            found = tree.overlapping(starts_at, ends_at, [])
+        return sorted(found)
+
+venue_index = VenueIndex()
+
+def find_venue_conflicts(cursor, venue, starts_at, ends_at):
+    venue_index.refresh(cursor)
+    bookings = venue_index.overlapping(venue, starts_at, ends_at)
+    if not bookings:
+        return []
+    placeholders = ','.join('?' for _ in bookings)
+    cursor.execute(f'SELECT event_id, event_name FROM events WHERE event_id IN ({placeholders})',
+                   [event_id for _, _, event_id in bookings])
+    names = {row['event_id']: row['event_name'] for row in cursor.fetchall()}
+    return [{'event_id': event_id, 'event_name': names.get(event_id), 'starts_at': start, 'ends_at': end}
+            for start, end, event_id in bookings]
+
+@app.route('/api/venues/<path:venue>/availability', methods=['GET'])
+def get_venue_availability(venue):
+    """Bookings and free gaps at a venue between ?from= and ?to= (inclusive dates)"""
+    try:
+        date_from = parse_date_arg('from') or datetime.now().strftime('%Y-%m-%d')
+        date_to = parse_date_arg('to') or date_from
+        window_start = f'{date_from} 00:00'
+        window_end = (datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)).strftime(EVENT_TIME_FORMAT)
+        if window_end <= window_start:
+            raise ValueError('to must not be before from')
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid query: {str(e)}'}), 400
+
+    try:
+        bookings = find_venue_conflicts(get_db_connection().cursor(), venue, window_start, window_end)
+        free, cursor_time = [], window_start
+        for booking in bookings:
+            if booking['starts_at'] > cursor_time:
+                free.append({'starts_at': cursor_time, 'ends_at': booking['starts_at']})
+            cursor_time = max(cursor_time, booking['ends_at'])
+        if cursor_time < window_end:
+            free.append({'starts_at': cursor_time, 'ends_at': window_end})
+        return jsonify({'success': True, 'venue': venue, 'bookings': bookings, 'free': free})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/events/create', methods=['POST'])
+def create_event():
+    data = request.json
+    club_id = data.get('clubId')
+    event_name = data.get('eventName')
+    event_image = data.get('eventImage')
+    event_date = data.get('eventDate')
+    event_time = data.get('eventTime')
+    event_venue = data.get('eventVenue')
+    event_description = data.get('eventDescription')
+    event_fields = data.get('eventFields', [])
+    registration_limit = data.get('registrationLimit')
+    if registration_limit is None:
+        registration_limit = app.config['DEFAULT_REGISTRATION_LIMIT']
+    enable_waitlist = bool(data.get('enableWaitlist'))
+    on_conflict = data.get('onConflict') or app.config['VENUE_CONFLICTS']
+
+    try:
+        registration_limit = int(registration_limit)
+        if registration_limit < 1:
+            raise ValueError
+    except (TypeError, ValueError):
+        return jsonify({'success': False, 'message': 'Registration limit must be a positive number'}), 400
+    try:
+        starts_at, ends_at = event_interval(event_date, event_time, data.get('eventEndTime'), data.get('eventDuration'))
+    except (TypeError, ValueError):
+        return jsonify({
+            'success': False,
+            'message': 'eventDate, eventTime and eventEndTime must be YYYY-MM-DD and HH:MM, ending after the start'
+        }), 400
+    if on_conflict not in ('reject', 'warn'):
+        return jsonify({'success': False, 'message': 'onConflict must be reject or warn'}), 400
+
+    # Pasted data: URIs go to the blob store, but only once the event is
+    # accepted, so a rejected request leaves no orphaned files; the event
+    # keeps their URLs
+    try:
+        event_image, event_thumb, image_blobs = stage_inline_image(event_image, blob_base_url())
+    except ImageError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        # Hold the write lock from the clash check to the commit, so two
+        # processes can't book the same slot at once
+        before = begin_catalog_write(conn)
+        conflicts = find_venue_conflicts(cursor, event_venue, starts_at, ends_at)
+        if conflicts and on_conflict == 'reject':
+            conn.rollback()
+            return jsonify({
+                'success': False,
+                'message': f"{event_venue} is already booked at that time",
+                'conflicts': conflicts,
+            }), 409
+
+        # Insert event into events table
+        cursor.execute('''
+            INSERT INTO events (club_id, event_name, event_description, event_date, event_image, event_thumb, event_time, event_venue, starts_at, ends_at) 
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (club_id, event_name, event_description, event_date, event_image, event_thumb, event_time, event_venue, starts_at, ends_at))
+        event_id = cursor.lastrowid
+
+        # Open the event's registration form with its capacity
+        try:
+            create_form(cursor, 'event', event_id, event_fields, capacity=registration_limit,
+                        waitlist=enable_waitlist, unique_field=data.get('uniqueField'),
+                        rollup_fields=data.get('rollupFields'))
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+        store_blobs(cursor, image_blobs)
+        versions = commit_catalog_write(
+            conn, before,
+            ('events', f'event:{event_id}', f'event_form:{event_id}', f'club_events:{club_id}'),
+            (form_tag('event', event_id),)
+        )
+        venue_index.add(event_venue, starts_at, ends_at, event_id, versions['events'])
+
+        response = {
+            'success': True, 
+            'message': 'Event created successfully', 
+            'eventId': event_id
+        }
+        if conflicts:
+            response['conflicts'] = conflicts
+        return jsonify(response)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/events/application/<int:event_id>', methods=['GET'])
+def get_event_application_status(event_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT event_id FROM events WHERE event_id = ?', (event_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Event not found'}), 404
+
+        form = get_form(cursor, 'event', event_id)
+        if not form:
+            return jsonify({'success': True, 'exists': False})
+        
+        return jsonify({'success': True, 'exists': True, **get_capacity(cursor, form.form_id)})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/events/application/responses/<int:event_id>', methods=['GET'])
+def get_event_application_responses(event_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT event_id FROM events WHERE event_id = ?', (event_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Event not found'}), 404
+
+        # Closed forms keep their responses, so fall back to the latest one
+        form = get_form(cursor, 'event', event_id, open_only=False)
+        if not form:
+            return jsonify({'success': False, 'message': 'No registration form found'}), 404
+
+        return submissions_response(cursor, form)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+def load_event_details(event_id):
+    cursor = get_db_connection().cursor()
+    cursor.execute('''
+        SELECT event_id, event_name, event_description, event_image, event_date, event_time, event_venue 
+        FROM events 
+        WHERE event_id = ?
+    ''', (event_id,))
+    event = cursor.fetchone()
+    if not event:
+        return None
+    
+    # Convert event to dictionary with column names
+    column_names = ['event_id', 'event_name', 'event_description', 'event_image', 'event_date', 'event_time', 'event_venue']
+    return dict(zip(column_names, event))
+
+@app.route('/api/events/details/<int:event_id>', methods=['GET'])
+@versioned('events')
+def get_event_details(event_id):
+    try:
+        event_dict = catalog_cache.get_or_load(
+            ('event', event_id), (f'event:{event_id}',),
+            lambda: load_event_details(event_id)
+        )
+        
+        if event_dict:
+            return jsonify({
+                'success': True,
+                'event': event_dict
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'message': 'Event not found'
+            }), 404
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred while fetching event details: {str(e)}'
+        }), 500
+    
+CLUB_LIST_FIELDS = {
+    'club_id': 'club_id',
+    'club_name': 'club_name',
+    'club_description': 'club_description',
+    # Lists show the downscaled logo when there is one
+    'club_logo_image': 'COALESCE(club_logo_thumb, club_logo_image)',
+}
+
+EVENT_LIST_FIELDS = {
+    'event_id': 'events.event_id',
+    'event_name': 'events.event_name',
+    'event_description': 'events.event_description',
+    'event_image': 'COALESCE(events.event_thumb, events.event_image)',
+    'event_date': 'events.event_date',
+    'event_time': 'events.event_time',
+    'event_venue': 'events.event_venue',
+    'club_id': 'events.club_id',
+    'club_name': 'clubs.club_name',
+}
+
+DEFAULT_EVENT_FIELDS = (
+    'event_id', 'event_name', 'event_image', 'event_date', 'event_time', 'event_venue', 'club_name'
+)
+
+def parse_page_args(allowed_fields, default_fields):
+    """(fields, after, limit) from ?fields=a,b&after=<id>&limit=<n>, raising ValueError"""
+    fields = default_fields
+    if request.args.get('fields'):
+        fields = tuple(name.strip() for name in request.args['fields'].split(',') if name.strip())
+        unknown = [name for name in fields if name not in allowed_fields]
+        if unknown:
+            raise ValueError(f"Unknown field: {unknown[0]}")
+
+    after = request.args.get('after')
+    if after is not None:
+        after = int(after)
+
+    return fields, after, parse_limit_arg()
+
+def parse_limit_arg():
+    limit = request.args.get('limit')
+    if limit is not None:
+        limit = int(limit)
+        if limit < 1:
+            raise ValueError('limit must be positive')
+        limit = min(limit, app.config['MAX_PAGE_SIZE'])
+    return limit
+
+def parse_date_arg(name):
+    value = request.args.get(name)
+    if value is not None:
+        datetime.strptime(value, '%Y-%m-%d')
+    return value
+
+def load_page(select_sql, key_column, fields, after, limit, clauses, params):
+    """Run a keyset-paginated query ordered by `key_column`; returns (rows, next_cursor)"""
+    if after is not None:
+        clauses = clauses + [f'{key_column} > ?']
+        params = params + [after]
+    query = select_sql
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    query += f' ORDER BY {key_column}'
+    if limit is not None:
+        query += ' LIMIT ?'
+        params = params + [limit]
+
+    cursor = get_db_connection().cursor()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+
+    # The key is always selected first so the cursor works whatever the projection
+    next_cursor = rows[-1][0] if limit is not None and len(rows) == limit else None
+    return [dict(zip(fields, row[1:])) for row in rows], next_cursor
+
+def load_clubs(fields, after, limit, name_prefix):
+    clauses, params = [], []
+    if name_prefix:
+        # Range instead of LIKE so the club_name index is used
+        clauses.append('club_name >= ? AND club_name < ?')
+        params += [name_prefix, name_prefix + '\uffff']
+    select_sql = 'SELECT club_id, ' + ', '.join(CLUB_LIST_FIELDS[name] for name in fields) + ' FROM clubs'
+    return load_page(select_sql, 'club_id', fields, after, limit, clauses, params)
+
+@app.route('/api/clubs', methods=['GET'])
+@versioned('clubs')
+def get_all_clubs():
+    try:
+        fields, after, limit = parse_page_args(CLUB_LIST_FIELDS, tuple(CLUB_LIST_FIELDS))
+        name_prefix = request.args.get('name')
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid query: {str(e)}'}), 400
+
+    try:
+        clubs, next_cursor = catalog_cache.get_or_load(
+            ('clubs', fields, after, limit, name_prefix), ('clubs',),
+            lambda: load_clubs(fields, after, limit, name_prefix)
+        )
+        
+        response = {
+            'success': True,
+            'clubs': clubs
+        }
+        if limit is not None:
+            response['next_cursor'] = next_cursor
+        return jsonify(response)
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': 'An error occurred while fetching clubs'
+        }), 500
+
+def load_events(fields, after, limit, club_id, date_from, date_to, venue):
+    clauses, params = [], []
+    if club_id is not None:
+        clauses.append('events.club_id = ?')
+        params.append(club_id)
+    if date_from:
+        clauses.append('events.event_date >= ?')
+        params.append(date_from)
+    if date_to:
+        clauses.append('events.event_date <= ?')
+        params.append(date_to)
+    if venue:
+        clauses.append('events.event_venue = ? COLLATE NOCASE')
+        params.append(venue)
+
+    # Fetch events with club name
+    select_sql = (
+        'SELECT events.event_id, ' + ', '.join(EVENT_LIST_FIELDS[name] for name in fields) +
+        ' FROM events JOIN clubs ON events.club_id = clubs.club_id'
+    )
+    return load_page(select_sql, 'events.event_id', fields, after, limit, clauses, params)
+
+@app.route('/api/events', methods=['GET'])
+@versioned('events', 'clubs')
+def get_all_events():
+    try:
+        fields, after, limit = parse_page_args(EVENT_LIST_FIELDS, DEFAULT_EVENT_FIELDS)
+        club_id = request.args.get('club_id', type=int)
+        date_from = parse_date_arg('from')
+        date_to = parse_date_arg('to')
+        venue = request.args.get('venue')
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid query: {str(e)}'}), 400
+
+    try:
+        query = (fields, after, limit, club_id, date_from, date_to, venue)
+        events, next_cursor = catalog_cache.get_or_load(
+            ('events',) + query, ('events', 'clubs'),
+            lambda: load_events(*query)
+        )
+        
+        response = {
+            'success': True,
+            'events': events
+        }
+        if limit is not None:
+            response['next_cursor'] = next_cursor
+        return jsonify(response)
+            
+    except Exception as e:
+        app.logger.exception('Error fetching events')
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred: {str(e)}'
+        }), 500
+    
+
+SEARCH_TYPES = ('event', 'club')
+
+# bm25() column weights: a match in a name counts for more than one in a description
+EVENT_SEARCH_WEIGHTS = (10.0, 1.0, 4.0, 3.0, 0.5)
+CLUB_SEARCH_WEIGHTS = (10.0, 1.0)
+
+def search_match_query(text):
+    """An FTS5 query matching every word of `text`, the last one as a prefix
+
+    Words are quoted so user input can never be read as FTS5 syntax.
+    """
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+def load_search_results(match, types, offset, limit):
+    """One page of events and clubs matching `match`, best BM25 rank first"""
+    selects, params = [], []
+    if 'event' in types:
+        selects.append(f'''
+            SELECT 'event' AS type, rowid AS id, bm25(event_search, {', '.join(map(str, EVENT_SEARCH_WEIGHTS))}) AS rank
+            FROM event_search WHERE event_search MATCH ?
+        ''')
+        params.append(match)
+    if 'club' in types:
+        selects.append(f'''
+            SELECT 'club' AS type, rowid AS id, bm25(club_search, {', '.join(map(str, CLUB_SEARCH_WEIGHTS))}) AS rank
+            FROM club_search WHERE club_search MATCH ?
+        ''')
+        params.append(match)
+
+    cursor = get_db_connection().cursor()
+    cursor.execute(f'''
+        WITH matches AS ({' UNION ALL '.join(selects)}),
+        page AS (SELECT type, id, rank FROM matches ORDER BY rank, type, id LIMIT ? OFFSET ?)
+        SELECT page.type, page.id,
+               events.event_name, events.event_date, events.event_time, events.event_venue,
+               COALESCE(events.event_thumb, events.event_image) AS event_image,
+               event_club.club_name AS event_club_name,
+               clubs.club_name, clubs.club_description,
+               COALESCE(clubs.club_logo_thumb, clubs.club_logo_image) AS club_logo_image
+        FROM page
+        LEFT JOIN events ON page.type = 'event' AND events.event_id = page.id
+        LEFT JOIN clubs event_club ON event_club.club_id = events.club_id
+        LEFT JOIN clubs ON page.type = 'club' AND clubs.club_id = page.id
+        ORDER BY page.rank, page.type, page.id
+    ''', params + [limit + 1, offset])
+    rows = cursor.fetchall()
+
+    results = []
+    for row in rows[:limit]:
+        if row['type'] == 'event':
+            results.append({
+                'type': 'event',
+                'event_id': row['id'],
+                'event_name': row['event_name'],
+                'event_date': row['event_date'],
+                'event_time': row['event_time'],
+                'event_venue': row['event_venue'],
+                'event_image': row['event_image'],
+                'club_name': row['event_club_name'],
+            })
+        else:
+            results.append({
+                'type': 'club',
+                'club_id': row['id'],
+                'club_name': row['club_name'],
+                'club_description': row['club_description'],
+                'club_logo_image': row['club_logo_image'],
+            })
+    # One extra row tells whether there is a next page
+    next_cursor = offset + limit if len(rows) > limit else None
+    return results, next_cursor
+
+@app.route('/api/search', methods=['GET'])
+@versioned('events', 'clubs')
+def search_catalog():
+    """Ranked full-text search over events and clubs.
+
+    ?q=<text> matches every word (the last as a prefix), ?type=event|club
+    narrows the result and ?limit=<n>&after=<next_cursor> pages through it.
+    """
+    try:
+        match = search_match_query(request.args.get('q', ''))
+        types = SEARCH_TYPES
+        if request.args.get('type'):
+            types = tuple(name.strip() for name in request.args['type'].split(','))
+            unknown = [name for name in types if name not in SEARCH_TYPES]
+            if unknown:
+                raise ValueError(f'Unknown type: {unknown[0]}')
+        limit = parse_limit_arg() or app.config['SEARCH_PAGE_SIZE']
+        offset = int(request.args.get('after', 0))
+        if offset < 0:
+            raise ValueError('after must not be negative')
+    except ValueError as e:
+        return jsonify({'success': False, 'message': f'Invalid query: {str(e)}'}), 400
+    if match is None:
+        return jsonify({'success': False, 'message': 'q is required'}), 400
+
+    try:
+        results, next_cursor = catalog_cache.get_or_load(
+            ('search', match, types, offset, limit), ('events', 'clubs'),
+            lambda: load_search_results(match, types, offset, limit)
+        )
+        return jsonify({'success': True, 'results': results, 'next_cursor': next_cursor})
+    except Exception as e:
+        app.logger.exception('Error searching the catalog')
+        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
+
+DUPLICATE_MESSAGE = 'You have already registered'
+
+def apply_registration(cursor, form_id, values, key=None):
+    """Register one validated submission on an event form.
+
+    Returns (status, submission_id, message) where status is 'accepted',
+    'waitlisted' or 'rejected'. Runs inside the caller's write transaction.
+    """
+    cursor.execute('SELECT is_open, capacity FROM forms WHERE form_id = ?', (form_id,))
+    form = cursor.fetchone()
+    if not form or not form['is_open']:
+        return 'rejected', None, 'Event registrations are closed'
+
+    # Checked before a place is claimed so duplicates never count against capacity
+    if is_duplicate(cursor, form_id, key):
+        return 'rejected', None, DUPLICATE_MESSAGE
+
+    status = reserve_place(cursor, form_id)
+    if status is None:
+        return 'rejected', None, f"Registration limit reached. Maximum {form['capacity']} applications allowed."
+
+    submission_id = insert_submission(cursor, form_id, values, status, key)
+    if status == 'waitlisted':
+        return status, submission_id, 'Registration limit reached. You have been added to the waitlist.'
+    return status, submission_id, 'Application submitted successfully'
+
+class RegistrationTicket:
+    def __init__(self, form_id, values, key=None):
+        self.ticket_id = uuid.uuid4().hex
+        self.form_id = form_id
+        self.values = values
+        self.key = key
+        self.status = 'pending'
+        self.submission_id = None
+        self.message = 'Application received'
+        self.saved = False
+        self._done = threading.Event()
+
+    def resolve(self, status, submission_id, message, saved=True):
+        self.status = status
+        self.submission_id = submission_id
+        self.message = message
+        self.saved = saved
+        self.values = None
+        self._done.set()
+
+    def wait(self, timeout):
+        return self._done.wait(timeout)
+
+    def as_dict(self):
+        return {
+            'ticketId': self.ticket_id,
+            'status': self.status,
+            'message': self.message,
+        }
+
+class QueueFull(Exception):
+    pass
+
+class RegistrationQueue:
+    """Write-behind ingestion for event registrations.
+
+    Request threads validate a submission, enqueue it and get a ticket back.
+    A single writer thread drains the queue and applies up to `batch_size`
+    registrations per transaction (group commit), so a burst costs one
+    commit per batch instead of one per student and never fights over
+    SQLite's write lock. Outcomes are kept on the ticket and persisted to
+    registration_tickets in the same transaction.
+    """
+
+    def __init__(self, pool, max_size=10000, batch_size=256, batch_delay=0.002, retained_tickets=10000,
+                 ticket_ttl=7 * 24 * 3600):
+        # The writer keeps its own connection so it never queues behind
+        # request threads for a pooled one
+        self.pool = pool
+        self._conn = None
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.retained_tickets = retained_tickets
+        self.ticket_ttl = ticket_ttl
+        self._queue = queue.Queue(maxsize=max_size)
+        self._tickets = OrderedDict()
+        self._lock = threading.Lock()
+        self._thread = None
+        self.batches = 0
+        self.registrations = 0
+        self.largest_batch = 0
+        self.rejected_full = 0
+
+    def _ensure_writer(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='registration-writer', daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, form_id, values, key=None):
+        self._ensure_writer()
+        ticket = RegistrationTicket(form_id, values, key)
+        with self._lock:
+            self._tickets[ticket.ticket_id] = ticket
+            while len(self._tickets) > self.retained_tickets:
+                self._tickets.popitem(last=False)
+        try:
+            self._queue.put_nowait(ticket)
+        except queue.Full:
+            with self._lock:
+                self._tickets.pop(ticket.ticket_id, None)
+                self.rejected_full += 1
+            raise QueueFull('Too many registrations in flight, please retry shortly')
+        return ticket
+
+    def get_ticket(self, ticket_id):
+        with self._lock:
+            ticket = self._tickets.get(ticket_id)
+            # Once saved the outcome is in registration_tickets, so memory can let go of it
+            if ticket is not None and ticket.saved:
+                del self._tickets[ticket_id]
+            return ticket
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            ticket = self._queue.get()
+            if ticket is None:
+                break
+            batch = [ticket]
+            deadline = time.monotonic() + self.batch_delay
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._flush(batch)
+
+    def _flush(self, batch):
+        outcomes = []
+        saved = True
+        conn = None
+        try:
+            if self._conn is None:
+                self._conn = self.pool.connect()
+            conn = self._conn
+            cursor = conn.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            for ticket in batch:
+                # A failing registration must not take the rest of the batch down with it
+                cursor.execute('SAVEPOINT registration')
+                try:
+                    outcome = apply_registration(cursor, ticket.form_id, ticket.values, ticket.key)
+                    cursor.execute('RELEASE registration')
+                except Exception as e:
+                    cursor.execute('ROLLBACK TO registration')
+                    cursor.execute('RELEASE registration')
+                    outcome = ('failed', None, str(e))
+                outcomes.append(outcome)
+
+            cursor.executemany('''
+                INSERT INTO registration_tickets (ticket_id, form_id, submission_id, status, message)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [
+                (ticket.ticket_id, ticket.form_id, submission_id, status, message)
+                for ticket, (status, submission_id, message) in zip(batch, outcomes)
+            ])
+            cursor.execute('DELETE FROM registration_tickets WHERE created_at < ?',
+                           (utc_timestamp(datetime.now(timezone.utc) - timedelta(seconds=self.ticket_ttl)),))
+            conn.commit()
+        except Exception as e:
+            # Whatever went wrong, the writer keeps running and these tickets get an answer
+            app.logger.exception('Registration batch failed')
+            if conn is not None and conn.in_transaction:
+                conn.rollback()
+            outcomes = [('failed', None, f'Could not save registration: {e}')] * len(batch)
+            saved = False
+
+        with self._lock:
+            self.batches += 1
+            self.registrations += len(batch)
+            self.largest_batch = max(self.largest_batch, len(batch))
+        for ticket, outcome in zip(batch, outcomes):
+            ticket.resolve(*outcome, saved=saved)
+        for form_id in {ticket.form_id for ticket, (status, _, _) in zip(batch, outcomes)
+                        if status in ('accepted', 'waitlisted')}:
+            registration_events.publish(form_id)
+
+    def stop(self, timeout=10.0):
+        """Flush whatever is queued and stop the writer"""
+        with self._lock:
+            thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+        if self._conn is not None and (thread is None or not thread.is_alive()):
+            self._conn.close()
+            self._conn = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                'queued': self._queue.qsize(),
+                'batches': self.batches,
+                'registrations': self.registrations,
+                'largest_batch': self.largest_batch,
+                'average_batch': round(self.registrations / self.batches, 2) if self.batches else 0,
+                'rejected_queue_full': self.rejected_full,
+            }
+
+_queue_lock = threading.Lock()
+
+def get_registration_queue():
+    registration_queue = app.extensions.get('registration_queue')
+    if registration_queue is None:
+        with _queue_lock:
+            registration_queue = app.extensions.get('registration_queue')
+            if registration_queue is None:
+                registration_queue = RegistrationQueue(
+                    get_pool(),
+                    max_size=app.config['REGISTRATION_QUEUE_SIZE'],
+                    batch_size=app.config['REGISTRATION_BATCH_SIZE'],
+                    batch_delay=app.config['REGISTRATION_BATCH_DELAY'],
+                    ticket_ttl=app.config['REGISTRATION_TICKET_TTL'],
+                )
+                app.extensions['registration_queue'] = registration_queue
+                atexit.register(registration_queue.stop)
+    return registration_queue
+
+def get_ack_waiters():
+    return app.extensions.setdefault(
+        'ack_waiters', threading.BoundedSemaphore(app.config['REGISTRATION_MAX_WAITERS'])
+    )
+
+def registration_response(status, submission_id, message, ticket_id=None):
+    body = {'success': status in ('accepted', 'waitlisted'), 'status': status, 'message': message}
+    if ticket_id:
+        body['ticketId'] = ticket_id
+    if status == 'rejected':
+        return jsonify(body), 400
+    if status == 'failed':
+        return jsonify(body), 500
+    return jsonify(body)
+
+@app.route('/api/events/apply/<int:event_id>', methods=['POST'])
+def submit_event_application(event_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT event_id FROM events WHERE event_id = ?', (event_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Event not found'}), 404
+
+        form = get_form(cursor, 'event', event_id)
+        if not form:
+            return jsonify({'success': False, 'message': 'Event registrations are closed'}), 400
+
+        try:
+            values = form.validate(request.get_json(silent=True))
+        except SubmissionError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+
+        key = form.dedup_key(values)
+        # An index probe turns most duplicates away without queueing them;
+        # the writer checks again inside its transaction
+        if is_duplicate(cursor, form.form_id, key):
+            return registration_response('rejected', None, DUPLICATE_MESSAGE)
+
+        if not app.config['REGISTRATION_QUEUE_ENABLED']:
+            cursor.execute('BEGIN IMMEDIATE')
+            outcome = apply_registration(cursor, form.form_id, values, key)
+            conn.commit()
+            if outcome[0] != 'rejected':
+                registration_events.publish(form.form_id)
+            return registration_response(*outcome)
+
+        try:
+            ticket = get_registration_queue().submit(form.form_id, values, key)
+        except QueueFull as e:
+            return jsonify({'success': False, 'message': str(e)}), 503
+
+        # Wait for the writer unless the client would rather poll the ticket,
+        # handing the connection back first so waiting requests don't drain the pool.
+        # Waiting parks a request thread, so only REGISTRATION_MAX_WAITERS do it at once
+        release_db_connection(None)
+        waiters = get_ack_waiters()
+        if 'respond-async' not in request.headers.get('Prefer', '') and waiters.acquire(blocking=False):
+            try:
+                acknowledged = ticket.wait(app.config['REGISTRATION_ACK_TIMEOUT'])
+            finally:
+                waiters.release()
+            if acknowledged:
+                return registration_response(
+                    ticket.status, ticket.submission_id, ticket.message, ticket.ticket_id
+                )
+
+        return jsonify({'success': True, **ticket.as_dict()}), 202
+            
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/events/apply/status/<ticket_id>', methods=['GET'])
+def get_registration_ticket(ticket_id):
+    try:
+        ticket = get_registration_queue().get_ticket(ticket_id)
+        if ticket is not None:
+            return jsonify({'success': True, **ticket.as_dict()})
+
+        # Tickets fall out of memory (or were handled by another worker), so ask the database
+        cursor = get_db_connection().cursor()
+        cursor.execute(
+            'SELECT ticket_id, status, message FROM registration_tickets WHERE ticket_id = ?',
+            (ticket_id,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return jsonify({'success': False, 'message': 'Ticket not found'}), 404
+        return jsonify({
+            'success': True,
+            'ticketId': row['ticket_id'],
+            'status': row['status'],
+            'message': row['message'],
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/stats/registrations', methods=['GET'])
+def get_registration_stats():
+    return jsonify({'success': True, 'queue': get_registration_queue().stats()})
+
+# Live registration updates. Admin dashboards follow a form over SSE (or
+# long-polling) and receive only the submissions after the last one they
+# have, plus the current counts. Commits in this process wake the streams
+# immediately; every stream also re-checks the database each
+# LIVE_POLL_INTERVAL so it picks up registrations handled by other workers.
+class RegistrationEvents:
+    """In-process pub/sub that wakes the streams following a form"""
+
+    def __init__(self):
+        self._waiters = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, form_id):
+        waiter = threading.Event()
+        with self._lock:
+            self._waiters.setdefault(form_id, set()).add(waiter)
+        return waiter
+
+    def unsubscribe(self, form_id, waiter):
+        with self._lock:
+            waiters = self._waiters.get(form_id)
+            if waiters is not None:
+                waiters.discard(waiter)
+                if not waiters:
+                    del self._waiters[form_id]
+
+    def publish(self, form_id):
+        with self._lock:
+            waiters = list(self._waiters.get(form_id, ()))
+        for waiter in waiters:
+            waiter.set()
+
+    def subscribers(self):
+        with self._lock:
+            return sum(len(waiters) for waiters in self._waiters.values())
+
+registration_events = RegistrationEvents()
+
+def get_live_slots():
+    """Semaphore shared by SSE streams and long-polls, each of which parks a request thread"""
+    return app.extensions.setdefault('live_slots', threading.BoundedSemaphore(app.config['LIVE_MAX_STREAMS']))
+
+def limit_waiting_requests(threads):
+    """Let live streams and registration acks each park at most a quarter of
+    the `threads` serving requests, leaving the rest to the other routes"""
+    share = max(1, threads // 4)
+    app.config['LIVE_MAX_STREAMS'] = min(app.config['LIVE_MAX_STREAMS'], share)
+    app.config['REGISTRATION_MAX_WAITERS'] = min(app.config['REGISTRATION_MAX_WAITERS'], share)
+    app.extensions.pop('live_slots', None)
+    app.extensions.pop('ack_waiters', None)
+
+def live_slots_exhausted():
+    response = jsonify({'success': False, 'message': 'Too many live streams, retry shortly'})
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
+def registration_delta(form, after):
+    """Submissions after `after` (at most LIVE_BATCH_SIZE) and the form's counts.
+
+    Uses a pooled connection only for the duration of the query, so a
+    waiting stream never holds one.
+    """
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        cursor = conn.cursor()
+        submissions = [dict(zip(form.columns, response)) for response in
+                       fetch_submissions_after(cursor, form, after, app.config['LIVE_BATCH_SIZE'])]
+        counts = get_capacity(cursor, form.form_id)
+    finally:
+        pool.release(conn)
+    last_id = submissions[-1]['id'] if submissions else after
+    return {'submissions': submissions, 'lastId': last_id, **counts}
+
+def wait_for_registrations(form, after, timeout):
+    """Long-poll: the first delta with new submissions, or the unchanged counts after `timeout`"""
+    waiter = registration_events.subscribe(form.form_id)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            waiter.clear()
+            delta = registration_delta(form, after)
+            remaining = deadline - time.monotonic()
+            if delta['submissions'] or remaining <= 0:
+                return delta
+            waiter.wait(min(remaining, app.config['LIVE_POLL_INTERVAL']))
+    finally:
+        registration_events.unsubscribe(form.form_id, waiter)
+
+def stream_registrations(form, after):
+    """SSE body: a `registrations` event per change, each with the last submission id as its id.
+
+    Streams end after LIVE_STREAM_DURATION; EventSource reconnects on its
+    own and sends Last-Event-ID, so nothing is missed.
+    """
+    waiter = registration_events.subscribe(form.form_id)
+    try:
+        yield f"retry: {int(app.config['LIVE_POLL_INTERVAL'] * 1000)}\n\n"
+        ends_at = time.monotonic() + app.config['LIVE_STREAM_DURATION']
+        last_counts = None
+        last_sent = time.monotonic()
+        while time.monotonic() < ends_at:
+            waiter.clear()
+            delta = registration_delta(form, after)
+            counts = (delta['registered'], delta['waitlisted'], delta['remaining'])
+            if delta['submissions'] or counts != last_counts:
+                after, last_counts = delta['lastId'], counts
+                yield f"id: {after}\nevent: registrations\ndata: {json.dumps(delta)}\n\n"
+                last_sent = time.monotonic()
+                if len(delta['submissions']) == app.config['LIVE_BATCH_SIZE']:
+                    continue
+            elif time.monotonic() - last_sent >= app.config['LIVE_KEEPALIVE']:
+                # Comments keep proxies from timing out and reveal closed clients
+                yield ': keepalive\n\n'
+                last_sent = time.monotonic()
+            waiter.wait(min(app.config['LIVE_POLL_INTERVAL'], max(ends_at - time.monotonic(), 0)))
+    finally:
+        registration_events.unsubscribe(form.form_id, waiter)
+
+def live_registrations_response(form):
+    """SSE stream, or a long-poll JSON response with ?wait=<seconds>"""
+    try:
+        after = int(request.headers.get('Last-Event-ID') or request.args.get('after', 0))
+        wait = request.args.get('wait')
+        wait = min(float(wait), app.config['LIVE_MAX_WAIT']) if wait is not None else None
+    except ValueError:
+        return jsonify({'success': False, 'message': 'after and wait must be numbers'}), 400
+
+    # The wait happens without the request's pooled connection
+    release_db_connection(None)
+    long_poll = wait is not None or 'text/event-stream' not in request.headers.get('Accept', '')
+    if long_poll and (wait or 0) <= 0:
+        return jsonify({'success': True, **registration_delta(form, after)})
+
+    # Each stream or waiting poll occupies a server thread, so cap how many can be open
+    slots = get_live_slots()
+    if not slots.acquire(blocking=False):
+        return live_slots_exhausted()
+    if long_poll:
+        try:
+            return jsonify({'success': True, **wait_for_registrations(form, after, wait)})
+        finally:
+            slots.release()
+    response = Response(stream_registrations(form, after), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    response.call_on_close(slots.release)
+    return response
+
+@app.route('/api/events/application/live/<int:event_id>', methods=['GET'])
+def get_event_registrations_live(event_id):
+    try:
+        cursor = get_db_connection().cursor()
+        cursor.execute('SELECT event_id FROM events WHERE event_id = ?', (event_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Event not found'}), 404
+
+        form = get_form(cursor, 'event', event_id, open_only=False)
+        if not form:
+            return jsonify({'success': False, 'message': 'No registration form found'}), 404
+        return live_registrations_response(form)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/recruitment/live/<int:club_id>', methods=['GET'])
+def get_recruitment_applications_live(club_id):
+    try:
+        cursor = get_db_connection().cursor()
+        cursor.execute('SELECT club_id FROM clubs WHERE club_id = ?', (club_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Club not found'}), 404
+
+        form = get_form(cursor, 'recruitment', club_id, open_only=False)
+        if not form:
+            return jsonify({'success': False, 'message': 'No recruitment form found'}), 404
+        return live_registrations_response(form)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+ANALYTICS_DIMENSIONS = ('day', 'status')
+
+def load_form_rollups(cursor, form_id, dimensions):
+    """{dimension: [{'value', 'count'}]} from the rollup table, one index range per dimension"""
+    groups = {}
+    for dimension in dimensions:
+        cursor.execute('''
+            SELECT value, count FROM submission_rollups
+            WHERE form_id = ? AND dimension = ? AND count > 0
+        ''', (form_id, dimension if dimension in ANALYTICS_DIMENSIONS else 'field:' + dimension))
+        rows = [{'value': row['value'] if row['value'] != '' else None, 'count': row['count']}
+                for row in cursor.fetchall()]
+        # Days read best in order, everything else most common first
+        if dimension != 'day':
+            rows.sort(key=lambda group: -group['count'])
+        groups[dimension] = rows
+    return groups
+
+def form_analytics_response(cursor, form_id):
+    cursor.execute('''
+        SELECT accepted_count, waitlisted_count, rollup_fields FROM forms WHERE form_id = ?
+    ''', (form_id,))
+    form = cursor.fetchone()
+    available = ANALYTICS_DIMENSIONS + tuple(json.loads(form['rollup_fields']))
+
+    dimensions = available
+    if request.args.get('by'):
+        dimensions = tuple(name.strip() for name in request.args['by'].split(',') if name.strip())
+        unknown = [name for name in dimensions if name not in available]
+        if unknown:
+            return jsonify({
+                'success': False,
+                'message': f"Unknown dimension: {unknown[0]} (available: {', '.join(available)})"
+            }), 400
+
+    return jsonify({
+        'success': True,
+        'registered': form['accepted_count'],
+        'waitlisted': form['waitlisted_count'],
+        'dimensions': available,
+        'groups': load_form_rollups(cursor, form_id, dimensions),
+    })
+
+@app.route('/api/analytics/event/<int:event_id>', methods=['GET'])
+def get_event_analytics(event_id):
+    """Registration counts for an event by day, status and field value (?by=day,semester)"""
+    try:
+        cursor = get_db_connection().cursor()
+        cursor.execute('SELECT event_id FROM events WHERE event_id = ?', (event_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Event not found'}), 404
+
+        form = get_form(cursor, 'event', event_id, open_only=False)
+        if not form:
+            return jsonify({'success': False, 'message': 'No registration form found'}), 404
+        return form_analytics_response(cursor, form.form_id)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/analytics/recruitment/<int:club_id>', methods=['GET'])
+def get_recruitment_analytics(club_id):
+    try:
+        cursor = get_db_connection().cursor()
+        cursor.execute('SELECT club_id FROM clubs WHERE club_id = ?', (club_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Club not found'}), 404
+
+        form = get_form(cursor, 'recruitment', club_id, open_only=False)
+        if not form:
+            return jsonify({'success': False, 'message': 'No recruitment form found'}), 404
+        return form_analytics_response(cursor, form.form_id)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/analytics/club/<int:club_id>', methods=['GET'])
+def get_club_analytics(club_id):
+    """Registration counts for each of a club's events, from the forms' counters"""
+    try:
+        cursor = get_db_connection().cursor()
+        cursor.execute('SELECT club_id FROM clubs WHERE club_id = ?', (club_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Club not found'}), 404
+
+        # The latest form of each event holds its registrations
+        cursor.execute('''
+            SELECT events.event_id, events.event_name, events.event_date,
+                   forms.capacity, forms.accepted_count, forms.waitlisted_count, forms.is_open
+            FROM events
+            LEFT JOIN forms ON forms.form_id = (
+                SELECT MAX(form_id) FROM forms WHERE kind = 'event' AND owner_id = events.event_id
+            )
+            WHERE events.club_id = ?
+            ORDER BY events.event_date DESC, events.event_id DESC
+        ''', (club_id,))
+        events = [{
+            'event_id': row['event_id'],
+            'event_name': row['event_name'],
+            'event_date': row['event_date'],
+            'capacity': row['capacity'],
+            'registered': row['accepted_count'] or 0,
+            'waitlisted': row['waitlisted_count'] or 0,
+            'is_open': bool(row['is_open']),
+        } for row in cursor.fetchall()]
+        return jsonify({'success': True, 'events': events})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+def load_event_details_student(event_id):
+    cursor = get_db_connection().cursor()
+    
+    # Fetch event details
+    cursor.execute('''
+        SELECT event_id, event_name, event_description, event_image, 
+               event_date, event_time, event_venue, club_id
+        FROM events 
+        WHERE event_id = ?
+    ''', (event_id,))
+    
+    event = cursor.fetchone()
+    if not event:
+        return None
+    
+    # Registration form fields, empty once registrations are closed
+    form = get_form(cursor, 'event', event_id)
+    form_fields = form.field_list if form else []
+    
+    # Convert event to dictionary with column names
+    column_names = ['event_id', 'event_name', 'event_description', 'event_image', 
+                    'event_date', 'event_time', 'event_venue', 'club_id']
+    return {
+        'event': dict(zip(column_names, event)),
+        'applicationFields': form_fields
+    }
+
+# Update event details route to include application form fields
+@app.route('/api/events_student/details/<int:event_id>', methods=['GET'])
+@versioned('events', 'forms')
+def get_event_details_student(event_id):
+    try:
+        details = catalog_cache.get_or_load(
+            ('event_student', event_id), (f'event:{event_id}', f'event_form:{event_id}'),
+            lambda: load_event_details_student(event_id)
+        )
+        
+        if not details:
+            return jsonify({
+                'success': False,
+                'message': 'Event not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'event': details['event'],
+            'applicationFields': details['applicationFields']
+        })
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred while fetching event details: {str(e)}'
+        }), 500
+
+def load_recruiting_clubs():
+    cursor = get_db_connection().cursor()
+    cursor.execute('''
+        SELECT club_id, club_name, COALESCE(club_logo_thumb, club_logo_image) AS club_logo_image,
+               is_recruiting, recruitment_open_at, recruitment_close_at
+        FROM clubs
+        WHERE is_recruiting = 1
+        ORDER BY club_id
+    ''')
+    return [dict(club) for club in cursor.fetchall()]
+
+def get_open_recruitments():
+    clubs = catalog_cache.get_or_load(
+        ('recruiting_clubs',), ('recruiting_clubs',), load_recruiting_clubs
+    )
+
+    # Scheduled windows are applied per request so the cached list never goes stale
+    now = utc_timestamp()
+    return [{
+        'club_id': club['club_id'],
+        'club_name': club['club_name'],
+        'club_logo_image': club['club_logo_image'],
+        'recruitment_open_at': club['recruitment_open_at'],
+        'recruitment_close_at': club['recruitment_close_at'],
+    } for club in clubs if recruitment_window_open(club, now)]
+
+@app.route('/api/recruiting-clubs', methods=['GET'])
+def get_recruiting_clubs():
+    try:
+        recruiting_clubs = get_open_recruitments()
+        
+        return jsonify({
+            'success': True,
+            'clubs': recruiting_clubs
+        })
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred: {str(e)}'
+        }), 500
+
+@contextmanager
+def read_snapshot():
+    """Run the request's reads on one connection inside one read transaction,
+    so everything they load reflects the same committed state. Inside an
+    open snapshot (a batched /api/home) the outer one is reused."""
+    conn = get_db_connection()
+    if conn.in_transaction:
+        yield conn
+        return
+    conn.execute('BEGIN')
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+
+@app.route('/api/home', methods=['GET'])
+def get_home():
+    """Everything the homepage shows, in one request: open recruitments,
+    events and clubs, shaped as their own endpoints return them"""
+    try:
+        with read_snapshot():
+            recruiting_clubs = get_open_recruitments()
+            events, _ = catalog_cache.get_or_load(
+                ('events', DEFAULT_EVENT_FIELDS, None, None, None, None, None, None), ('events', 'clubs'),
+                lambda: load_events(DEFAULT_EVENT_FIELDS, None, None, None, None, None, None)
+            )
+            club_fields = tuple(CLUB_LIST_FIELDS)
+            clubs, _ = catalog_cache.get_or_load(
+                ('clubs', club_fields, None, None, None), ('clubs',),
+                lambda: load_clubs(club_fields, None, None, None)
+            )
+
+        return jsonify({
+            'success': True,
+            'recruitingClubs': recruiting_clubs,
+            'events': events,
+            'clubs': clubs,
+        })
+    except Exception as e:
+        app.logger.exception('Error loading the homepage')
+        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
+
+# Batched reads: several GET sub-requests dispatched in-process on this
+# request's connection and read snapshot, answered in one response. Only
+# these JSON reads can be batched: the check runs on the endpoint the URL
+# map resolves, so percent-encoded or dotted paths can't slip past it, and
+# live streams, downloads and /metrics stay out.
+BATCHABLE_ENDPOINTS = frozenset({
+    'get_all_clubs', 'get_club_details', 'get_club_events', 'get_all_events', 'get_event_details',
+    'get_event_details_student', 'get_home', 'search_catalog', 'get_recruiting_clubs',
+    'get_recruitment_form_details', 'check_recruitment_status', 'get_event_application_status',
+    'get_event_application_responses', 'get_recruitment_responses', 'get_registration_ticket',
+    'get_venue_availability', 'get_event_analytics', 'get_recruitment_analytics', 'get_club_analytics',
+    'list_archived_forms', 'get_registration_stats', 'get_pool_stats', 'get_cache_stats',
+})
+
+def dispatch_batched_get(path):
+    """(status, body) of GET `path` run through the app's routes"""
+    if not path.startswith('/api/'):
+        return 400, {'success': False, 'message': f'{path} cannot be batched'}
+
+    requested = path
+    path, _, query_string = path.partition('?')
+    # The sub-request shares the batch's app context, so g.db (and the
+    # snapshot) is reused and the connection is released only once
+    environ = EnvironBuilder(path, base_url=request.host_url, query_string=query_string,
+                             headers={'Accept': 'application/json'}).get_environ()
+    with app.request_context(environ):
+        # Unknown paths fall through so dispatch_request raises their 404/405
+        if request.routing_exception is None and request.url_rule.endpoint not in BATCHABLE_ENDPOINTS:
+            return 400, {'success': False, 'message': f'{requested} cannot be batched'}
+        try:
+            response = app.make_response(app.dispatch_request())
+        except HTTPException as e:
+            response = e.get_response()
+        try:
+            if response.mimetype != 'application/json':
+                # Werkzeug's HTML error pages (404, 405) keep their status
+                status = response.status_code if response.status_code >= 400 else 400
+                return status, {'success': False, 'message': f'{path} does not return JSON'}
+            return response.status_code, response.get_json()
+        finally:
+            response.close()
+
+@app.route('/api/batch', methods=['POST'])
+def batch_requests():
+    """Run up to BATCH_MAX_REQUESTS GETs given as {"requests": ["/api/...", ...]};
+    returns their status codes and JSON bodies in the same order"""
+    data = request.get_json(silent=True)
+    paths = data.get('requests') if isinstance(data, dict) else None
+    if not isinstance(paths, list) or not all(isinstance(path, str) for path in paths):
+        return jsonify({'success': False, 'message': 'requests must be a list of paths'}), 400
+    if len(paths) > app.config['BATCH_MAX_REQUESTS']:
+        return jsonify({
+            'success': False,
+            'message': f"At most {app.config['BATCH_MAX_REQUESTS']} requests can be batched"
+        }), 400
+
+    try:
+        responses = []
+        with read_snapshot():
+            for path in paths:
+                status, body = dispatch_batched_get(path)
+                responses.append({'path': path, 'status': status, 'body': body})
+        return jsonify({'success': True, 'responses': responses})
+    except Exception as e:
+        app.logger.exception('Error running a batch')
+        return jsonify({'success': False, 'message': f'An error occurred: {str(e)}'}), 500
+
+@app.route('/api/recruitment/details/<int:club_id>', methods=['GET'])
+@versioned('clubs', 'forms')
+def get_recruitment_form_details(club_id):
+    try:
+        club = catalog_cache.get_or_load(
+            ('club', club_id), ('clubs', f'club:{club_id}'),
+            lambda: load_club_details(club_id)
+        )
+        if not club:
+            return jsonify({'success': False, 'message': 'Club not found'}), 404
+
+        form = get_form(get_db_connection().cursor(), 'recruitment', club_id)
+        if not form:
+            return jsonify({'success': False, 'message': 'No recruitment form found'}), 404
+        
+        return jsonify({
+            'success': True,
+            'fields': form.field_list
+        })
+            
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'An error occurred: {str(e)}'
+        }), 500
+
+@app.route('/api/recruitment/apply/<int:club_id>', methods=['POST'])
+def submit_recruitment_application(club_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('''
+            SELECT is_recruiting, recruitment_open_at, recruitment_close_at
+            FROM clubs WHERE club_id = ?
+        ''', (club_id,))
+        club = cursor.fetchone()
+        if not club:
+            return jsonify({'success': False, 'message': 'Club not found'}), 404
+
+        form = get_form(cursor, 'recruitment', club_id)
+        if not form or not recruitment_window_open(club):
+            return jsonify({'success': False, 'message': 'Club recruitments are closed'}), 400
+
+        try:
+            values = form.validate(request.get_json(silent=True))
+        except SubmissionError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
+
+        key = form.dedup_key(values)
+        cursor.execute('BEGIN IMMEDIATE')
+        if is_duplicate(cursor, form.form_id, key):
+            conn.rollback()
+            return jsonify({'success': False, 'message': 'You have already applied'}), 400
+
+        status = reserve_place(cursor, form.form_id)
+        insert_submission(cursor, form.form_id, values, status, key)
+        conn.commit()
+        registration_events.publish(form.form_id)
+
+        return jsonify({
+            'success': True, 
+            'message': 'Application submitted successfully'
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+    
+# Add these imports at the top of the file
+import csv
+import io
+import zipfile
+import zlib
+from urllib.parse import quote
+from xml.sax.saxutils import escape as xml_escape
+from flask import Response, stream_with_context
+
+# Bulk imports: sign-ups collected offline arrive as one CSV file or JSON
+# array. Every row is validated against the form, then the valid rows are
+# inserted with one executemany in a single transaction, with places
+# allotted in row order.
+
+def read_import_rows(form):
+    """Rows of a bulk import as dicts keyed by field name; raises SubmissionError
+
+    Accepts a JSON array of objects, a text/csv body or a multipart `file`
+    upload. CSV headers may be field names or labels. A CSV row with more
+    cells than the header comes back as a SubmissionError in its place.
+    """
+    upload = request.files.get('file')
+    if upload is not None or request.mimetype == 'text/csv':
+        raw = upload.read() if upload is not None else request.get_data()
+        try:
+            reader = csv.DictReader(io.StringIO(raw.decode('utf-8-sig')))
+            headers = reader.fieldnames or []
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise SubmissionError(f'Could not read CSV: {e}')
+        names = {}
+        for field in form.fields:
+            names[field['name'].lower()] = names[field['label'].strip().lower()] = field['name']
+        unknown = [header for header in headers if header.strip().lower() not in names]
+        if unknown:
+            raise SubmissionError(f'Unknown column: {unknown[0]}')
+        try:
+            rows = []
+            for row in reader:
+                # DictReader files surplus cells under the None key
+                extra = [value for value in row.pop(None, ()) if value.strip()]
+                if extra:
+                    rows.append(SubmissionError(f'Row has {len(extra)} more cells than the header'))
+                    continue
+                rows.append({names[header.strip().lower()]: value for header, value in row.items()})
+        except csv.Error as e:
+            raise SubmissionError(f'Could not read CSV: {e}')
+    else:
+        rows = request.get_json(silent=True)
+        if not isinstance(rows, list):
+            raise SubmissionError('Expected a JSON array of responses or a CSV file')
+
+    if len(rows) > app.config['MAX_IMPORT_ROWS']:
+        raise SubmissionError(f"At most {app.config['MAX_IMPORT_ROWS']} rows can be imported at once")
+    return rows
+
+def import_submissions(conn, form, rows):
+    """Validate and insert `rows`; returns a result per row in input order.
+
+    Places are counted and claimed under one write lock, so an import
+    can't overshoot the capacity against registrations coming in at the
+    same time. Rows past the capacity are waitlisted or rejected exactly
+    as single registrations would be.
+    """
+    results, valid = [], []
+    for number, row in enumerate(rows, start=1):
+        try:
+            if isinstance(row, SubmissionError):
+                raise row
+            values = form.validate(row)
+            valid.append((number, values, form.dedup_key(values)))
+            results.append(None)
+        except SubmissionError as e:
+            results.append({'row': number, 'status': 'invalid', 'message': str(e)})
+
+    cursor = conn.cursor()
+    cursor.execute('BEGIN IMMEDIATE')
+    try:
+        cursor.execute('''
+            SELECT is_open, capacity, accepted_count, waitlist_enabled, last_submission_id FROM forms WHERE form_id = ?
+        ''', (form.form_id,))
+        counts = cursor.fetchone()
+        places = None if counts['capacity'] is None else max(counts['capacity'] - counts['accepted_count'], 0)
+        submission_id = counts['last_submission_id']
+
+        inserts = []
+        keys = set()
+        accepted = waitlisted = 0
+        for number, values, key in valid:
+            if not counts['is_open']:
+                results[number - 1] = {'row': number, 'status': 'rejected', 'message': 'Registrations are closed'}
+                continue
+            if key is not None:
+                if key in keys or is_duplicate(cursor, form.form_id, key):
+                    results[number - 1] = {'row': number, 'status': 'duplicate',
+                                           'message': f'{form.unique_field} {values[form.unique_field]} is already registered'}
+                    continue
+                keys.add(key)
+            if places is None or accepted < places:
+                status = 'accepted'
+                accepted += 1
+            elif counts['waitlist_enabled']:
+                status = 'waitlisted'
+                waitlisted += 1
+            else:
+                results[number - 1] = {'row': number, 'status': 'rejected',
+                                       'message': f"Registration limit reached. Maximum {counts['capacity']} applications allowed."}
+                continue
+            submission_id += 1
+            inserts.append((form.form_id, submission_id, json.dumps(values), status, key))
+            results[number - 1] = {'row': number, 'status': status, 'id': submission_id}
+
+        cursor.executemany('''
+            INSERT INTO submissions (form_id, submission_id, data, status, dedup_key) VALUES (?, ?, ?, ?, ?)
+        ''', inserts)
+        cursor.execute('''
+            UPDATE forms SET accepted_count = accepted_count + ?, waitlisted_count = waitlisted_count + ?,
+                             last_submission_id = ?
+            WHERE form_id = ?
+        ''', (accepted, waitlisted, submission_id, form.form_id))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    if inserts:
+        registration_events.publish(form.form_id)
+    return results
+
+def import_response(form):
+    try:
+        rows = read_import_rows(form)
+    except SubmissionError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    results = import_submissions(get_db_connection(), form, rows)
+    summary = {status: 0 for status in ('accepted', 'waitlisted', 'rejected', 'duplicate', 'invalid')}
+    for result in results:
+        summary[result['status']] += 1
+    return jsonify({'success': True, **summary, 'results': results})
+
+@app.route('/api/events/import/<int:event_id>', methods=['POST'])
+def import_event_applications(event_id):
+    try:
+        cursor = get_db_connection().cursor()
+        cursor.execute('SELECT event_id FROM events WHERE event_id = ?', (event_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Event not found'}), 404
+
+        form = get_form(cursor, 'event', event_id)
+        if not form:
+            return jsonify({'success': False, 'message': 'Event registrations are closed'}), 400
+        return import_response(form)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/recruitment/import/<int:club_id>', methods=['POST'])
+def import_recruitment_applications(club_id):
+    try:
+        cursor = get_db_connection().cursor()
+        cursor.execute('''
+            SELECT is_recruiting, recruitment_open_at, recruitment_close_at
+            FROM clubs WHERE club_id = ?
+        ''', (club_id,))
+        club = cursor.fetchone()
+        if not club:
+            return jsonify({'success': False, 'message': 'Club not found'}), 404
+
+        form = get_form(cursor, 'recruitment', club_id)
+        if not form or not recruitment_window_open(club):
+            return jsonify({'success': False, 'message': 'Club recruitments are closed'}), 400
+        return import_response(form)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+# Streaming exports: rows are read with fetchmany and encoded batch by
+# batch straight into the response, so memory stays flat however many
+# responses a form has
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'xlsx-lite': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+}
+
+def export_csv(columns, batches):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+def export_ndjson(columns, batches):
+    for batch in batches:
+        yield ''.join(json.dumps(dict(zip(columns, row))) + '\n' for row in batch).encode('utf-8')
+
+class _ChunkSink:
+    """Write-only file for zipfile that hands back whatever was written since the last drain"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Responses" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+def xlsx_cell(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return f'<c><v>{value}</v></c>'
+    text = '' if value is None else xml_escape(str(value))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def xlsx_row(values):
+    return '<row>' + ''.join(xlsx_cell(value) for value in values) + '</row>'
+
+def export_xlsx(columns, batches):
+    """Single-sheet workbook with inline strings, zipped as it streams"""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, content in XLSX_PARTS.items():
+            archive.writestr(name, content)
+        yield sink.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write((
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                + xlsx_row(columns)
+            ).encode('utf-8'))
+            for batch in batches:
+                sheet.write(''.join(xlsx_row(row) for row in batch).encode('utf-8'))
+                yield sink.drain()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
+
+EXPORTERS = {
+    'csv': export_csv,
+    'ndjson': export_ndjson,
+    'xlsx-lite': export_xlsx,
+}
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def export_response(cursor, form, basename):
+    """Streaming download of a form's responses in the ?format= the client asked for"""
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORTERS:
+        return jsonify({
+            'success': False,
+            'message': f"Unsupported format. Use one of: {', '.join(EXPORTERS)}"
+        }), 400
+    mimetype, extension = EXPORT_FORMATS[export_format]
+
+    batches = iter_submission_batches(cursor, form)
+    chunks = EXPORTERS[export_format](form.columns, batches)
+
+    headers = {'Vary': 'Accept-Encoding'}
+    # xlsx is already deflated, compressing it again only costs CPU
+    if export_format != 'xlsx-lite' and 'gzip' in request.accept_encodings:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+
+    filename = f"{basename}.{extension}"
+    ascii_name = filename.encode('ascii', 'replace').decode().replace('"', '')
+    headers['Content-Disposition'] = (
+        f'attachment; filename="{ascii_name}"; filename*=UTF-8\'\'{quote(filename)}'
+    )
+    return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+
+# Response archive: once a form is closed its responses leave the hot
+# database for one SQLite file per term under ARCHIVE_DIR. The files are
+# append-only. A form's responses are written once, as zlib-compressed
+# NDJSON segments of ARCHIVE_SEGMENT_ROWS rows. Each file indexes its
+# forms and segments, so reads decompress only the segments they need.
+# Counters and analytics rollups stay in the hot database.
+ARCHIVE_SQL = '''
+    CREATE TABLE IF NOT EXISTS archived_forms (
+        form_id INTEGER PRIMARY KEY,
+        kind TEXT NOT NULL,
+        owner_id INTEGER NOT NULL,
+        fields TEXT NOT NULL,
+        closed_at TEXT,
+        archived_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        row_count INTEGER NOT NULL,
+        last_submission_id INTEGER NOT NULL,
+        raw_bytes INTEGER NOT NULL,
+        stored_bytes INTEGER NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS archive_segments (
+        form_id INTEGER NOT NULL,
+        first_id INTEGER NOT NULL,
+        last_id INTEGER NOT NULL,
+        row_count INTEGER NOT NULL,
+        payload BLOB NOT NULL
+    );
+
+    CREATE UNIQUE INDEX IF NOT EXISTS idx_archive_segments_form ON archive_segments (form_id, last_id);
+'''
+
+class ArchiveError(Exception):
+    pass
+
+def archive_term(closed_at):
+    """Name of the archive file for a form closed at `closed_at`: 2025-h1 for January to June"""
+    closed = datetime.strptime(closed_at, TIMESTAMP_FORMAT)
+    return f"{closed.year}-h{1 if closed.month <= 6 else 2}"
+
+class ResponseArchive:
+    """Per-term archive files under `root`, stored as <root>/<term>.db"""
+
+    def __init__(self, root, busy_timeout=5.0):
+        self.root = root
+        self.busy_timeout = busy_timeout
+
+    def path(self, term):
+        return os.path.join(self.root, f'{term}.db')
+
+    def connect(self, term, write=False):
+        if write:
+            os.makedirs(self.root, exist_ok=True)
+            conn = sqlite3.connect(self.path(term), timeout=self.busy_timeout, isolation_level=None)
+            conn.executescript(ARCHIVE_SQL)
+        else:
+            conn = sqlite3.connect(f'file:{quote(os.path.abspath(self.path(term)))}?mode=ro', uri=True,
+                                   timeout=self.busy_timeout, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def write(self, term, form, batches):
+        """Append a form's responses, given as batches of submissions rows.
+
+        Returns the form's archived (row_count, last_submission_id). A form
+        that is already in the file is left as it is.
+        """
+        conn = self.connect(term, write=True)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            existing = conn.execute(
+                'SELECT row_count, last_submission_id FROM archived_forms WHERE form_id = ?', (form['form_id'],)
+            ).fetchone()
+            if existing:
+                conn.rollback()
+                return tuple(existing)
+
+            row_count = last_id = raw_bytes = stored_bytes = 0
+            for batch in batches:
+                raw = '\n'.join(json.dumps([
+                    row['submission_id'], row['submitted_at'], row['status'], row['dedup_key'], row['data']
+                ]) for row in batch).encode('utf-8')
+                payload = zlib.compress(raw)
+                conn.execute('''
+                    INSERT INTO archive_segments (form_id, first_id, last_id, row_count, payload)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (form['form_id'], batch[0]['submission_id'], batch[-1]['submission_id'], len(batch), payload))
+                row_count += len(batch)
+                last_id = batch[-1]['submission_id']
+                raw_bytes += len(raw)
+                stored_bytes += len(payload)
+            # Written last, so a form listed here is always complete
+            conn.execute('''
+                INSERT INTO archived_forms (form_id, kind, owner_id, fields, closed_at, row_count,
+                                            last_submission_id, raw_bytes, stored_bytes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (form['form_id'], form['kind'], form['owner_id'], form['fields'], form['closed_at'],
+                  row_count, last_id, raw_bytes, stored_bytes))
+            conn.commit()
+            return row_count, last_id
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+    def iter_batches(self, term, form_id, after=0):
+        """Yield lists of the form's responses with submission_id > `after`, one segment at a time"""
+        conn = self.connect(term)
+        try:
+            segments = conn.execute('''
+                SELECT payload FROM archive_segments WHERE form_id = ? AND last_id > ? ORDER BY last_id
+            ''', (form_id, after))
+            for segment in segments:
+                rows = []
+                for line in zlib.decompress(segment['payload']).decode('utf-8').split('\n'):
+                    submission_id, submitted_at, status, key, data = json.loads(line)
+                    if submission_id > after:
+                        rows.append({'submission_id': submission_id, 'submitted_at': submitted_at,
+                                     'status': status, 'dedup_key': key, 'data': data})
+                yield rows
+        finally:
+            conn.close()
+
+    def iter_rows(self, term, form_id, after=0):
+        for rows in self.iter_batches(term, form_id, after):
+            yield from rows
+
+def get_response_archive():
+    archive = app.extensions.get('response_archive')
+    if archive is None:
+        archive = app.extensions['response_archive'] = ResponseArchive(
+            app.config['ARCHIVE_DIR'], app.config['DB_BUSY_TIMEOUT']
+        )
+    return archive
+
+def archive_form(conn, form_id):
+    """Move a closed form's responses to its term's archive file.
+
+    Returns the term, or None if the form is open or already archived.
+    The hot database's write lock is held throughout, so nothing can
+    change the responses between the copy and the delete. If the copy is
+    committed but the delete is not, running this again completes the
+    move without writing the form twice.
+    """
+    cursor = conn.cursor()
+    before = begin_catalog_write(conn)
+    try:
+        cursor.execute('''
+            SELECT form_id, kind, owner_id, fields, is_open, closed_at, archive_term FROM forms WHERE form_id = ?
+        ''', (form_id,))
+        form = cursor.fetchone()
+        if form is None or form['is_open'] or form['archive_term']:
+            conn.rollback()
+            return None
+        term = archive_term(form['closed_at'] or utc_timestamp())
+
+        cursor.execute('''
+            SELECT submission_id, submitted_at, status, dedup_key, data FROM submissions
+            WHERE form_id = ? ORDER BY submission_id
+        ''', (form_id,))
+        batch_size = app.config['ARCHIVE_SEGMENT_ROWS']
+        archived = get_response_archive().write(term, form, iter(lambda: cursor.fetchmany(batch_size), []))
+
+        cursor.execute('''
+            SELECT COUNT(*), COALESCE(MAX(submission_id), 0) FROM submissions WHERE form_id = ?
+        ''', (form_id,))
+        if tuple(cursor.fetchone()) != archived:
+            raise ArchiveError(f'Form {form_id} does not match its copy in the {term} archive')
+        # Marked first so the rollup trigger leaves the form's counts alone
+        cursor.execute('''
+            UPDATE forms SET archive_term = ?, archived_at = CURRENT_TIMESTAMP WHERE form_id = ?
+        ''', (term, form_id))
+        cursor.execute('DELETE FROM submissions WHERE form_id = ?', (form_id,))
+        commit_catalog_write(conn, before, form_tags=(form_tag(form['kind'], form['owner_id']),))
+    except BaseException:
+        conn.rollback()
+        raise
+    return term
+
+def archive_closed_forms(conn, kind=None, owner_id=None, form_ids=()):
+    """Archive every closed form not archived yet (optionally only an owner's, or `form_ids`)"""
+    query = 'SELECT form_id FROM forms WHERE is_open = 0 AND archive_term IS NULL'
+    params = []
+    if kind is not None:
+        query += ' AND kind = ? AND owner_id = ?'
+        params += [kind, owner_id]
+    if form_ids:
+        query += f" AND form_id IN ({', '.join('?' * len(form_ids))})"
+        params += form_ids
+    report = []
+    for (form_id,) in conn.execute(query + ' ORDER BY form_id', params).fetchall():
+        term = archive_form(conn, form_id)
+        if term:
+            report.append({'form_id': form_id, 'term': term})
+    return report
+
+def archive_on_close(conn, kind, owner_id):
+    if not app.config['ARCHIVE_ON_CLOSE']:
+        return
+    try:
+        archive_closed_forms(conn, kind, owner_id)
+    except Exception:
+        # The form is closed either way; `archive-closed` retries later
+        app.logger.exception('Archiving %s %s failed', kind, owner_id)
+
+@app.cli.command('archive-closed')
+@click.option('--form', 'form_ids', type=int, multiple=True, help='only these form ids (repeatable)')
+@click.option('--vacuum', is_flag=True, help='then VACUUM the database to give the freed space back')
+def archive_closed_command(form_ids, vacuum):
+    """Move the responses of closed forms to the per-term archive files.
+
+    Safe to run while the server is up, e.g. from cron; --vacuum is not.
+    """
+    conn = get_db_connection()
+    for entry in archive_closed_forms(conn, form_ids=form_ids):
+        print(' '.join(f"{key}={value}" for key, value in entry.items()))
+    if vacuum:
+        conn.execute('VACUUM')
+
+@app.route('/api/archive/forms', methods=['GET'])
+def list_archived_forms():
+    """Archived forms, newest first, optionally only ?kind=event|recruitment and ?owner_id="""
+    query = '''
+        SELECT form_id, kind, owner_id, archive_term, created_at, closed_at, archived_at,
+               accepted_count, waitlisted_count
+        FROM forms WHERE archive_term IS NOT NULL
+    '''
+    params = []
+    if request.args.get('kind'):
+        query += ' AND kind = ?'
+        params.append(request.args['kind'])
+    if request.args.get('owner_id'):
+        try:
+            params.append(int(request.args['owner_id']))
+        except ValueError:
+            return jsonify({'success': False, 'message': 'owner_id must be a number'}), 400
+        query += ' AND owner_id = ?'
+    try:
+        cursor = get_db_connection().cursor()
+        cursor.execute(query + ' ORDER BY form_id DESC', params)
+        return jsonify({'success': True, 'forms': [dict(row) for row in cursor.fetchall()]})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/archive/forms/<int:form_id>/download', methods=['GET'])
+def download_archived_responses(form_id):
+    try:
+        cursor = get_db_connection().cursor()
+        cursor.execute(f'SELECT kind, owner_id, {FORM_SCHEMA_COLUMNS} FROM forms WHERE form_id = ?', (form_id,))
+        form = cursor.fetchone()
+        if not form or not form['archive_term']:
+            return jsonify({'success': False, 'message': 'Archived form not found'}), 404
+
+        return export_response(cursor, form_schema(form),
+                               f"{form['kind']}_{form['owner_id']}_form_{form_id}_responses")
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+# Add these new routes to the existing Flask app
+
+@app.route('/api/events/close_registrations/<int:event_id>', methods=['POST'])
+def close_event_registrations(event_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT event_id FROM events WHERE event_id = ?', (event_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Event not found'}), 404
+
+        # Stop accepting registrations; the responses stay downloadable from the archive
+        before = begin_catalog_write(conn)
+        close_form(cursor, 'event', event_id)
+        commit_catalog_write(conn, before, (f'event_form:{event_id}',), (form_tag('event', event_id),))
+        archive_on_close(conn, 'event', event_id)
+
+        return jsonify({
+            'success': True, 
+            'message': 'Event registrations closed successfully'
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/events/download_responses/<int:event_id>', methods=['GET'])
+def download_event_responses(event_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT event_name FROM events WHERE event_id = ?', (event_id,))
+        event = cursor.fetchone()
+        
+        if not event:
+            return jsonify({'success': False, 'message': 'Event not found'}), 404
+
+        form = get_form(cursor, 'event', event_id, open_only=False)
+        if not form:
+            return jsonify({'success': False, 'message': 'No registration form found'}), 404
+
+        return export_response(cursor, form, f"{event['event_name']}_responses")
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/recruitment/close/<int:club_id>', methods=['POST'])
+def close_club_recruitments(club_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT club_id FROM clubs WHERE club_id = ?', (club_id,))
+        if not cursor.fetchone():
+            return jsonify({'success': False, 'message': 'Club not found'}), 404
+
+        # Stop accepting applications; the responses stay downloadable from the archive
+        before = begin_catalog_write(conn)
+        close_form(cursor, 'recruitment', club_id)
+        close_recruitment(cursor, club_id)
+        commit_catalog_write(conn, before, ('recruiting_clubs',), (form_tag('recruitment', club_id),))
+        archive_on_close(conn, 'recruitment', club_id)
+
+        return jsonify({
+            'success': True, 
+            'message': 'Club recruitments closed successfully'
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/recruitment/download_responses/<int:club_id>', methods=['GET'])
+def download_club_recruitment_responses(club_id):
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+
+        cursor.execute('SELECT club_name FROM clubs WHERE club_id = ?', (club_id,))
+        club = cursor.fetchone()
+        
+        if not club:
+            return jsonify({'success': False, 'message': 'Club not found'}), 404
+
+        form = get_form(cursor, 'recruitment', club_id, open_only=False)
+        if not form:
+            return jsonify({'success': False, 'message': 'No recruitment form found'}), 404
+
+        return export_response(cursor, form, f"{club['club_name']}_recruitment_responses")
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+    
+def reset_after_fork():
+    # Nothing that owns a connection or a thread may cross fork()
+    app.extensions.pop('db_pool', None)
+    app.extensions.pop('registration_queue', None)
+    catalog_cache.invalidate_all()
+    form_registry.invalidate_all()
+
+def warm_worker():
+    """Open a connection, load the venue index and start the registration writer before taking requests"""
+    pool = get_pool()
+    conn = pool.acquire()
+    try:
+        venue_index.refresh(conn.cursor())
+    finally:
+        pool.release(conn)
+    if app.config['REGISTRATION_QUEUE_ENABLED']:
+        get_registration_queue()._ensure_writer()
+
+def shutdown_worker():
+    """Flush queued registrations and close connections on the way out"""
+    registration_queue = app.extensions.pop('registration_queue', None)
+    if registration_queue is not None:
+        registration_queue.stop()
+    pool = app.extensions.pop('db_pool', None)
+    if pool is not None:
+        pool.close_all()
+
+def serve(bind, workers, threads, max_requests, graceful_timeout, timeout):
+    """Run under gunicorn: `workers` processes of `threads` threads each.
+
+    Falls back to waitress, a single multi-threaded process, where gunicorn
+    isn't available (it doesn't run on Windows).
+    """
+    prepare_database()
+    limit_waiting_requests(threads)
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        try:
+            import waitress
+        except ImportError:
+            raise click.ClickException('serve needs gunicorn (or waitress on Windows): pip install gunicorn')
+        app.logger.warning('gunicorn is not installed; serving from one waitress process with %d threads', threads)
+        warm_worker()
+        try:
+            waitress.serve(app, listen=bind, threads=threads)
+        finally:
+            shutdown_worker()
+        return
+
+    class GunicornServer(BaseApplication):
+        def load_config(self):
+            for key, value in self.options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    GunicornServer.options = {
+        'bind': bind,
+        'workers': workers,
+        'worker_class': 'gthread',
+        'threads': threads,
+        # Recycle workers so slow leaks can't accumulate; the jitter keeps
+        # them from all restarting at once
+        'max_requests': max_requests,
+        'max_requests_jitter': max(max_requests // 10, 1) if max_requests else 0,
+        'graceful_timeout': graceful_timeout,
+        'timeout': timeout,
+        'keepalive': 5,
+        'preload_app': True,
+        'proc_name': 'pesu-clubs-events',
+        'post_fork': lambda arbiter, worker: reset_after_fork(),
+        'post_worker_init': lambda worker: warm_worker(),
+        'worker_exit': lambda arbiter, worker: shutdown_worker(),
+    }
+    GunicornServer().run()
+
+@app.cli.command('serve', with_appcontext=False)
+@click.option('--bind', default='127.0.0.1:5000', envvar='PESU_BIND', show_default=True,
+              help='host:port to listen on')
+@click.option('--workers', type=int, default=os.cpu_count() or 1, envvar='PESU_WORKERS',
+              show_default='number of CPUs', help='worker processes')
+@click.option('--threads', type=int, default=8, envvar='PESU_THREADS', show_default=True,
+              help='request threads per worker')
+@click.option('--max-requests', type=int, default=10000, envvar='PESU_MAX_REQUESTS', show_default=True,
+              help='restart a worker after this many requests (0 never restarts)')
+@click.option('--graceful-timeout', type=int, default=30, envvar='PESU_GRACEFUL_TIMEOUT', show_default=True,
+              help='seconds a worker gets to finish in-flight requests on shutdown')
+@click.option('--timeout', type=int, default=120, envvar='PESU_WORKER_TIMEOUT', show_default=True,
+              help='seconds of silence before a stuck worker is killed and replaced')
+def serve_command(bind, workers, threads, max_requests, graceful_timeout, timeout):
+    """Serve the API on a multi-process, multi-threaded production server."""
+    if threads > app.config['DB_POOL_SIZE']:
+        app.config['DB_POOL_SIZE'] = threads
+    serve(bind, workers, threads, max_requests, graceful_timeout, timeout)
+
+if __name__ == '__main__':
+    serve_command.main(args=sys.argv[1:], prog_name='server.py')
\ No newline at end of file
@@ -0,0 +1,42 @@
+import os
+import shutil
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = tempfile.mkdtemp(prefix='pesu-test-')
+shutil.copy(os.path.join(ROOT, 'dbms_project.db'), os.path.join(DATA_DIR, 'test.db'))
+# server.py reads its config at import time
+os.environ['PESU_DATABASE'] = os.path.join(DATA_DIR, 'test.db')
+os.environ['PESU_BLOB_DIR'] = os.path.join(DATA_DIR, 'blobs')
+os.environ['PESU_ARCHIVE_DIR'] = os.path.join(DATA_DIR, 'archive')
+sys.path.insert(0, ROOT)
+
+import server
+
+
+def setup_module():
+    server.prepare_database()
+
+
+def teardown_module():
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+def test_batched_home_matches_home():
+    client = server.app.test_client()
+    home = client.get('/api/home')
+    assert home.status_code == 200
+
+    response = client.post('/api/batch', json={'requests': ['/api/home', '/api/clubs']})
+    assert response.status_code == 200
+    batched_home, batched_clubs = response.json['responses']
+    assert batched_home['status'] == 200
+    assert batched_home['body'] == home.json
+    assert batched_clubs['status'] == 200
+
+
+def test_encoded_live_path_cannot_be_batched():
+    client = server.app.test_client()
+    response = client.post('/api/batch', json={'requests': ['/api/events/application/%6Cive/1']})
+    assert response.json['responses'][0]['status'] == 400